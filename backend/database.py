@@ -1,16 +1,102 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from contextvars import ContextVar
+from typing import Optional
 from sqlalchemy.orm import sessionmaker
 from models import Base, Agent, AgentRole, AgentStatus
+from migrations import run_migrations, current_version
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///../data/mission_control.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Storage profile: "default" keeps SQLite's stock rollback journal, "production"
+# switches to WAL so board reads don't queue behind agent activity commits.
+STORAGE_PROFILE = os.getenv("STORAGE_PROFILE", "default").lower()
+
+# PRAGMAs applied to every new SQLite connection, per profile
+SQLITE_PRAGMAS = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # Durable across app crashes in WAL mode, one fsync per checkpoint
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # Negative = KiB (64MB)
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "temp_store": "MEMORY",
+    },
+}
+
+# Connection pool settings, per profile (SQLite files only)
+POOL_SETTINGS = {
+    "default": {},
+    "production": {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+        "pool_pre_ping": True,
+    },
+}
+
+if STORAGE_PROFILE not in SQLITE_PRAGMAS:
+    raise ValueError(f"Unknown STORAGE_PROFILE '{STORAGE_PROFILE}'. Use one of: {', '.join(SQLITE_PRAGMAS)}")
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_memory = is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+engine_kwargs = {}
+if is_sqlite:
+    engine_kwargs["connect_args"] = {"check_same_thread": False}
+    if not is_memory:
+        engine_kwargs.update(POOL_SETTINGS[STORAGE_PROFILE])
+
+engine = create_engine(DATABASE_URL, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply the storage profile's PRAGMAs to each new pooled connection."""
+        pragmas = SQLITE_PRAGMAS[STORAGE_PROFILE]
+        if not pragmas:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if name == "journal_mode" and is_memory:
+                    continue  # In-memory databases can't use WAL
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+# Per-request SQL statement counter. The HTTP middleware in main.py installs a
+# fresh [count] list; the engine hook increments it for every statement.
+query_counter: ContextVar[Optional[list]] = ContextVar("query_counter", default=None)
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+def get_storage_report() -> dict:
+    """Read back the PRAGMAs actually in effect on a live connection."""
+    report = {"profile": STORAGE_PROFILE, "dialect": engine.dialect.name, "pool": type(engine.pool).__name__}
+    if is_sqlite and not is_memory:
+        report.update({k: v for k, v in POOL_SETTINGS[STORAGE_PROFILE].items() if k != "pool_pre_ping"})
+    if not is_sqlite:
+        return report
+    with engine.connect() as conn:
+        for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"):
+            report[name] = conn.execute(text(f"PRAGMA {name}")).scalar()
+    return report
+
 def init_db():
-    """Create tables. Users add their own agents via the UI."""
+    """Create tables and apply pending migrations. Users add their own agents via the UI."""
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    print(f"Schema version: {current_version(engine)}")
+    report = get_storage_report()
+    print(f"Storage profile: {report.pop('profile')} ({', '.join(f'{k}={v}' for k, v in report.items())})")
     print("Database initialized. Add agents via the Agent Management panel.")
 
 def get_db():
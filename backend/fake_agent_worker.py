@@ -0,0 +1,69 @@
+"""Stand-in agent worker for AGENT_TRANSPORT=worker, for trying the worker pool
+without OpenClaw:
+
+    AGENT_TRANSPORT=worker AGENT_WORKER_COMMAND="python fake_agent_worker.py" python main.py
+
+Speaks the worker protocol (see AgentWorker in main.py): one JSON request per
+line on stdin, JSON frames on stdout. Replies echo the message. The agent id
+picks special behaviour:
+
+    fail   answers with an error frame
+    crash  exits without answering
+    slow   waits FAKE_WORKER_SLOW seconds (default 5) before answering
+
+FAKE_WORKER_DELAY adds a per-message delay (seconds), FAKE_WORKER_STARTUP
+simulates a slow start-up, and FAKE_WORKER_LOG appends one line per request.
+"""
+import json
+import os
+import sys
+import time
+
+DELAY = float(os.getenv("FAKE_WORKER_DELAY", "0"))
+SLOW = float(os.getenv("FAKE_WORKER_SLOW", "5"))
+LOG = os.getenv("FAKE_WORKER_LOG")
+
+
+def send(frame: dict):
+    sys.stdout.write(json.dumps(frame) + "\n")
+    sys.stdout.flush()
+
+
+def handle(request: dict):
+    request_id = request.get("id")
+    agent_id = request.get("agent_id", "")
+    message = request.get("message", "")
+    if LOG:
+        with open(LOG, "a") as f:
+            f.write(f"{os.getpid()} {agent_id} {message}\n")
+
+    if agent_id == "crash":
+        sys.exit(3)
+    if agent_id == "fail":
+        send({"id": request_id, "error": f"agent {agent_id} refused"})
+        return
+    time.sleep(SLOW if agent_id == "slow" else DELAY)
+
+    reply = f"{agent_id} got: {message}"
+    if request.get("stream"):
+        for word in reply.split(" "):
+            send({"id": request_id, "delta": word + " "})
+        send({"id": request_id, "reply": ""})
+    else:
+        send({"id": request_id, "reply": reply})
+
+
+def main():
+    time.sleep(float(os.getenv("FAKE_WORKER_STARTUP", "0")))
+    for line in sys.stdin:  # EOF on stdin means shut down
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        handle(request)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Form, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case, or_, and_, event, inspect as sa_inspect
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 import json
 import asyncio
@@ -13,12 +14,25 @@ import time
 import subprocess
 import shutil
 import uuid
-
-from database import init_db, get_db, SessionLocal
+import copy
+import bisect
+import re
+import shlex
+import codecs
+import struct
+import threading
+import tempfile
+from contextlib import contextmanager, asynccontextmanager
+import httpx
+import base64
+from collections import deque
+from abc import ABC, abstractmethod
+
+from database import init_db, get_db, SessionLocal, query_counter
 from models import (
     Agent, Task, Comment, Deliverable, ChatMessage, Announcement, ActivityLog,
-    TaskStatus, Priority, AgentRole, AgentStatus,
-    RecurringTask, RecurringTaskRun, TaskActivity,
+    TaskStatus, Priority, AgentRole, AgentStatus, NotificationStatus,
+    RecurringTask, RecurringTaskRun, TaskActivity, TaskChange, NotificationOutbox, generate_uuid,
     Document, IntelligenceReport, Client, WeeklyRecap, ApiUsageLog
 )
 
@@ -31,29 +45,393 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Query-Count", "X-Next-Cursor"],
 )
 
 # WebSocket connections
+# Each client gets a bounded outbound queue drained by its own sender task, so a
+# slow or half-dead browser only ever delays itself.
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+# What to do when a client's queue is full:
+#   "drop_oldest" - discard the oldest queued message to make room
+#   "drop_newest" - discard the new message
+#   "disconnect"  - close the socket; the client reconnects and resyncs
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest").lower()
+# Consecutive same-type events broadcast within this window go out as one
+# {"type": "batch", "data": {"type": <event type>, "items": [...]}} frame (0 disables)
+WS_COALESCE_MS = float(os.getenv("WS_COALESCE_MS", "20"))
+WS_COALESCE_MAX_EVENTS = int(os.getenv("WS_COALESCE_MAX_EVENTS", "500"))
+# Recent broadcasts kept in memory so a reconnecting client can resume with
+# /ws?resume_from=<seq> instead of refetching everything
+WS_REPLAY_BUFFER_SIZE = int(os.getenv("WS_REPLAY_BUFFER_SIZE", "1000"))
+
+class ClientConnection:
+    """One connected WebSocket client with its outbound queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, resync_frame=None):
+        self.websocket = websocket
+        self.resync_frame = resync_frame  # Builds the resync_required frame sent after drops
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        self.sender: Optional[asyncio.Task] = None
+        self.connected_at = datetime.utcnow()
+        self.topics: Optional[set] = None  # None = never subscribed, receives everything
+        self.sent = 0
+        self.dropped = 0
+        self.gap = False  # Frames were dropped and the client hasn't been told yet
+        self.closing = False
+
+    def enqueue(self, text: str) -> bool:
+        """Queue a pre-serialized frame. Returns False if the client should be dropped."""
+        if self.closing:
+            return True
+        if self.gap and self.queue.qsize() <= self.queue.maxsize - 2:
+            self._queue_resync()
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if WS_SLOW_CONSUMER_POLICY == "disconnect":
+            self.closing = True
+            self.dropped += self.queue.qsize() + 1
+            return False
+        self.dropped += 1
+        # The client can't tell from later seqs that it missed something, so it gets a
+        # resync_required frame as soon as the queue has room (after what's queued now)
+        self.gap = True
+        if WS_SLOW_CONSUMER_POLICY == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(text)
+        return True
+
+    def wants(self, topics: set) -> bool:
+        if self.topics is None or "*" in self.topics:
+            return True
+        return bool(self.topics & topics)
+
+    def _queue_resync(self):
+        self.gap = False
+        if self.resync_frame is not None:
+            self.queue.put_nowait(self.resync_frame())
+
+    async def run_sender(self):
+        while True:
+            if self.gap and self.queue.empty():
+                self._queue_resync()
+            text = await self.queue.get()
+            await asyncio.wait_for(self.websocket.send_text(text), WS_SEND_TIMEOUT)
+            self.sent += 1
+
+# ============ WebSocket Topics ============
+# Clients send {"action": "subscribe", "topics": [...]} (or "unsubscribe") to
+# receive only matching events. Clients that never subscribe get everything.
+WS_TOPICS = {"tasks", "chat", "activity", "agents", "announcements", "documents", "recurring"}
+WS_TOPIC_PREFIXES = ("task:", "agent:")
+
+TASK_EVENT_TYPES = {
+    "task_created", "task_updated", "task_deleted", "task_reviewed",
+    "comment_added", "task_activity_added", "deliverable_complete",
+}
+
+def event_topics(message: dict) -> Optional[set]:
+    """Topics an event belongs to. None means deliver to every client."""
+    event_type = message.get("type", "")
+    data = message.get("data") or {}
+    topics = set()
+
+    if event_type in TASK_EVENT_TYPES:
+        topics.add("tasks")
+        task_id = data.get("task_id") if event_type in ("comment_added", "task_activity_added", "deliverable_complete") else data.get("id")
+        if task_id:
+            topics.add(f"task:{task_id}")
+        assignee_id = (data.get("task") or {}).get("assignee_id")
+        if assignee_id:
+            topics.add(f"agent:{assignee_id}")
+    elif event_type in ("chat_message", "chat_message_delta"):
+        topics.add("chat")
+        if data.get("agent_id"):
+            topics.add(f"agent:{data['agent_id']}")
+    elif event_type == "activity":
+        topics.add("activity")
+        if data.get("task_id"):
+            topics.add(f"task:{data['task_id']}")
+        if data.get("agent_id"):
+            topics.add(f"agent:{data['agent_id']}")
+    elif event_type in ("agent_status", "agents_imported"):
+        topics.add("agents")
+        if data.get("id"):
+            topics.add(f"agent:{data['id']}")
+    elif event_type == "announcement":
+        topics.add("announcements")
+    elif event_type.startswith("recurring_"):
+        topics.add("recurring")
+    elif event_type.startswith("document_"):
+        topics.add("documents")
+    else:
+        return None
+    return topics
+
+def is_valid_topic(topic: str) -> bool:
+    if topic == "*" or topic in WS_TOPICS:
+        return True
+    return any(topic.startswith(p) and len(topic) > len(p) for p in WS_TOPIC_PREFIXES)
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
+        self.connections: dict = {}  # WebSocket -> ClientConnection
+        self.dropped_total = 0
+        self.disconnected_slow = 0
+        self.broadcasts = 0
+        self.batched_events = 0
+        self.pending: list = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # Sequence numbers start at the boot time in ms so they keep increasing
+        # across restarts and a stale resume_from can never match a new event
+        self.seq = int(time.time() * 1000)
+        self.sent_seq = self.seq  # Highest seq handed to clients (excludes pending)
+        self.replay: deque = deque(maxlen=WS_REPLAY_BUFFER_SIZE)  # (seq, type, data, topics)
+        self.replayed_events = 0
+        self.resyncs = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # Loop the sockets live on
+        self.closing: set = set()  # Close tasks for slow clients (the loop only keeps weak refs)
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, resume_from: Optional[int] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = ClientConnection(websocket, self._resync_frame)
+        self.connections[websocket] = client
+        # Queued before any live event can reach this client (no await in between)
+        if resume_from is None:
+            self._send_frame(client, {"type": "connected", "seq": self.sent_seq})
+        else:
+            self._resume(client, resume_from)
+        client.sender = asyncio.create_task(self._sender(client))
+
+    def _resume(self, client: ClientConnection, resume_from: int):
+        """Replay the events a reconnecting client missed, or tell it to resync."""
+        oldest = self.replay[0][0] if self.replay else None
+        if resume_from > self.sent_seq or (resume_from < self.sent_seq and (oldest is None or oldest > resume_from + 1)):
+            # Gap fell out of the buffer (or the server restarted)
+            self.resyncs += 1
+            self._send_frame(client, {"type": "resync_required", "seq": self.sent_seq})
+            return
+        events = [
+            {"type": event_type, "seq": seq, "data": data}
+            for seq, event_type, data, topics in self.replay
+            if seq > resume_from and (topics is None or client.wants(topics))
+        ]
+        self.replayed_events += len(events)
+        # One frame, so a long replay can't overflow the client's queue
+        self._send_frame(client, {"type": "replay", "seq": self.sent_seq, "data": {"events": events}})
+
+    def _resync_frame(self) -> str:
+        self.resyncs += 1
+        return json.dumps({"type": "resync_required", "seq": self.sent_seq}, separators=(",", ":"))
+
+    def _send_frame(self, client: ClientConnection, frame: dict):
+        client.enqueue(json.dumps(frame, separators=(",", ":"), ensure_ascii=False))
+
+    async def _sender(self, client: ClientConnection):
+        try:
+            await client.run_sender()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out - the client is gone or too slow
+            await self._close(client, code=1011)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        client = self.connections.pop(websocket, None)
+        if client is None:
+            return
+        self.dropped_total += client.dropped
+        if client.sender and client.sender is not asyncio.current_task():
+            client.sender.cancel()
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+    async def _close(self, client: ClientConnection, code: int = 1000):
+        client.closing = True
+        self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def broadcast(self, message: dict, ephemeral: bool = False):
+        """Send an event to every subscribed client.
+
+        Ephemeral events (e.g. streaming deltas) get no seq and are never
+        replayed; the event they lead up to is.
+        """
+        self.publish(message, ephemeral)
+
+    def publish(self, message: dict, ephemeral: bool = False):
+        """Non-async broadcast, callable from any thread (commit hooks run in the threadpool too)."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is None:
+            if self.loop is not None and not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(self.publish, message, ephemeral)
+            return
+        self.loop = running_loop
+        self.broadcasts += 1
+        if not ephemeral:
+            self.seq += 1
+            message = {**message, "seq": self.seq}
+        if WS_COALESCE_MS <= 0:
+            self._record(message)
+            self._fan_out(message["type"], [message])
+            return
+        # Hold the event briefly so a burst of same-type events goes out as one frame
+        self.pending.append(message)
+        if len(self.pending) >= WS_COALESCE_MAX_EVENTS:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(WS_COALESCE_MS / 1000, self._flush)
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        pending, self.pending = self.pending, []
+        # Only runs of adjacent same-type events share a frame, so frames leave in
+        # seq order and each frame's seq is a true high-water mark for resume
+        run: list = []
+        for message in pending:
+            self._record(message)
+            if run and message["type"] != run[0]["type"]:
+                self._fan_out(run[0]["type"], run)
+                run = []
+            run.append(message)
+        if run:
+            self._fan_out(run[0]["type"], run)
+
+    def _record(self, message: dict):
+        """Keep a delivered event in the replay buffer (in seq order)."""
+        if "seq" not in message:
+            return
+        self.replay.append((message["seq"], message["type"], message["data"], event_topics(message)))
+        self.sent_seq = message["seq"]
+
+    def _fan_out(self, event_type: str, messages: list):
+        """Queue one frame per client: the single event, or a batch of the items it subscribes to.
+
+        Frames carry the highest seq they contain; clients resume from the highest seq seen.
+        """
+        items = [m["data"] for m in messages]
+        item_topics = [event_topics(m) for m in messages]
+        frames: dict = {}  # included item indexes -> serialized frame (serialize once per distinct subset)
+        for client in list(self.connections.values()):
+            included = tuple(i for i, topics in enumerate(item_topics) if topics is None or client.wants(topics))
+            if not included:
+                continue
+            if included not in frames:
+                seq = max((messages[i]["seq"] for i in included if "seq" in messages[i]), default=None)
+                if len(included) == 1:
+                    frame = {"type": event_type, "data": items[included[0]]}
+                else:
+                    frame = {"type": "batch", "data": {"type": event_type, "items": [items[i] for i in included]}}
+                    self.batched_events += len(included)
+                if seq is not None:
+                    frame["seq"] = seq
+                frames[included] = json.dumps(frame, separators=(",", ":"), ensure_ascii=False)
+            if not client.enqueue(frames[included]):
+                self.disconnected_slow += 1
+                task = asyncio.create_task(self._close(client, code=1013))  # 1013 = try again later
+                self.closing.add(task)
+                task.add_done_callback(self.closing.discard)
+
+    async def send_to(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client."""
+        client = self.connections.get(websocket)
+        if client:
+            client.enqueue(json.dumps(message, separators=(",", ":"), ensure_ascii=False))
+
+    async def handle_client_message(self, websocket: WebSocket, raw: str):
+        """Apply a subscribe/unsubscribe request from a client."""
+        client = self.connections.get(websocket)
+        if client is None:
+            return
+        try:
+            request = json.loads(raw)
+            action = request.get("action")
+            topics = request.get("topics")
+        except (json.JSONDecodeError, AttributeError):
+            await self.send_to(websocket, {"type": "error", "data": {"detail": "Expected a JSON object"}})
+            return
+        if topics is None:
+            topics = []
+        elif isinstance(topics, str):
+            topics = [topics]
+        if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+            await self.send_to(websocket, {"type": "error", "data": {"detail": "topics must be a list of strings"}})
+            return
+
+        invalid = [t for t in topics if not is_valid_topic(t)]
+        if invalid:
+            await self.send_to(websocket, {"type": "error", "data": {"detail": f"Unknown topics: {invalid}"}})
+            return
+
+        if action == "subscribe":
+            client.topics = (client.topics or set()) | set(topics)
+        elif action == "unsubscribe":
+            current = client.topics
+            if current is None or "*" in current:
+                # Receiving everything: unsubscribing narrows that down to the other topics
+                current = (WS_TOPICS | (current or set())) - {"*"}
+            client.topics = current - set(topics)
+        else:
+            await self.send_to(websocket, {"type": "error", "data": {"detail": f"Unknown action: {action}"}})
+            return
+        await self.send_to(websocket, {"type": "subscribed", "data": {"topics": sorted(client.topics)}})
+
+    def stats(self) -> dict:
+        clients = list(self.connections.values())
+        depths = [c.queue.qsize() for c in clients]
+        return {
+            "connections": len(clients),
+            "policy": WS_SLOW_CONSUMER_POLICY,
+            "queue_capacity": WS_QUEUE_SIZE,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "broadcasts": self.broadcasts,
+            "coalesce_ms": WS_COALESCE_MS,
+            "batched_events": self.batched_events,
+            "seq": self.seq,
+            "replay_buffered": len(self.replay),
+            "replay_capacity": WS_REPLAY_BUFFER_SIZE,
+            "replayed_events": self.replayed_events,
+            "resyncs": self.resyncs,
+            "dropped_total": self.dropped_total + sum(c.dropped for c in clients),
+            "disconnected_slow": self.disconnected_slow,
+            "clients": [{
+                "connected_at": c.connected_at.isoformat(),
+                "topics": sorted(c.topics) if c.topics is not None else None,
+                "queue_depth": c.queue.qsize(),
+                "sent": c.sent,
+                "dropped": c.dropped,
+            } for c in clients],
+        }
 
 manager = ConnectionManager()
 
+# Report the number of SQL statements each request issued so N+1 regressions are visible
+@app.middleware("http")
+async def count_queries(request, call_next):
+    counter = [0]
+    token = query_counter.set(counter)
+    try:
+        response = await call_next(request)
+    finally:
+        query_counter.reset(token)
+    response.headers["X-Query-Count"] = str(counter[0])
+    return response
+
 # Pydantic schemas
 class AgentResponse(BaseModel):
     id: str
@@ -124,8 +502,84 @@ class TaskActivityCreate(BaseModel):
     agent_id: str
     message: str
 
+# ============ Keyset Pagination ============
+# Feeds page on (timestamp, id) so deep scrollback costs the same as the first page.
+# Cursors are opaque to clients; the next one is returned in the X-Next-Cursor header.
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(ts: datetime, row_id: str) -> str:
+    raw = json.dumps([ts.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return datetime.fromisoformat(ts), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query, ts_col, id_col, limit: int, before: Optional[str] = None, after: Optional[str] = None):
+    """Fetch one page of `query` keyed on (ts_col, id_col).
+
+    `before` pages back through history, `after` pages forward from a cursor.
+    Returns (rows newest-first, next_cursor); next_cursor continues in the same
+    direction and is None once there is nothing left. Rows are tuples whose
+    first element is the paged model instance.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    if after:
+        ts, row_id = decode_cursor(after)
+        query = query.filter(or_(ts_col > ts, and_(ts_col == ts, id_col > row_id)))
+        query = query.order_by(ts_col.asc(), id_col.asc())
+    else:
+        if before:
+            ts, row_id = decode_cursor(before)
+            query = query.filter(or_(ts_col < ts, and_(ts_col == ts, id_col < row_id)))
+        query = query.order_by(ts_col.desc(), id_col.desc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1][0]
+        next_cursor = encode_cursor(getattr(last, ts_col.key), getattr(last, id_col.key))
+    if after:
+        rows.reverse()
+    return rows, next_cursor
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+# ============ Unit of Work ============
+# A write request makes all its changes in one transaction: helpers add rows and
+# flush (when ids are needed) but never commit, and the endpoint commits once at
+# the end. WebSocket events are queued on the session and only sent by the
+# after_commit hook, so clients never see state that was rolled back. Agent
+# notifications ride the same transaction through the outbox.
+def queue_broadcast(db: Session, message: dict):
+    """Send `message` to WebSocket clients once the session's transaction commits."""
+    db.info.setdefault("broadcasts", []).append(message)
+
+@event.listens_for(SessionLocal, "after_commit")
+def publish_queued_broadcasts(session):
+    for message in session.info.pop("broadcasts", []):
+        manager.publish(message)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def discard_queued_broadcasts(session):
+    session.info.pop("broadcasts", None)
+
 # Helper to log activity
-async def log_activity(db: Session, activity_type: str, agent_id: str = None, task_id: str = None, description: str = None):
+def log_activity(db: Session, activity_type: str, agent_id: str = None, task_id: str = None, description: str = None):
+    """Add an activity log row to the current transaction; it is broadcast on commit."""
     activity = ActivityLog(
         activity_type=activity_type,
         agent_id=agent_id,
@@ -133,10 +587,9 @@ async def log_activity(db: Session, activity_type: str, agent_id: str = None, ta
         description=description
     )
     db.add(activity)
-    db.commit()
     
     # Broadcast to WebSocket clients
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "activity",
         "data": {
             "activity_type": activity_type,
@@ -177,8 +630,350 @@ def get_auto_assignee(tags: list) -> Optional[str]:
             return ASSIGNMENT_RULES[tag_lower]
     return None
 
+# ============ Agent Notification Dispatcher ============
+# Request handlers only enqueue. A fixed pool of workers delivers each message
+# through the agent's transport (CLI process, worker pool or remote HTTP) and waits
+# for it, so a burst of notifications can't fork an unbounded number of processes.
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "4"))
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "300"))  # Seconds before a delivery is abandoned
+
+class NotificationDispatcher:
+    """Bounded queue of agent notifications drained by a pool of delivery workers."""
+
+    def __init__(self, workers: int, queue_size: int):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.workers: list = []
+        self.in_flight = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.run_seconds: deque = deque(maxlen=500)   # Delivery time, recent notifications
+        self.wait_seconds: deque = deque(maxlen=500)  # Time spent queued, recent notifications
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+        self.loop = None
+
+    def free_slots(self) -> int:
+        return self.queue_size - self.queue.qsize() if self.queue else 0
+
+    def submit(self, agent_id: str, message: str, label: str = "notification", on_result=None) -> bool:
+        """Queue a message for an agent. Never blocks; returns False if it was dropped.
+
+        `on_result(error)` is called once delivery finishes, with None on success;
+        if it returns a coroutine, the worker awaits it.
+        """
+        if self.queue is None:
+            print(f"Notification dispatcher not running, dropped {label} for agent {agent_id}")
+            return False
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is not self.loop:
+            # Called from a threadpool endpoint - hand off to the event loop
+            self.loop.call_soon_threadsafe(self._put, agent_id, message, label, on_result)
+            return True
+        return self._put(agent_id, message, label, on_result)
+
+    def _put(self, agent_id: str, message: str, label: str, on_result=None) -> bool:
+        try:
+            self.queue.put_nowait((agent_id, message, label, time.monotonic(), on_result))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"Notification queue full, dropped {label} for agent {agent_id}")
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            agent_id, message, label, queued_at, on_result = await self.queue.get()
+            self.wait_seconds.append(time.monotonic() - queued_at)
+            self.in_flight += 1
+            error = None
+            try:
+                error = await self._run(agent_id, message)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                error = f"Timed out after {NOTIFY_TIMEOUT:.0f}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+            if error is None:
+                self.succeeded += 1
+                print(f"Sent {label} to agent {agent_id}")
+            else:
+                self.failed += 1
+                print(f"Failed to send {label} to agent {agent_id}: {error}")
+            if on_result:
+                try:
+                    result = on_result(error)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    print(f"Failed to record result of {label} for agent {agent_id}: {e}")
+
+    async def _run(self, agent_id: str, message: str) -> Optional[str]:
+        started = time.monotonic()
+        error = await transport_for(agent_id).notify(agent_id, message, NOTIFY_TIMEOUT)
+        self.run_seconds.append(time.monotonic() - started)
+        return error
+
+    def stats(self) -> dict:
+        def percentiles(samples) -> dict:
+            ordered = sorted(samples)
+            if not ordered:
+                return {"p50": None, "p95": None, "max": None}
+            pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+            return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 3)}
+
+        return {
+            "workers": self.worker_count,
+            "queue_capacity": self.queue_size,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "run_seconds": percentiles(self.run_seconds),
+            "queue_wait_seconds": percentiles(self.wait_seconds),
+        }
+
+notification_dispatcher = NotificationDispatcher(NOTIFY_WORKERS, NOTIFY_QUEUE_SIZE)
+
+# ============ Notification Outbox ============
+# Notifications are staged as notification_outbox rows in the caller's
+# transaction, so they commit (or roll back) with the change that caused them.
+# The outbox worker feeds due rows to the dispatcher and retries failures with
+# exponential backoff until NOTIFY_MAX_ATTEMPTS, then marks them DEAD.
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "6"))
+NOTIFY_RETRY_BASE = float(os.getenv("NOTIFY_RETRY_BASE", "5"))  # Seconds before the first retry, doubled each time
+NOTIFY_RETRY_MAX = float(os.getenv("NOTIFY_RETRY_MAX", "600"))
+NOTIFY_OUTBOX_POLL = float(os.getenv("NOTIFY_OUTBOX_POLL", "5"))  # Seconds between scans for due retries
+NOTIFY_OUTBOX_RETENTION_DAYS = int(os.getenv("NOTIFY_OUTBOX_RETENTION_DAYS", "7"))
+NOTIFY_OUTBOX_PRUNE_INTERVAL = float(os.getenv("NOTIFY_OUTBOX_PRUNE_INTERVAL", "3600"))  # Seconds between prunes
+# Notifications for the same agent within this window (seconds, 0 disables) are
+# folded into one digest message, so a burst costs one agent session, not one per event
+NOTIFY_DIGEST_WINDOW = float(os.getenv("NOTIFY_DIGEST_WINDOW", "10"))
+NOTIFY_DIGEST_MAX = int(os.getenv("NOTIFY_DIGEST_MAX", "20"))  # Notifications per digest; a full digest goes out at once
+
+def enqueue_notification(db: Session, agent_id: str, message: str, label: str):
+    """Stage an agent notification in the caller's transaction; it is sent once that commits."""
+    db.add(NotificationOutbox(agent_id=agent_id, message=message, label=label))
+    db.info["outbox_pending"] = True
+
+def retry_delay(attempts: int) -> float:
+    return min(NOTIFY_RETRY_MAX, NOTIFY_RETRY_BASE * 2 ** (attempts - 1))
+
+def build_digest(rows: list) -> str:
+    """One message covering several notifications for the same agent, oldest first."""
+    if len(rows) == 1:
+        return rows[0].message
+    parts = [f"📬 {len(rows)} ClawController updates for you. Handle each one below."]
+    for i, row in enumerate(rows, 1):
+        label = row.label or "notification"
+        parts.append(f"---\n\n### {i}. {label[:1].upper()}{label[1:]}\n\n{row.message}")
+    return "\n\n".join(parts)
+
+class OutboxWorker:
+    """Feeds due outbox rows to the notification dispatcher and records each outcome."""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        self.in_flight: set = set()  # Outbox ids handed to the dispatcher, not yet resolved
+        self.digests = 0  # Messages that folded more than one notification
+        self.digested = 0  # Notifications delivered inside those digests
+        self.pruned_at = time.monotonic()  # startup() prunes once before the worker starts
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        self.loop = None
+
+    def wake(self):
+        """Drain now instead of at the next poll (safe from any thread)."""
+        if self.loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.wakeup.set()
+        else:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    async def _run(self):
+        while True:
+            self.wakeup.clear()
+            timeout = NOTIFY_OUTBOX_POLL
+            try:
+                next_ready = await self.drain()
+                if next_ready is not None:
+                    timeout = min(timeout, next_ready)
+            except Exception as e:
+                print(f"Notification outbox drain failed: {e}")
+            if time.monotonic() - self.pruned_at >= NOTIFY_OUTBOX_PRUNE_INTERVAL:
+                self.pruned_at = time.monotonic()
+                try:
+                    await asyncio.to_thread(prune_notification_outbox)
+                except Exception as e:
+                    print(f"Notification outbox prune failed: {e}")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> Optional[float]:
+        """Hand due PENDING rows to the dispatcher as one digest per agent.
+
+        Returns the seconds until the next held digest window closes, if any.
+        Database work runs in a thread so a locked database can't stall the loop.
+        """
+        free = notification_dispatcher.free_slots()
+        if free <= 0:
+            return None
+        rows = await asyncio.to_thread(self._due_rows, set(self.in_flight), free * NOTIFY_DIGEST_MAX)
+
+        by_agent: dict = {}
+        for row in rows:
+            by_agent.setdefault(row.agent_id, []).append(row)
+
+        now = datetime.utcnow()
+        next_ready = None
+        for agent_id, agent_rows in by_agent.items():
+            for start in range(0, len(agent_rows), NOTIFY_DIGEST_MAX):
+                chunk = agent_rows[start:start + NOTIFY_DIGEST_MAX]
+                if len(chunk) < NOTIFY_DIGEST_MAX and NOTIFY_DIGEST_WINDOW > 0:
+                    ready_in = NOTIFY_DIGEST_WINDOW - (now - chunk[0].created_at).total_seconds()
+                    if ready_in > 0:
+                        # Window still open: let more notifications for this agent fold in
+                        next_ready = ready_in if next_ready is None else min(next_ready, ready_in)
+                        continue
+                if free <= 0:
+                    return next_ready
+                if self._submit(agent_id, chunk):
+                    free -= 1
+        return next_ready
+
+    def _due_rows(self, exclude_ids: set, limit: int) -> list:
+        db = SessionLocal()
+        try:
+            return (
+                db.query(NotificationOutbox)
+                .filter(NotificationOutbox.status == NotificationStatus.PENDING,
+                        NotificationOutbox.next_attempt_at <= datetime.utcnow(),
+                        NotificationOutbox.id.notin_(exclude_ids))
+                .order_by(NotificationOutbox.created_at, NotificationOutbox.id)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def _submit(self, agent_id: str, rows: list) -> bool:
+        ids = [row.id for row in rows]
+        label = rows[0].label if len(rows) == 1 else f"digest of {len(rows)} notifications"
+        on_result = lambda error: self.record_result(ids, error)
+        if not notification_dispatcher.submit(agent_id, build_digest(rows), label, on_result=on_result):
+            return False
+        self.in_flight.update(ids)
+        if len(rows) > 1:
+            self.digests += 1
+        return True
+
+    async def record_result(self, outbox_ids: list, error: Optional[str]):
+        """Record one delivery attempt for every notification in a message."""
+        if error is None and len(outbox_ids) > 1:
+            self.digested += len(outbox_ids)
+        try:
+            await asyncio.to_thread(self._record_attempt, outbox_ids, error)
+        finally:
+            # Only now, so the next drain can't pick the rows up again before they're updated
+            self.in_flight.difference_update(outbox_ids)
+
+    def _record_attempt(self, outbox_ids: list, error: Optional[str]):
+        db = SessionLocal()
+        try:
+            for row in db.query(NotificationOutbox).filter(NotificationOutbox.id.in_(outbox_ids)):
+                row.attempts += 1
+                row.last_error = error
+                if error is None:
+                    row.status = NotificationStatus.DELIVERED
+                    row.delivered_at = datetime.utcnow()
+                elif row.attempts >= NOTIFY_MAX_ATTEMPTS:
+                    row.status = NotificationStatus.DEAD
+                    print(f"Gave up on {row.label} for agent {row.agent_id} after {row.attempts} attempts")
+                else:
+                    row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(row.attempts))
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "outbox_in_flight": len(self.in_flight),
+            "digest_window": NOTIFY_DIGEST_WINDOW,
+            "digests": self.digests,
+            "digested": self.digested,
+        }
+
+outbox_worker = OutboxWorker()
+
+@event.listens_for(SessionLocal, "after_commit")
+def wake_outbox_worker(session):
+    if session.info.pop("outbox_pending", False):
+        outbox_worker.wake()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def discard_outbox_flag(session):
+    session.info.pop("outbox_pending", None)
+
+def prune_notification_outbox():
+    """Drop DELIVERED and DEAD rows past the retention window (PENDING rows are never dropped)."""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=NOTIFY_OUTBOX_RETENTION_DAYS)
+        db.query(NotificationOutbox).filter(or_(
+            and_(NotificationOutbox.status == NotificationStatus.DELIVERED, NotificationOutbox.delivered_at < cutoff),
+            and_(NotificationOutbox.status == NotificationStatus.DEAD, NotificationOutbox.created_at < cutoff),
+        )).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
 # Helper to notify main agent when task is completed
-def notify_task_completed(task, completed_by: str = None):
+def notify_task_completed(db: Session, task, completed_by: str = None):
     """Notify main agent when a task is marked DONE."""
     agent_name = completed_by or task.assignee_id or "Unknown"
     
@@ -190,19 +985,10 @@ def notify_task_completed(task, completed_by: str = None):
 
 View in ClawController: http://localhost:5001"""
 
-    try:
-        subprocess.Popen(
-            ["openclaw", "agent", "--agent", "main", "--message", message],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            cwd=str(Path.home())
-        )
-        print(f"Notified main agent of task completion: {task.title}")
-    except Exception as e:
-        print(f"Failed to notify main agent of completion: {e}")
+    enqueue_notification(db, "main", message, f"completion of '{task.title}'")
 
 # Helper to notify reviewer when task needs review
-def notify_reviewer(task, submitted_by: str = None):
+def notify_reviewer(db: Session, task, submitted_by: str = None):
     """Notify reviewer when a task is submitted for review."""
     reviewer = task.reviewer or 'main'
     agent_name = submitted_by or task.assignee_id or "Unknown"
@@ -220,19 +1006,10 @@ def notify_reviewer(task, submitted_by: str = None):
 
 View in ClawController: http://localhost:5001/tasks/{task.id}"""
 
-    try:
-        subprocess.Popen(
-            ["openclaw", "agent", "--agent", reviewer_agent, "--message", message],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            cwd=str(Path.home())
-        )
-        print(f"Notified reviewer {reviewer_agent} of task needing review: {task.title}")
-    except Exception as e:
-        print(f"Failed to notify reviewer {reviewer_agent}: {e}")
+    enqueue_notification(db, reviewer_agent, message, f"review request for '{task.title}'")
 
 # Helper to notify agent when their task is rejected
-def notify_task_rejected(task, feedback: str = None, rejected_by: str = None):
+def notify_task_rejected(db: Session, task, feedback: str = None, rejected_by: str = None):
     """Notify agent when their task is rejected and sent back."""
     if not task.assignee_id:
         return
@@ -252,19 +1029,10 @@ curl -X POST http://localhost:8000/api/tasks/{task.id}/activity -H "Content-Type
 
 View in ClawController: http://localhost:5001"""
 
-    try:
-        subprocess.Popen(
-            ["openclaw", "agent", "--agent", task.assignee_id, "--message", message],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            cwd=str(Path.home())
-        )
-        print(f"Notified agent {task.assignee_id} of task rejection: {task.title}")
-    except Exception as e:
-        print(f"Failed to notify agent {task.assignee_id} of rejection: {e}")
+    enqueue_notification(db, task.assignee_id, message, f"rejection of '{task.title}'")
 
 # Helper to notify agent when task is assigned
-def notify_agent_of_task(task):
+def notify_agent_of_task(db: Session, task):
     """Notify agent via OpenClaw when a task is assigned to them."""
     if not task.assignee_id:
         return
@@ -286,39 +1054,105 @@ curl -X POST http://localhost:8000/api/tasks/{task.id}/activity -H "Content-Type
 ## When Complete
 Post an activity with 'completed' or 'done' in the message - the system will auto-transition to REVIEW."""
 
-    try:
-        subprocess.Popen(
-            ["openclaw", "agent", "--agent", task.assignee_id, "--message", message],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            cwd=str(Path.home())
-        )
-        print(f"Notified agent {task.assignee_id} of task: {task.title}")
-    except Exception as e:
-        print(f"Failed to notify agent {task.assignee_id}: {e}")
+    enqueue_notification(db, task.assignee_id, message, f"assignment of '{task.title}'")
 
 # Startup
 @app.on_event("startup")
 async def startup():
+    manager.loop = asyncio.get_running_loop()
+    openclaw_config.start()
     init_db()
+    prune_task_changes()
+    task_change_pruner.start()
+    prune_notification_outbox()
+    notification_dispatcher.start()
+    outbox_worker.start()
+    gateway_clients.start()
+    remote_health.start()
+    agent_status_engine.start()
+    session_tailer.start()
+    await local_transport.start()
     print("ClawController API started")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await chat_jobs.cancel_all()
+    await task_change_pruner.stop()
+    await outbox_worker.stop()
+    await notification_dispatcher.stop()
+    await local_transport.close()
+    await remote_health.stop()
+    await session_tailer.stop()
+    await agent_status_engine.stop()
+    await gateway_clients.close()
+    openclaw_config.stop()
+
+@app.get("/api/notifications/stats")
+def get_notification_stats():
+    """Agent notification queue depth, outcomes, latency and digest folding."""
+    return {**notification_dispatcher.stats(), **outbox_worker.stats()}
+
+@app.get("/api/notifications/outbox")
+def get_notification_outbox(response: Response, status: Optional[str] = None, agent_id: Optional[str] = None,
+                            limit: int = 50, before: Optional[str] = None, after: Optional[str] = None,
+                            db: Session = Depends(get_db)):
+    """Admin listing of outbox rows, newest first. Filter by status (PENDING, DELIVERED, DEAD) or agent."""
+    query = db.query(NotificationOutbox, Agent).outerjoin(Agent, NotificationOutbox.agent_id == Agent.id)
+    if status:
+        try:
+            query = query.filter(NotificationOutbox.status == NotificationStatus(status.upper()))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Unknown status '{status}'")
+    if agent_id:
+        query = query.filter(NotificationOutbox.agent_id == agent_id)
+    rows, next_cursor = keyset_page(query, NotificationOutbox.created_at, NotificationOutbox.id, limit, before, after)
+    set_next_cursor(response, next_cursor)
+    counts = dict(db.query(NotificationOutbox.status, func.count()).group_by(NotificationOutbox.status).all())
+    return {
+        "counts": {s.value: counts.get(s, 0) for s in NotificationStatus},
+        "items": [{
+            "id": n.id,
+            "agent_id": n.agent_id,
+            "agent_name": agent.name if agent else None,
+            "label": n.label,
+            "status": n.status.value,
+            "attempts": n.attempts,
+            "next_attempt_at": n.next_attempt_at.isoformat() if n.status == NotificationStatus.PENDING else None,
+            "last_error": n.last_error,
+            "created_at": n.created_at.isoformat(),
+            "delivered_at": n.delivered_at.isoformat() if n.delivered_at else None,
+        } for n, agent in rows],
+    }
+
 # WebSocket endpoint
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, resume_from: Optional[int] = None):
+    await manager.connect(websocket, resume_from)
     try:
         while True:
             data = await websocket.receive_text()
-            # Handle incoming messages if needed
-    except WebSocketDisconnect:
+            await manager.handle_client_message(websocket, data)
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # RuntimeError: the server already closed this socket (slow consumer)
+    finally:
         manager.disconnect(websocket)
 
+@app.get("/api/ws/stats")
+def get_websocket_stats():
+    """Outbound queue depth, drop counters and per-client send stats."""
+    return manager.stats()
+
 # Agent endpoints
 @app.get("/api/agents", response_model=List[AgentResponse])
 def get_agents(db: Session = Depends(get_db)):
     return db.query(Agent).all()
 
+# Before /api/agents/{agent_id}, which would otherwise take "mentions" for an id
+@app.get("/api/agents/mentions")
+def get_agent_mentions(prefix: str = "", limit: int = 10, db: Session = Depends(get_db)):
+    """@mention autocomplete: agents whose id, name, name word or alias starts with `prefix`."""
+    return mention_index.complete(prefix, db, max(1, min(limit, 50)))
+
 @app.get("/api/agents/{agent_id}", response_model=AgentResponse)
 def get_agent(agent_id: str, db: Session = Depends(get_db)):
     agent = db.query(Agent).filter(Agent.id == agent_id).first()
@@ -332,49 +1166,838 @@ async def update_agent_status(agent_id: str, status: str, db: Session = Depends(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     agent.status = AgentStatus(status)
+    queue_broadcast(db, {"type": "agent_status", "data": {"id": agent_id, "status": status}})
     db.commit()
-    await manager.broadcast({"type": "agent_status", "data": {"id": agent_id, "status": status}})
     return {"ok": True}
 
 # ============ OpenClaw Integration ============
+# openclaw.json is parsed once and shared by every reader. On Linux an inotify watch
+# on ~/.openclaw marks it stale the moment it changes; elsewhere readers re-stat it
+# (mtime and size) at most every OPENCLAW_CONFIG_CHECK_INTERVAL seconds.
+OPENCLAW_CONFIG_CHECK_INTERVAL = float(os.getenv("OPENCLAW_CONFIG_CHECK_INTERVAL", "2"))
+
+# inotify(7) event bits: anything that can replace or rewrite a file in the directory
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_FILE_CHANGES = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+class Inotify:
+    """Non-blocking inotify instance over ctypes. `Inotify.open()` returns None off Linux."""
+
+    def __init__(self, libc, fd: int):
+        self.libc = libc
+        self.fd = fd
+
+    @classmethod
+    def open(cls) -> Optional["Inotify"]:
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable: {e}")
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def add_watch(self, path: Path, mask: int) -> Optional[int]:
+        wd = self.libc.inotify_add_watch(self.fd, str(path).encode(), mask)
+        return wd if wd >= 0 else None
+
+    def rm_watch(self, wd: int):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> list:
+        """Drain pending events as (wd, mask, name) tuples."""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except OSError:  # BlockingIOError once drained
+                break
+            if not buf:
+                break
+            offset = 0
+            while offset + 16 <= len(buf):
+                wd, mask, _cookie, length = struct.unpack_from("iIII", buf, offset)
+                name = buf[offset + 16:offset + 16 + length].rstrip(b"\0").decode(errors="replace")
+                events.append((wd, mask, name))
+                offset += 16 + length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class OpenClawConfigRegistry:
+    """In-memory openclaw.json with agent lookups by id and remote flag (names: MentionIndex).
+
+    Readers get the shared parsed objects and must not modify them; edits go
+    through `openclaw_writer`, which hands the written config back via `publish()`.
+    """
 
-def get_agent_status_from_sessions(agent_id: str) -> str:
-    """Determine agent status from session file activity."""
-    home = Path.home()
-    sessions_dir = home / ".openclaw" / "agents" / agent_id / "sessions"
-    
-    if not sessions_dir.exists():
-        return "STANDBY"  # Configured but never activated - ready to go
-    
-    # Find the most recently modified session file
-    session_files = list(sessions_dir.glob("*.jsonl"))
-    if not session_files:
-        return "STANDBY"  # Configured but no sessions yet - ready to go
-    
-    # Get the most recent modification time
-    latest_mtime = 0
-    for f in session_files:
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.config: Optional[dict] = None
+        self.error: Optional[str] = None   # Parse error of the current file, if any
+        self.stamp = None                  # (mtime_ns, size) the cache was built from
+        self.checked_at = 0.0
+        self.stale = True
+        self.listed: list = []             # Agents with an id, in config order
+        self.by_id: dict = {}
+        self.remote: list = []             # Agents with a remote api_url, in config order
+        self.inotify: Optional[Inotify] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reloads = 0
+        self.checks = 0
+
+    def _refresh(self, force: bool = False):
+        with self.lock:
+            now = time.monotonic()
+            if not (force or self.stale):
+                # With a watch, inotify says when to look; without one, poll the stamp
+                if self.inotify is not None or now - self.checked_at < OPENCLAW_CONFIG_CHECK_INTERVAL:
+                    return
+            self.stale = False
+            self.checked_at = now
+            self.checks += 1
+            try:
+                st = self.path.stat()
+                stamp = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamp = None
+            if stamp == self.stamp and not force:
+                return
+            config, error = None, None
+            if stamp is not None:
+                try:
+                    with open(self.path) as f:
+                        config = json.load(f)
+                except Exception as e:
+                    error = str(e)
+            self._index(config)
+            self.config, self.error, self.stamp = config, error, stamp
+            self.reloads += 1
+
+    def _index(self, config: Optional[dict]):
+        listed, by_id, remote = [], {}, []
+        agents = (config or {}).get("agents", {}).get("list", []) if isinstance(config, dict) else []
+        for agent in agents:
+            agent_id = agent.get("id")
+            if not agent_id:
+                continue
+            listed.append(agent)
+            by_id.setdefault(agent_id, agent)
+            if (agent.get("remote") or {}).get("api_url"):
+                remote.append(agent)
+        self.listed, self.by_id, self.remote = listed, by_id, remote
+
+    def invalidate(self):
+        """Re-check the file on next access."""
+        self.stale = True
+
+    def publish(self, config: dict, stamp):
+        """Adopt a config we just wrote as (mtime_ns, size) `stamp`, without re-reading it."""
+        with self.lock:
+            self._index(config)
+            self.config, self.error, self.stamp = config, None, stamp
+            self.checked_at = time.monotonic()
+
+    def exists(self) -> bool:
+        self._refresh()
+        return self.stamp is not None
+
+    def get(self) -> Optional[dict]:
+        """Parsed config, or None if the file is missing or unparseable."""
+        self._refresh()
+        return self.config
+
+    def require(self) -> dict:
+        """Parsed config, or the 404/500 the agent endpoints answer with."""
+        self._refresh()
+        if self.stamp is None:
+            raise HTTPException(status_code=404, detail="OpenClaw config not found")
+        if self.config is None:
+            raise HTTPException(status_code=500, detail=f"Failed to parse OpenClaw config: {self.error}")
+        return self.config
+
+    def copy(self) -> dict:
+        """Private copy of the current file for read-modify-write."""
+        self._refresh(force=True)
+        return copy.deepcopy(self.require())
+
+    def agents(self) -> list:
+        self._refresh()
+        return list(self.listed)
+
+    def agent(self, agent_id: str) -> Optional[dict]:
+        self._refresh()
+        return self.by_id.get(agent_id)
+
+    def remote_agents(self) -> list:
+        self._refresh()
+        return list(self.remote)
+
+    def start(self):
+        """Watch ~/.openclaw with inotify where the platform has it."""
+        self.loop = asyncio.get_running_loop()
+        inotify = Inotify.open()
+        if inotify is None:
+            return
+        if inotify.add_watch(self.path.parent, IN_FILE_CHANGES) is None:
+            inotify.close()  # No ~/.openclaw yet: fall back to polling
+            return
+        self.loop.add_reader(inotify.fd, self._on_change)
+        self.inotify = inotify
+        self.stale = True
+
+    def _on_change(self):
+        self.inotify.read()
+        self.stale = True
+
+    def stop(self):
+        if self.inotify is None:
+            return
+        self.loop.remove_reader(self.inotify.fd)
+        self.inotify.close()
+        self.inotify = None
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "exists": self.stamp is not None,
+            "error": self.error,
+            "agents": len(self.listed),
+            "remote_agents": len(self.remote),
+            "watch": "inotify" if self.inotify is not None else f"stat every {OPENCLAW_CONFIG_CHECK_INTERVAL:g}s",
+            "reloads": self.reloads,
+            "checks": self.checks,
+        }
+
+openclaw_config = OpenClawConfigRegistry(Path.home() / ".openclaw" / "openclaw.json")
+
+# Edits to openclaw.json arriving within OPENCLAW_WRITE_WINDOW seconds of each other
+# are applied together and written once.
+OPENCLAW_WRITE_WINDOW = float(os.getenv("OPENCLAW_WRITE_WINDOW", "0.05"))
+
+class OpenClawConfigWriter:
+    """Serialized read-modify-write of openclaw.json.
+
+    `update(mutate)` queues a function that edits the config dict in place. The first
+    caller of a burst waits out the write window, then takes the file lock, re-reads
+    the file, applies every queued edit in order, writes a temp file, fsyncs it and
+    renames it over openclaw.json. The result is handed to the registry directly.
+    An edit that raises fails on its own and leaves the others in the batch intact.
+    """
+
+    def __init__(self, registry: OpenClawConfigRegistry, window: float):
+        self.registry = registry
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending: list = []
+        self.writing = False
+        self.writes = 0
+        self.mutations = 0
+        self.failed = 0
+
+    def update(self, mutate):
+        """Apply `mutate(config)` to openclaw.json and return what it returns."""
+        item = {"mutate": mutate, "done": threading.Event(), "result": None, "error": None}
+        with self.lock:
+            self.pending.append(item)
+            leader = not self.writing
+            self.writing = True
+        if leader:
+            time.sleep(self.window)  # Let concurrent edits queue up behind this one
+            self._drain()
+        item["done"].wait()
+        if item["error"] is not None:
+            raise item["error"]
+        return item["result"]
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                batch, self.pending = self.pending, []
+                if not batch:
+                    self.writing = False
+                    return
+            try:
+                self._write(batch)
+            finally:
+                for item in batch:
+                    item["done"].set()
+
+    def _write(self, batch: list):
+        applied = []
         try:
-            mtime = f.stat().st_mtime
-            if mtime > latest_mtime:
-                latest_mtime = mtime
-        except:
-            continue
-    
-    if latest_mtime == 0:
-        return "STANDBY"
-    
-    # Calculate time since last activity
-    now = time.time()
-    elapsed_seconds = now - latest_mtime
-    
-    # Status thresholds
-    if elapsed_seconds < 300:  # 5 minutes
+            with self._file_lock():
+                config = self.registry.copy()  # Fresh from disk, under the lock
+                for item in batch:
+                    candidate = copy.deepcopy(config)
+                    try:
+                        item["result"] = item["mutate"](candidate)
+                    except Exception as e:
+                        item["error"] = e
+                        continue
+                    config = candidate
+                    applied.append(item)
+                if applied:
+                    self.registry.publish(config, self._replace(config))
+                    self.writes += 1
+                    self.mutations += len(applied)
+        except HTTPException as e:
+            self._fail(batch, e)
+        except Exception as e:
+            self._fail(batch, HTTPException(status_code=500, detail=f"Failed to write config: {str(e)}"))
+
+    def _fail(self, batch: list, error: HTTPException):
+        for item in batch:
+            if item["error"] is None:
+                item["error"] = error
+                self.failed += 1
+
+    @contextmanager
+    def _file_lock(self):
+        """Advisory lock shared with other ClawController processes (no-op without fcntl)."""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(self.registry.path.with_name(self.registry.path.name + ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _replace(self, config: dict):
+        """Write atomically; returns the new file's (mtime_ns, size)."""
+        path = self.registry.path
+        fd, tmp_path = tempfile.mkstemp(prefix=".openclaw.json.", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(tmp_path, path.stat().st_mode & 0o777)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        try:
+            dir_fd = os.open(str(path.parent), os.O_RDONLY)
+        except OSError:
+            dir_fd = None  # Platforms without directory fds
+        if dir_fd is not None:
+            try:
+                os.fsync(dir_fd)
+            except OSError:
+                pass
+            finally:
+                os.close(dir_fd)
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    def stats(self) -> dict:
+        return {
+            "write_window": self.window,
+            "writes": self.writes,
+            "mutations": self.mutations,
+            "failed_mutations": self.failed,
+        }
+
+openclaw_writer = OpenClawConfigWriter(openclaw_config, OPENCLAW_WRITE_WINDOW)
+
+@app.get("/api/openclaw/config/stats")
+def get_openclaw_config_stats():
+    """Config registry and writer state: agents indexed, reloads, writes and how changes are detected."""
+    return {**openclaw_config.stats(), **openclaw_writer.stats()}
+
+# ============ Agent Status Engine ============
+# Status comes from the newest session file under ~/.openclaw/agents/<id>/sessions.
+# The latest mtime per agent is kept in memory: inotify reports writes as they happen,
+# and without it the session directories are re-scanned incrementally (directory
+# mtime for new files, plus a stat of the newest file) every AGENT_STATUS_SCAN_INTERVAL
+# seconds; writes to older session files are picked up by the full rescan every
+# AGENT_STATUS_FULL_SCAN seconds. Every AGENT_STATUS_TICK seconds statuses are recomputed against the
+# WORKING/IDLE thresholds and changes go out as agent_status events.
+AGENT_STATUS_TICK = float(os.getenv("AGENT_STATUS_TICK", "5"))
+AGENT_STATUS_SCAN_INTERVAL = float(os.getenv("AGENT_STATUS_SCAN_INTERVAL", "30"))
+AGENT_STATUS_FULL_SCAN = float(os.getenv("AGENT_STATUS_FULL_SCAN", "600"))  # Safety-net rescan of every file
+AGENT_WORKING_SECONDS = 300   # 5 minutes since the last session write
+AGENT_IDLE_SECONDS = 1800     # 30 minutes
+
+def session_status(latest_mtime: float, now: Optional[float] = None) -> str:
+    """WORKING/IDLE/STANDBY for the newest session file's mtime (0 = no sessions)."""
+    if not latest_mtime:
+        return "STANDBY"  # Configured but never activated - ready to go
+    elapsed_seconds = (now or time.time()) - latest_mtime
+    if elapsed_seconds < AGENT_WORKING_SECONDS:
         return "WORKING"
-    elif elapsed_seconds < 1800:  # 30 minutes
+    elif elapsed_seconds < AGENT_IDLE_SECONDS:
         return "IDLE"
-    else:
-        return "STANDBY"  # Has sessions but inactive - ready to be activated
+    return "STANDBY"  # Has sessions but inactive - ready to be activated
+
+class AgentSessions:
+    """What the engine knows about one agent's session directory."""
+
+    def __init__(self, sessions_dir: Path):
+        self.dir = sessions_dir
+        self.dir_stamp = None       # mtime_ns of the directory when last listed
+        self.names: set = set()     # *.jsonl files seen in the last listing
+        self.latest = 0.0           # Newest session file mtime
+        self.latest_name: Optional[str] = None
+        self.dirty: set = set()     # Files written since the session tailer last caught up
+        self.wd: Optional[int] = None
+        self.status = "STANDBY"
+        self.rescan = False
+        self.scanned_at = 0.0
+        self.full_scan_at = 0.0
+
+class AgentStatusEngine:
+    """Latest session activity per agent, kept current by inotify or incremental scans."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.lock = threading.Lock()
+        self.agents: dict = {}      # agent_id -> AgentSessions
+        self.by_wd: dict = {}       # inotify watch descriptor -> agent_id
+        self.inotify: Optional[Inotify] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.scans = 0
+        self.files_statted = 0
+        self.published = 0
+
+    def status(self, agent_id: str) -> str:
+        """Session-activity status, from memory once the agent has been scanned."""
+        sessions = self._track(agent_id)
+        with self.lock:
+            return session_status(sessions.latest)
+
+    def _track(self, agent_id: str) -> AgentSessions:
+        with self.lock:
+            sessions = self.agents.get(agent_id)
+            if sessions is not None:
+                return sessions
+            sessions = self.agents[agent_id] = AgentSessions(self.root / agent_id / "sessions")
+        self._scan(sessions, full=True)
+        with self.lock:
+            sessions.status = session_status(sessions.latest)
+        self._watch(agent_id, sessions)
+        return sessions
+
+    def _watch(self, agent_id: str, sessions: AgentSessions):
+        if self.inotify is None or sessions.wd is not None:
+            return
+        wd = self.inotify.add_watch(sessions.dir, IN_FILE_CHANGES)
+        if wd is not None:  # No sessions directory yet: scanned until it appears
+            sessions.wd = wd
+            self.by_wd[wd] = agent_id
+
+    def _scan(self, sessions: AgentSessions, full: bool = False):
+        """List the directory if it changed (or `full`), then stat new files and the newest one."""
+        self.scans += 1
+        now = time.monotonic()
+        try:
+            dir_stamp = sessions.dir.stat().st_mtime_ns
+        except OSError:
+            with self.lock:
+                sessions.dir_stamp, sessions.names, sessions.latest, sessions.latest_name = None, set(), 0.0, None
+                sessions.scanned_at = sessions.full_scan_at = now
+            return
+        names, latest, latest_name = sessions.names, 0.0, None
+        if full or dir_stamp != sessions.dir_stamp:
+            try:
+                listed = {e.name for e in os.scandir(sessions.dir) if e.name.endswith(".jsonl")}
+            except OSError:
+                listed = set()
+            to_stat = listed if full else listed - sessions.names
+            names = listed
+        else:
+            to_stat = set()
+        if not full and sessions.latest_name in names:
+            to_stat = to_stat | {sessions.latest_name}  # Appends don't touch the directory mtime
+        for name in to_stat:
+            try:
+                mtime = (sessions.dir / name).stat().st_mtime
+            except OSError:
+                continue
+            self.files_statted += 1
+            if mtime > latest:
+                latest, latest_name = mtime, name
+        with self.lock:
+            sessions.dir_stamp, sessions.names = dir_stamp, names
+            sessions.dirty |= to_stat
+            if full:
+                sessions.latest, sessions.latest_name = latest, latest_name
+                sessions.full_scan_at = now
+            elif latest > sessions.latest:
+                sessions.latest, sessions.latest_name = latest, latest_name
+            sessions.scanned_at = now
+            sessions.rescan = False
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.inotify = Inotify.open()
+        if self.inotify is not None:
+            self.loop.add_reader(self.inotify.fd, self._on_events)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.inotify is not None:
+            self.loop.remove_reader(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+            self.by_wd = {}
+            for sessions in self.agents.values():
+                sessions.wd = None
+
+    def _on_events(self):
+        """Fold inotify events into the in-memory mtimes (one stat per touched file)."""
+        for wd, mask, name in self.inotify.read():
+            self.events += 1
+            if mask & IN_Q_OVERFLOW:
+                with self.lock:
+                    for sessions in self.agents.values():
+                        sessions.rescan = True
+                continue
+            agent_id = self.by_wd.get(wd)
+            sessions = self.agents.get(agent_id) if agent_id else None
+            if sessions is None or not name.endswith(".jsonl"):
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                sessions.rescan = sessions.rescan or name == sessions.latest_name
+                continue
+            try:
+                mtime = (sessions.dir / name).stat().st_mtime
+            except OSError:
+                continue
+            with self.lock:
+                sessions.names.add(name)
+                sessions.dirty.add(name)
+                if mtime > sessions.latest:
+                    sessions.latest, sessions.latest_name = mtime, name
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(AGENT_STATUS_TICK)
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception as e:
+                print(f"Agent status tick failed: {e}")
+
+    def tick(self):
+        """Scan what needs scanning, then publish threshold crossings."""
+        for agent in openclaw_config.agents():
+            self._track(agent["id"])
+        now = time.monotonic()
+        for agent_id, sessions in list(self.agents.items()):
+            if sessions.rescan or now - sessions.full_scan_at >= AGENT_STATUS_FULL_SCAN:
+                self._scan(sessions, full=True)
+            elif sessions.wd is None and now - sessions.scanned_at >= AGENT_STATUS_SCAN_INTERVAL:
+                self._scan(sessions)
+                self._watch(agent_id, sessions)
+
+        wall_now = time.time()
+        changes = []
+        with self.lock:
+            for agent_id, sessions in self.agents.items():
+                status = session_status(sessions.latest, wall_now)
+                if status != sessions.status:
+                    changes.append((agent_id, status))
+                    sessions.status = status
+        if changes:
+            self._publish(changes)
+
+    def _publish(self, changes: list):
+        # Agents with IN_PROGRESS tasks show as WORKING whatever their sessions say,
+        # so a crossing underneath that doesn't change what clients see
+        db = SessionLocal()
+        try:
+            working_agents = {row[0] for row in db.query(Task.assignee_id).filter(
+                Task.status == TaskStatus.IN_PROGRESS, Task.assignee_id.isnot(None)).distinct()}
+        finally:
+            db.close()
+        for agent_id, status in changes:
+            if agent_id in working_agents:
+                continue
+            manager.publish({"type": "agent_status", "data": {"id": agent_id, "status": status}})
+            self.published += 1
+
+    def stats(self) -> dict:
+        return {
+            "agents": len(self.agents),
+            "watched": len(self.by_wd),
+            "watch": "inotify" if self.inotify is not None else f"scan every {AGENT_STATUS_SCAN_INTERVAL:g}s",
+            "events": self.events,
+            "scans": self.scans,
+            "files_statted": self.files_statted,
+            "status_events_published": self.published,
+        }
+
+agent_status_engine = AgentStatusEngine(Path.home() / ".openclaw" / "agents")
+
+def get_agent_status_from_sessions(agent_id: str) -> str:
+    """Determine agent status from session file activity."""
+    return agent_status_engine.status(agent_id)
+
+@app.get("/api/openclaw/sessions/stats")
+def get_agent_status_engine_stats():
+    """Status engine state: agents tracked, how activity is detected, scan and event counts."""
+    return {**agent_status_engine.stats(), "tailer": session_tailer.stats()}
+
+# ============ Session Log Tailer ============
+# Per-agent activity counters from the session JSONL transcripts. Each file's byte
+# offset is remembered and only lines appended since are parsed; the status engine
+# says which files were written. Appends are read SESSION_TAIL_CHUNK_BYTES at a time,
+# and a background task catches up every SESSION_TAIL_INTERVAL seconds (0 = only on request).
+SESSION_TAIL_CHUNK_BYTES = int(os.getenv("SESSION_TAIL_CHUNK_BYTES", str(256 * 1024)))
+SESSION_TAIL_INTERVAL = float(os.getenv("SESSION_TAIL_INTERVAL", "5"))
+
+TOOL_CALL_PARTS = {"toolCall", "tool_use", "tool_call"}
+
+def new_agent_metrics() -> dict:
+    return {
+        "turns": 0,          # User prompts (tool results fed back don't count)
+        "messages": 0,
+        "tool_calls": 0,
+        "tokens_in": 0,
+        "tokens_out": 0,
+        "tokens_total": 0,
+        "errors": 0,
+        "last_message_at": None,
+        "sessions": 0,
+        "lines": 0,
+        "bad_lines": 0,
+    }
+
+def session_entry_time(entry: dict, message: dict) -> Optional[float]:
+    """Epoch seconds from an ISO string or epoch (s/ms) timestamp, if there is one."""
+    value = message.get("timestamp") or entry.get("timestamp")
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            return (parsed - datetime(1970, 1, 1)).total_seconds()
+        return parsed.timestamp()
+    return None
+
+def count_session_entry(metrics: dict, entry: dict):
+    """Fold one transcript line into the counters.
+
+    Understands OpenClaw's {"type": "message", "message": {...}} entries as well as
+    bare Anthropic/OpenAI-style messages.
+    """
+    message = entry.get("message") if isinstance(entry.get("message"), dict) else entry
+    if entry.get("type") == "error":
+        metrics["errors"] += 1
+    role = message.get("role")
+    if not role:
+        return
+    metrics["messages"] += 1
+    at = session_entry_time(entry, message)
+    if at and (metrics["last_message_at"] is None or at > metrics["last_message_at"]):
+        metrics["last_message_at"] = at
+
+    content = message.get("content")
+    parts = [p for p in content if isinstance(p, dict)] if isinstance(content, list) else []
+    if role == "user" and not (parts and all(p.get("type") == "tool_result" for p in parts)):
+        metrics["turns"] += 1
+    metrics["tool_calls"] += sum(1 for p in parts if p.get("type") in TOOL_CALL_PARTS)
+    if isinstance(message.get("tool_calls"), list):
+        metrics["tool_calls"] += len(message["tool_calls"])
+
+    usage = message.get("usage") or entry.get("usage")
+    if isinstance(usage, dict):
+        tokens_in = usage.get("input") or usage.get("input_tokens") or usage.get("prompt_tokens") or 0
+        tokens_out = usage.get("output") or usage.get("output_tokens") or usage.get("completion_tokens") or 0
+        metrics["tokens_in"] += tokens_in
+        metrics["tokens_out"] += tokens_out
+        metrics["tokens_total"] += usage.get("totalTokens") or usage.get("total_tokens") or tokens_in + tokens_out
+
+    if (message.get("stopReason") == "error" or message.get("stop_reason") == "error"
+            or message.get("errorMessage") or message.get("isError") is True):
+        metrics["errors"] += 1
+
+class TailedFile:
+    """Read position in one session file and the counters its lines contributed."""
+
+    def __init__(self, inode: int):
+        self.inode = inode
+        self.offset = 0           # Just past the last complete line
+        self.metrics = new_agent_metrics()
+
+class SessionLogTailer:
+    """Byte offsets per session file and the counters built from what was read."""
+
+    def __init__(self, engine: AgentStatusEngine):
+        self.engine = engine
+        self.lock = threading.Lock()  # Guards the maps below; never held while reading
+        self.agent_locks: dict = {}   # agent_id -> lock serialising reads of its files
+        self.files: dict = {}         # path -> TailedFile
+        self.agent_files: dict = {}   # agent_id -> paths read so far
+        self.primed: set = set()      # Agents whose transcripts have all been read once
+        self.task: Optional[asyncio.Task] = None
+        self.bytes_read = 0
+        self.chunk_reads = 0
+        self.resets = 0
+
+    def live(self, agent_id: str) -> dict:
+        """Catch up on files written since the last pass and return the agent's counters."""
+        with self._agent_lock(agent_id):
+            self._catch_up(agent_id)
+            return self._totals(agent_id)
+
+    def _agent_lock(self, agent_id: str) -> threading.Lock:
+        with self.lock:
+            return self.agent_locks.setdefault(agent_id, threading.Lock())
+
+    def _catch_up(self, agent_id: str):
+        sessions = self.engine._track(agent_id)
+        with self.engine.lock:
+            # First pass for an agent reads every transcript once; later ones only what changed
+            names = set(sessions.names) if agent_id not in self.primed else sessions.dirty
+            sessions.dirty = set()
+        for name in names:
+            self._tail(agent_id, sessions.dir / name)
+        self.primed.add(agent_id)
+
+    def _totals(self, agent_id: str) -> dict:
+        with self.lock:
+            tailed = [self.files[key] for key in self.agent_files.get(agent_id, ()) if key in self.files]
+        metrics = new_agent_metrics()
+        for state in tailed:
+            for field, value in state.metrics.items():
+                if field == "last_message_at":
+                    if value and (metrics[field] is None or value > metrics[field]):
+                        metrics[field] = value
+                elif field != "sessions":
+                    metrics[field] += value
+        metrics["sessions"] = len(tailed)
+        return metrics
+
+    def _tail(self, agent_id: str, path: Path):
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            with self.lock:
+                self.files.pop(key, None)
+                self.agent_files.get(agent_id, set()).discard(key)
+            return
+        state = self.files.get(key)
+        if state is None or state.inode != st.st_ino or st.st_size < state.offset:
+            if state is not None:
+                self.resets += 1  # Replaced or truncated: drop what the old contents counted
+            state = TailedFile(st.st_ino)
+            with self.lock:
+                self.files[key] = state
+                self.agent_files.setdefault(agent_id, set()).add(key)
+        if st.st_size <= state.offset:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(state.offset)
+            remaining = st.st_size - state.offset
+            pending = b""  # Partial line carried into the next chunk
+            while remaining > 0:
+                chunk = f.read(min(SESSION_TAIL_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                self.chunk_reads += 1
+                data = pending + chunk
+                end = data.rfind(b"\n")
+                if end < 0:
+                    pending = data
+                    continue
+                self._count_lines(state.metrics, data[:end])
+                state.offset += end + 1
+                self.bytes_read += end + 1
+                pending = data[end + 1:]
+
+    @staticmethod
+    def _count_lines(metrics: dict, data: bytes):
+        for line in data.split(b"\n"):
+            if not line.strip():
+                continue
+            metrics["lines"] += 1
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                metrics["bad_lines"] += 1
+                continue
+            if isinstance(entry, dict):
+                count_session_entry(metrics, entry)
+
+    def start(self):
+        if SESSION_TAIL_INTERVAL > 0:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(SESSION_TAIL_INTERVAL)
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception as e:
+                print(f"Session tail pass failed: {e}")
+
+    def tick(self):
+        """Catch up every tracked agent, one agent lock at a time."""
+        for agent_id in list(self.engine.agents):
+            with self._agent_lock(agent_id):
+                self._catch_up(agent_id)
+
+    def stats(self) -> dict:
+        return {
+            "agents": len(self.primed),
+            "files": len(self.files),
+            "bytes_read": self.bytes_read,
+            "chunk_reads": self.chunk_reads,
+            "resets": self.resets,
+            "interval": SESSION_TAIL_INTERVAL,
+        }
+
+session_tailer = SessionLogTailer(agent_status_engine)
+
+@app.get("/api/agents/{agent_id}/live")
+def get_agent_live(agent_id: str, db: Session = Depends(get_db)):
+    """Live activity counters for an agent, from the newly appended part of its session logs."""
+    if not openclaw_config.agent(agent_id) and not db.query(Agent.id).filter(Agent.id == agent_id).first():
+        raise HTTPException(status_code=404, detail="Agent not found")
+    metrics = session_tailer.live(agent_id)
+    last = metrics["last_message_at"]
+    return {
+        "agent_id": agent_id,
+        "status": agent_status_engine.status(agent_id),
+        **metrics,
+        "last_message_at": datetime.utcfromtimestamp(last).isoformat() if last else None,
+    }
 
 class OpenClawAgentResponse(BaseModel):
     id: str
@@ -386,21 +2009,13 @@ class OpenClawAgentResponse(BaseModel):
     emoji: Optional[str] = None
     workspace: Optional[str] = None
     model: Optional[dict] = None
+    remote: bool = False
+    health: Optional[dict] = None  # Remote agents: circuit breaker state and recent outcomes
 
 @app.get("/api/openclaw/agents", response_model=List[OpenClawAgentResponse])
 def get_openclaw_agents(db: Session = Depends(get_db)):
     """Get agents from OpenClaw config with real-time status from session activity."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to parse OpenClaw config: {str(e)}")
+    config = openclaw_config.require()
     
     # Get agents with IN_PROGRESS tasks - they should show as WORKING
     working_agents = set()
@@ -410,13 +2025,10 @@ def get_openclaw_agents(db: Session = Depends(get_db)):
             working_agents.add(task.assignee_id)
     
     agents_config = config.get("agents", {})
-    agent_list = agents_config.get("list", [])
     
     result = []
-    for agent in agent_list:
+    for agent in openclaw_config.agents():
         agent_id = agent.get("id")
-        if not agent_id:
-            continue
         
         # Get real-time status from session files
         status = get_agent_status_from_sessions(agent_id)
@@ -439,6 +2051,8 @@ def get_openclaw_agents(db: Session = Depends(get_db)):
             "main": "Primary orchestrator and squad lead",
         }
         
+        is_remote = bool((agent.get("remote") or {}).get("api_url"))
+
         # Get model - use agent-specific or fall back to default
         agent_model = agent.get("model")
         if not agent_model:
@@ -457,7 +2071,9 @@ def get_openclaw_agents(db: Session = Depends(get_db)):
             status=status,
             emoji=emoji,
             workspace=agent.get("workspace"),
-            model=agent_model
+            model=agent_model,
+            remote=is_remote,
+            health=(remote_health.get(agent_id) or {"state": "unknown"}) if is_remote else None
         ))
     
     return result
@@ -465,12 +2081,9 @@ def get_openclaw_agents(db: Session = Depends(get_db)):
 @app.get("/api/openclaw/status")
 def get_openclaw_status():
     """Check if OpenClaw integration is available."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
     return {
-        "available": config_path.exists(),
-        "config_path": str(config_path)
+        "available": openclaw_config.exists(),
+        "config_path": str(openclaw_config.path)
     }
 
 class ImportAgentsRequest(BaseModel):
@@ -479,20 +2092,7 @@ class ImportAgentsRequest(BaseModel):
 @app.post("/api/openclaw/import")
 async def import_agents_from_openclaw(import_request: ImportAgentsRequest, db: Session = Depends(get_db)):
     """Import selected agents from OpenClaw config into ClawController database."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to parse OpenClaw config: {str(e)}")
-    
-    agents_config = config.get("agents", {})
-    agent_list = agents_config.get("list", [])
+    openclaw_config.require()
     
     imported_agents = []
     skipped_agents = []
@@ -505,11 +2105,7 @@ async def import_agents_from_openclaw(import_request: ImportAgentsRequest, db: S
             continue
         
         # Find agent in config
-        agent_config = None
-        for agent in agent_list:
-            if agent.get("id") == agent_id:
-                agent_config = agent
-                break
+        agent_config = openclaw_config.agent(agent_id)
         
         if not agent_config:
             skipped_agents.append({"id": agent_id, "reason": "Not found in OpenClaw config"})
@@ -562,27 +2158,26 @@ async def import_agents_from_openclaw(import_request: ImportAgentsRequest, db: S
             "status": agent_status.value
         })
     
+    # Log activity for each imported agent
+    for agent_info in imported_agents:
+        log_activity(
+            db,
+            "agent_imported",
+            agent_id=agent_info["id"],
+            description=f"Imported agent {agent_info['name']} from OpenClaw config"
+        )
+    
+    # Broadcast agent updates
+    queue_broadcast(db, {
+        "type": "agents_imported",
+        "data": {
+            "imported": imported_agents,
+            "skipped": skipped_agents
+        }
+    })
+    
     try:
         db.commit()
-        
-        # Log activity for each imported agent
-        for agent_info in imported_agents:
-            await log_activity(
-                db,
-                "agent_imported",
-                agent_id=agent_info["id"],
-                description=f"Imported agent {agent_info['name']} from OpenClaw config"
-            )
-        
-        # Broadcast agent updates
-        await manager.broadcast({
-            "type": "agents_imported",
-            "data": {
-                "imported": imported_agents,
-                "skipped": skipped_agents
-            }
-        })
-        
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to save agents: {str(e)}")
@@ -595,35 +2190,222 @@ async def import_agents_from_openclaw(import_request: ImportAgentsRequest, db: S
         "skipped_count": len(skipped_agents)
     }
 
+# ============ Task Change Tracking ============
+# Every flush that touches a task (or its comments/deliverables) appends a
+# TaskChange row, so clients can ask for "what changed since token N".
+TASK_CHANGE_RETENTION_DAYS = int(os.getenv("TASK_CHANGE_RETENTION_DAYS", "7"))
+TASK_CHANGE_PRUNE_INTERVAL = float(os.getenv("TASK_CHANGE_PRUNE_INTERVAL", "3600"))  # Seconds
+
+@event.listens_for(SessionLocal, "before_flush")
+def record_task_changes(session, flush_context, instances):
+    changed = set()
+    deleted = set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Task):
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            if obj.id is None:
+                obj.id = generate_uuid()  # Assign now so the change row can reference it
+            changed.add(obj.id)
+        elif isinstance(obj, (Comment, Deliverable)) and obj.task_id:
+            changed.add(obj.task_id)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            deleted.add(obj.id)
+        elif isinstance(obj, (Comment, Deliverable)) and obj.task_id:
+            changed.add(obj.task_id)
+
+    for task_id in changed - deleted:
+        session.add(TaskChange(task_id=task_id, deleted=False))
+    for task_id in deleted:
+        session.add(TaskChange(task_id=task_id, deleted=True))
+
+def prune_task_changes():
+    """Drop change rows past the retention window (always keeps the newest row)."""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=TASK_CHANGE_RETENTION_DAYS)
+        max_seq = db.query(func.max(TaskChange.seq)).scalar()
+        if max_seq is not None:
+            db.query(TaskChange).filter(TaskChange.changed_at < cutoff, TaskChange.seq < max_seq).delete()
+            db.commit()
+    finally:
+        db.close()
+
+class TaskChangePruner:
+    """Applies the retention window every TASK_CHANGE_PRUNE_INTERVAL seconds, not just at startup."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(TASK_CHANGE_PRUNE_INTERVAL)
+            try:
+                await asyncio.to_thread(prune_task_changes)
+                self.runs += 1
+            except Exception as e:
+                print(f"Task change prune failed: {e}")
+
+task_change_pruner = TaskChangePruner()
+
+# ============ Task Events ============
+# How task broadcasts describe the change:
+#   "id"    - legacy: just the task id, clients refetch
+#   "full"  - the serialized board card ("task") plus its version
+#   "patch" - only the changed card fields ("patch"), the new version and the
+#             version the patch applies on top of ("base_version")
+TASK_EVENT_MODE = os.getenv("TASK_EVENT_MODE", "full").lower()
+
+def queue_task_event(db: Session, event_type: str, task_id: str, data: dict, fields: Optional[List[str]] = None):
+    """Queue a task event carrying the task state per TASK_EVENT_MODE; it is sent on commit.
+
+    Call it after the last change to the task, since the state is read from the
+    session right away. `fields` names the board-card keys the change touched;
+    without it (or for new tasks) patch mode falls back to sending the full card.
+    """
+    db.flush()  # Pending changes (and their TaskChange rows) must be visible to the summary query
+    if TASK_EVENT_MODE != "id":
+        row = task_summary_query(db, [task_id]).first()
+        if row:
+            task = serialize_task_summary(*row)
+            data = {**data, "version": task["version"]}
+            if TASK_EVENT_MODE == "patch" and fields:
+                previous = db.query(TaskChange.seq).filter(
+                    TaskChange.task_id == task_id, TaskChange.seq < task["version"]
+                ).order_by(TaskChange.seq.desc()).first()
+                data["base_version"] = previous[0] if previous else 0
+                data["patch"] = {k: task[k] for k in [*fields, "updated_at"] if k in task}
+            else:
+                data["task"] = task
+    queue_broadcast(db, {"type": event_type, "data": data})
+
 # Task endpoints
+def task_summary_query(db: Session, task_ids: Optional[List[str]] = None):
+    """Tasks with assignee and comment/deliverable counts in a single query.
+
+    Yields (task, assignee, comments_count, deliverables_count, deliverables_complete,
+    version) rows, so serializing a board never lazy-loads relationships per task.
+    With `task_ids` the count subqueries only aggregate those tasks' rows.
+    """
+    comment_counts = db.query(
+        Comment.task_id.label("task_id"),
+        func.count(Comment.id).label("total")
+    )
+    deliverable_counts = db.query(
+        Deliverable.task_id.label("task_id"),
+        func.count(Deliverable.id).label("total"),
+        func.sum(case((Deliverable.completed == True, 1), else_=0)).label("complete")
+    )
+    versions = db.query(
+        TaskChange.task_id.label("task_id"),
+        func.max(TaskChange.seq).label("version")
+    )
+    if task_ids is not None:
+        comment_counts = comment_counts.filter(Comment.task_id.in_(task_ids))
+        deliverable_counts = deliverable_counts.filter(Deliverable.task_id.in_(task_ids))
+        versions = versions.filter(TaskChange.task_id.in_(task_ids))
+    comment_counts = comment_counts.group_by(Comment.task_id).subquery()
+    deliverable_counts = deliverable_counts.group_by(Deliverable.task_id).subquery()
+    versions = versions.group_by(TaskChange.task_id).subquery()
+
+    query = db.query(
+        Task,
+        Agent,
+        func.coalesce(comment_counts.c.total, 0),
+        func.coalesce(deliverable_counts.c.total, 0),
+        func.coalesce(deliverable_counts.c.complete, 0),
+        func.coalesce(versions.c.version, 0),
+    ).outerjoin(Agent, Task.assignee_id == Agent.id
+    ).outerjoin(comment_counts, comment_counts.c.task_id == Task.id
+    ).outerjoin(deliverable_counts, deliverable_counts.c.task_id == Task.id
+    ).outerjoin(versions, versions.c.task_id == Task.id)
+    if task_ids is not None:
+        query = query.filter(Task.id.in_(task_ids))
+    return query
+
+def serialize_task_summary(task: Task, assignee: Optional[Agent], comments_count: int, deliverables_count: int, deliverables_complete: int, version: int = 0) -> dict:
+    """Board-card representation of a task (the shape returned by GET /api/tasks)."""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "status": task.status.value,
+        "priority": task.priority.value,
+        "tags": json.loads(task.tags) if task.tags else [],
+        "assignee_id": task.assignee_id,
+        "assignee": {"id": assignee.id, "name": assignee.name, "avatar": assignee.avatar} if assignee else None,
+        "reviewer": task.reviewer,
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+        "comments_count": comments_count,
+        "deliverables_count": deliverables_count,
+        "deliverables_complete": deliverables_complete,
+        "version": version
+    }
+
 @app.get("/api/tasks")
 def get_tasks(status: Optional[str] = None, assignee_id: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Task)
+    query = task_summary_query(db)
     if status:
         query = query.filter(Task.status == TaskStatus(status))
     if assignee_id:
         query = query.filter(Task.assignee_id == assignee_id)
-    tasks = query.order_by(Task.created_at.desc()).all()
-    
-    result = []
-    for task in tasks:
-        result.append({
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status.value,
-            "priority": task.priority.value,
-            "tags": json.loads(task.tags) if task.tags else [],
-            "assignee_id": task.assignee_id,
-            "assignee": {"id": task.assignee.id, "name": task.assignee.name, "avatar": task.assignee.avatar} if task.assignee else None,
-            "reviewer": task.reviewer,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat(),
-            "comments_count": len(task.comments),
-            "deliverables_count": len(task.deliverables),
-            "deliverables_complete": sum(1 for d in task.deliverables if d.completed)
-        })
-    return result
+    rows = query.order_by(Task.created_at.desc()).all()
+    return [serialize_task_summary(*row) for row in rows]
+
+@app.get("/api/tasks/changes")
+def get_task_changes(since: Optional[str] = None, db: Session = Depends(get_db)):
+    """Delta sync for the task board.
+
+    Without `since`, returns every task plus a token. With `since`, returns only
+    the tasks changed after that token, tombstone ids for deleted tasks, and a
+    new token. `reset: true` means the token fell out of the retention window
+    and the client should replace its board with `changed`.
+    """
+    try:
+        since_seq = int(since) if since else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    # Everything below reads from the same transaction snapshot
+    min_seq, max_seq = db.query(func.min(TaskChange.seq), func.max(TaskChange.seq)).one()
+    max_seq = max_seq or 0
+    reset = since_seq == 0 or since_seq > max_seq or (min_seq is not None and since_seq < min_seq - 1)
+
+    if reset:
+        rows = task_summary_query(db).order_by(Task.created_at.desc()).all()
+        return {
+            "token": str(max_seq),
+            "reset": True,
+            "changed": [serialize_task_summary(*row) for row in rows],
+            "deleted": [],
+        }
+
+    # Latest change per task since the token decides changed vs. deleted
+    latest = {}
+    for change in db.query(TaskChange).filter(TaskChange.seq > since_seq).order_by(TaskChange.seq.asc()):
+        latest[change.task_id] = change.deleted
+    changed_ids = [task_id for task_id, is_deleted in latest.items() if not is_deleted]
+    deleted_ids = [task_id for task_id, is_deleted in latest.items() if is_deleted]
+
+    rows = task_summary_query(db, changed_ids).all() if changed_ids else []
+    return {
+        "token": str(max_seq),
+        "reset": False,
+        "changed": [serialize_task_summary(*row) for row in rows],
+        "deleted": deleted_ids,
+    }
 
 @app.post("/api/tasks")
 async def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
@@ -647,19 +2429,19 @@ async def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
         reviewer='main'  # Default reviewer is main
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    db.flush()  # Assigns task.id for the notification
+    
+    # Notify assigned agent (committed together with the task)
+    if task.assignee_id:
+        notify_agent_of_task(db, task)
     
     # Log activity with auto-assign note if applicable
     activity_desc = f"Task created: {task.title}"
     if auto_assigned:
         activity_desc += f" (auto-assigned to {assignee_id})"
-    await log_activity(db, "task_created", task_id=task.id, description=activity_desc)
-    await manager.broadcast({"type": "task_created", "data": {"id": task.id, "title": task.title}})
-    
-    # Notify assigned agent
-    if task.assignee_id:
-        notify_agent_of_task(task)
+    log_activity(db, "task_created", task_id=task.id, description=activity_desc)
+    queue_task_event(db, "task_created", task.id, {"id": task.id, "title": task.title})
+    db.commit()
     
     return {
         "id": task.id, 
@@ -717,6 +2499,9 @@ async def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends
     old_status = task.status.value
     should_notify_assign = False
     should_notify_complete = False
+    changed_fields = [k for k, v in task_data.model_dump().items() if v is not None]
+    if task_data.assignee_id is not None:
+        changed_fields += ["assignee", "status"]  # Assigning may also move INBOX → ASSIGNED
     
     if task_data.title is not None:
         task.title = task_data.title
@@ -724,7 +2509,7 @@ async def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends
         task.description = task_data.description
     if task_data.status is not None:
         task.status = TaskStatus(task_data.status)
-        await log_activity(db, "status_changed", task_id=task.id, description=f"Status: {old_status} → {task_data.status}")
+        log_activity(db, "status_changed", task_id=task.id, description=f"Status: {old_status} → {task_data.status}")
         # Notify if status changed to ASSIGNED
         if task_data.status == "ASSIGNED" and task.assignee_id:
             should_notify_assign = True
@@ -746,18 +2531,14 @@ async def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends
     if task_data.reviewer is not None:
         task.reviewer = task_data.reviewer if task_data.reviewer != "" else None
     
-    db.commit()
-    await manager.broadcast({"type": "task_updated", "data": {"id": task_id}})
-    
-    # Notify assigned agent after commit
+    # Notifications commit together with the update
     if should_notify_assign:
-        db.refresh(task)
-        notify_agent_of_task(task)
-    
-    # Notify main agent of task completion
+        notify_agent_of_task(db, task)
     if should_notify_complete:
-        db.refresh(task)
-        notify_task_completed(task)
+        notify_task_completed(db, task)
+    
+    queue_task_event(db, "task_updated", task_id, {"id": task_id}, fields=changed_fields)
+    db.commit()
     
     return {"ok": True}
 
@@ -776,9 +2557,8 @@ async def delete_task(task_id: str, db: Session = Depends(get_db)):
     
     # 3. Delete the task (comments and deliverables will be cascade deleted)
     db.delete(task)
+    queue_broadcast(db, {"type": "task_deleted", "data": {"id": task_id}})
     db.commit()
-    
-    await manager.broadcast({"type": "task_deleted", "data": {"id": task_id}})
     return {"ok": True}
 
 # Review actions
@@ -797,10 +2577,8 @@ async def review_task(task_id: str, review_data: ReviewAction, db: Session = Dep
         # Move task to REVIEW with specified reviewer
         task.status = TaskStatus.REVIEW
         task.reviewer = review_data.reviewer or get_lead_agent_id(db)
-        db.commit()
-        db.refresh(task)
-        notify_reviewer(task)
-        await log_activity(db, "sent_to_review", task_id=task.id, 
+        notify_reviewer(db, task)
+        log_activity(db, "sent_to_review", task_id=task.id, 
                           description=f"Task sent for review to {task.reviewer}")
     
     elif review_data.action == "approve":
@@ -810,7 +2588,7 @@ async def review_task(task_id: str, review_data: ReviewAction, db: Session = Dep
         old_reviewer = task.reviewer
         task.status = TaskStatus.DONE
         task.reviewer = None
-        await log_activity(db, "task_approved", task_id=task.id,
+        log_activity(db, "task_approved", task_id=task.id,
                           description=f"Task approved by {old_reviewer}")
     
     elif review_data.action == "reject":
@@ -830,52 +2608,135 @@ async def review_task(task_id: str, review_data: ReviewAction, db: Session = Dep
             )
             db.add(comment)
         
-        db.commit()
-        db.refresh(task)
-        notify_task_rejected(task, feedback=review_data.feedback, rejected_by=old_reviewer)
-        
-        await log_activity(db, "task_rejected", task_id=task.id,
+        notify_task_rejected(db, task, feedback=review_data.feedback, rejected_by=old_reviewer)
+        log_activity(db, "task_rejected", task_id=task.id,
                           description=f"Task sent back by {old_reviewer}: {review_data.feedback or 'No feedback'}")
     
     else:
         raise HTTPException(status_code=400, detail=f"Unknown action: {review_data.action}")
     
+    queue_task_event(db, "task_reviewed", task_id, {"id": task_id, "action": review_data.action},
+                     fields=["status", "reviewer", "comments_count"])
     db.commit()
-    await manager.broadcast({"type": "task_reviewed", "data": {"id": task_id, "action": review_data.action}})
     
     return {"ok": True, "status": task.status.value}
 
 # Comment endpoints
-def parse_mentions(content: str) -> list[str]:
+# ============ Mention Index ============
+# @mentions resolve against one index over openclaw.json and DB agents: ids, display
+# names (multi-word too, "@Code Monkey"), their hyphen/underscore/joined forms and any
+# `aliases` listed for the agent in openclaw.json. Built lazily and rebuilt when the
+# config is reloaded or a commit adds, renames or removes an agents row.
+
+def mention_keys(agent_id: str, name: Optional[str], aliases: list) -> list:
+    """Lowercased, whitespace-normalized forms an agent can be @mentioned by."""
+    keys = [agent_id, name, *aliases]
+    for key in [name, *aliases]:
+        words = (key or "").split()
+        if len(words) > 1:
+            keys += ["-".join(words), "_".join(words), "".join(words)]
+    return [" ".join(key.lower().split()) for key in keys if isinstance(key, str) and key.strip()]
+
+class MentionIndex:
+    """Precompiled @mention matcher plus a sorted key list for prefix lookups."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.config = None          # openclaw.json object the index was built from
+        self.stale = True
+        self.agents: dict = {}      # agent_id -> {"id", "name", "avatar"}
+        self.keys: dict = {}        # mention key -> agent_id (config agents win, then first listed)
+        self.prefixes: list = []    # Sorted (key, agent_id), plus later words of multi-word names
+        self.pattern = None
+        self.builds = 0
+
+    def invalidate(self):
+        self.stale = True
+
+    def _current(self, db: Session):
+        config = openclaw_config.get()
+        with self.lock:
+            if self.stale or config is not self.config:
+                self._build(config, db)
+            return self.agents, self.keys, self.prefixes, self.pattern
+
+    def _build(self, config: Optional[dict], db: Session):
+        self.stale = False  # Before reading, so a change committed meanwhile rebuilds again
+        agents, keys = {}, {}
+
+        def add(agent_id: str, name: Optional[str], avatar: Optional[str], aliases: list):
+            if agent_id in agents:
+                return
+            agents[agent_id] = {"id": agent_id, "name": name or agent_id, "avatar": avatar or "🤖"}
+            for key in mention_keys(agent_id, name, aliases):
+                keys.setdefault(key, agent_id)
+
+        for agent in openclaw_config.agents():
+            identity = agent.get("identity", {})
+            aliases = agent.get("aliases") or identity.get("aliases") or []
+            add(agent["id"], identity.get("name") or agent.get("name"), identity.get("emoji"), list(aliases))
+        for agent_id, name, avatar in db.query(Agent.id, Agent.name, Agent.avatar).all():
+            add(agent_id, name, avatar, [])
+
+        prefixes = set(keys.items())
+        for key, agent_id in keys.items():
+            prefixes.update((" ".join(key.split()[i:]), agent_id) for i in range(1, len(key.split())))
+        # Longest first, so "@Code Monkey" wins over an agent called "code"
+        alternatives = [r"\s+".join(re.escape(word) for word in key.split())
+                        for key in sorted(keys, key=len, reverse=True)]
+        self.pattern = re.compile(r"(?<![\w@])@(" + "|".join(alternatives) + r")(?![\w-])",
+                                  re.IGNORECASE) if alternatives else None
+        self.agents, self.keys, self.prefixes = agents, keys, sorted(prefixes)
+        self.config = config
+        self.builds += 1
+
+    def resolve(self, content: str, db: Session) -> list:
+        """Agent ids @mentioned in `content`, in order of first mention."""
+        _agents, keys, _prefixes, pattern = self._current(db)
+        if pattern is None:
+            return []
+        found = []
+        for match in pattern.finditer(content):
+            agent_id = keys.get(" ".join(match.group(1).lower().split()))
+            if agent_id and agent_id not in found:
+                found.append(agent_id)
+        return found
+
+    def complete(self, prefix: str, db: Session, limit: int = 10) -> list:
+        """Agents with an id, name, name word or alias starting with `prefix`."""
+        agents, _keys, prefixes, _pattern = self._current(db)
+        prefix = " ".join(prefix.lstrip("@").lower().split())
+        matches = []
+        for key, agent_id in prefixes[bisect.bisect_left(prefixes, (prefix,)):]:
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            if agent_id not in matches:
+                matches.append(agent_id)
+        return [agents[agent_id] for agent_id in matches]
+
+mention_index = MentionIndex()
+
+@event.listens_for(SessionLocal, "after_flush")
+def note_agent_changes(session, flush_context):
+    changed = any(isinstance(obj, Agent) for obj in list(session.new) + list(session.deleted)) or any(
+        isinstance(obj, Agent) and sa_inspect(obj).attrs.name.history.has_changes() for obj in session.dirty)
+    if changed:
+        session.info["agents_changed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def invalidate_mention_index(session):
+    if session.info.pop("agents_changed", False):
+        mention_index.invalidate()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def forget_agent_changes(session):
+    session.info.pop("agents_changed", None)
+
+def parse_mentions(content: str, db: Session) -> list[str]:
     """Extract @mentioned agent IDs from comment content."""
-    # Pattern: @AgentName (word characters, may include spaces if quoted)
-    # Match @word patterns
-    import re
-    mentions = re.findall(r'@(\w+)', content)
-    return mentions
-
-def get_agent_id_by_name(name: str, db: Session) -> Optional[str]:
-    """Find agent ID by name (case-insensitive)."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
-    if config_path.exists():
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-            agents_list = config.get("agents", {}).get("list", [])
-            for agent in agents_list:
-                agent_id = agent.get("id", "")
-                identity = agent.get("identity", {})
-                agent_name = identity.get("name") or agent.get("name") or agent_id
-                # Match by ID or name (case-insensitive)
-                if agent_id.lower() == name.lower() or agent_name.lower() == name.lower():
-                    return agent_id
-        except:
-            pass
-    return None
+    return mention_index.resolve(content, db)
 
-async def route_mention_to_agent(agent_id: str, task: Task, comment_content: str, commenter_name: str):
+async def route_mention_to_agent(db: Session, agent_id: str, task: Task, comment_content: str, commenter_name: str):
     """Send a message to an agent when @mentioned in a task comment."""
     # Build context message for the agent
     message = f"""You were mentioned in a task comment.
@@ -892,22 +2753,8 @@ Please review and respond appropriately. You can reply by adding a comment to th
 curl -X POST http://localhost:8000/api/tasks/{task.id}/comments -H "Content-Type: application/json" -d '{{"agent_id": "{agent_id}", "content": "Your response here"}}'
 ```"""
 
-    try:
-        # Use subprocess to call OpenClaw CLI
-        subprocess.Popen(
-            [
-                "openclaw", "agent",
-                "--agent", agent_id,
-                "--message", message
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            cwd=str(Path.home())
-        )
-        print(f"Routed mention to agent {agent_id}")
-    except Exception as e:
-        # Log error but don't fail the comment creation
-        print(f"Failed to route mention to agent {agent_id}: {e}")
+    # Staged in the outbox, so a failed or slow CLI never holds up the comment creation
+    enqueue_notification(db, agent_id, message, f"mention in '{task.title}'")
 
 @app.post("/api/tasks/{task_id}/comments")
 async def add_comment(task_id: str, comment_data: CommentCreate, db: Session = Depends(get_db)):
@@ -921,54 +2768,58 @@ async def add_comment(task_id: str, comment_data: CommentCreate, db: Session = D
         content=comment_data.content
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
     
     agent = db.query(Agent).filter(Agent.id == comment_data.agent_id).first()
     commenter_name = agent.name if agent else comment_data.agent_id
     
-    await log_activity(db, "comment_added", agent_id=comment_data.agent_id, task_id=task_id, 
-                       description=f"{commenter_name} commented on {task.title}")
-    await manager.broadcast({"type": "comment_added", "data": {"task_id": task_id, "comment_id": comment.id}})
-    
-    # Parse @mentions and route to agents
-    mentions = parse_mentions(comment_data.content)
+    # Parse @mentions and route to agents (committed together with the comment)
     routed_agents = []
-    for mention in mentions:
-        mentioned_agent_id = get_agent_id_by_name(mention, db)
-        if mentioned_agent_id and mentioned_agent_id != comment_data.agent_id:
+    for mentioned_agent_id in parse_mentions(comment_data.content, db):
+        if mentioned_agent_id != comment_data.agent_id:
             # Don't route if agent mentions themselves
-            await route_mention_to_agent(mentioned_agent_id, task, comment_data.content, commenter_name)
+            await route_mention_to_agent(db, mentioned_agent_id, task, comment_data.content, commenter_name)
             routed_agents.append(mentioned_agent_id)
     
+    db.flush()  # Assigns comment.id
+    
+    log_activity(db, "comment_added", agent_id=comment_data.agent_id, task_id=task_id, 
+                 description=f"{commenter_name} commented on {task.title}")
+    queue_task_event(db, "comment_added", task_id, {"task_id": task_id, "comment_id": comment.id},
+                     fields=["comments_count"])
+    db.commit()
+    
     return {"id": comment.id, "routed_to": routed_agents}
 
 # Task Activity endpoints
 @app.get("/api/tasks/{task_id}/activity")
-def get_task_activity(task_id: str, limit: int = 50, db: Session = Depends(get_db)):
-    """Get activity log entries for a specific task."""
+def get_task_activity(task_id: str, response: Response, limit: int = 50, before: Optional[str] = None, after: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get activity log entries for a specific task.
+
+    Returns the newest `limit` entries (oldest first). Pass the X-Next-Cursor
+    header back as `before` to page further into history.
+    """
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    activities = db.query(TaskActivity).filter(
+    query = db.query(TaskActivity, Agent).outerjoin(Agent, TaskActivity.agent_id == Agent.id).filter(
         TaskActivity.task_id == task_id
-    ).order_by(TaskActivity.timestamp.desc()).limit(limit).all()
+    )
+    rows, next_cursor = keyset_page(query, TaskActivity.timestamp, TaskActivity.id, limit, before, after)
+    set_next_cursor(response, next_cursor)
     
     result = []
-    for activity in reversed(activities):  # Return oldest first
+    for activity, agent_obj in reversed(rows):  # Return oldest first
         agent = None
         if activity.agent_id:
             # Handle special "user" agent
             if activity.agent_id == "user":
                 agent = {"id": "user", "name": "User", "avatar": "👤"}
+            elif agent_obj:
+                agent = {"id": agent_obj.id, "name": agent_obj.name, "avatar": agent_obj.avatar}
             else:
-                agent_obj = db.query(Agent).filter(Agent.id == activity.agent_id).first()
-                if agent_obj:
-                    agent = {"id": agent_obj.id, "name": agent_obj.name, "avatar": agent_obj.avatar}
-                else:
-                    # Fallback for unknown agents
-                    agent = {"id": activity.agent_id, "name": activity.agent_id.title(), "avatar": "🤖"}
+                # Fallback for unknown agents
+                agent = {"id": activity.agent_id, "name": activity.agent_id.title(), "avatar": "🤖"}
         
         result.append({
             "id": activity.id,
@@ -1026,14 +2877,15 @@ async def add_task_activity(task_id: str, activity_data: TaskActivityCreate, db:
             # Set default reviewer if not set
             if not task.reviewer:
                 task.reviewer = 'main'
+            # Notify reviewer (committed together with the transition)
+            notify_reviewer(db, task, submitted_by=activity_data.agent_id)
     
-    db.commit()
-    db.refresh(activity)
+    db.flush()  # Assigns activity.id and timestamp
     
     agent = db.query(Agent).filter(Agent.id == activity_data.agent_id).first()
     
     # Broadcast activity added
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "task_activity_added",
         "data": {
             "task_id": task_id,
@@ -1046,10 +2898,8 @@ async def add_task_activity(task_id: str, activity_data: TaskActivityCreate, db:
     
     # Broadcast status change if it happened
     if new_status:
-        await manager.broadcast({
-            "type": "task_updated",
-            "data": {"id": task_id, "status": new_status.value}
-        })
+        queue_task_event(db, "task_updated", task_id, {"id": task_id, "status": new_status.value},
+                         fields=["status", "reviewer"])
         # Log the auto-transition
         log = ActivityLog(
             activity_type="status_changed",
@@ -1058,13 +2908,8 @@ async def add_task_activity(task_id: str, activity_data: TaskActivityCreate, db:
             description=f"Auto-transitioned: {old_status.value} → {new_status.value}"
         )
         db.add(log)
-        db.commit()
-        
-        # Notify reviewer when task transitions to REVIEW
-        if new_status == TaskStatus.REVIEW:
-            db.refresh(task)
-            notify_reviewer(task, submitted_by=activity_data.agent_id)
     
+    db.commit()
     return {"id": activity.id, "auto_transition": new_status.value if new_status else None}
 
 
@@ -1089,8 +2934,7 @@ async def complete_task(task_id: str, db: Session = Depends(get_db)):
     task.status = TaskStatus.REVIEW
     if not task.reviewer:
         task.reviewer = 'main'
-    
-    db.commit()
+    notify_reviewer(db, task)
     
     # Log the completion
     log = ActivityLog(
@@ -1100,16 +2944,11 @@ async def complete_task(task_id: str, db: Session = Depends(get_db)):
         description=f"Task sent for review to {task.reviewer}"
     )
     db.add(log)
-    db.commit()
-    
-    await manager.broadcast({
-        "type": "task_updated",
-        "data": {"id": task_id, "status": TaskStatus.REVIEW.value, "reviewer": task.reviewer}
-    })
     
-    # Notify reviewer
-    db.refresh(task)
-    notify_reviewer(task)
+    queue_task_event(db, "task_updated", task_id,
+                     {"id": task_id, "status": TaskStatus.REVIEW.value, "reviewer": task.reviewer},
+                     fields=["status", "reviewer"])
+    db.commit()
     
     return {"ok": True, "status": TaskStatus.REVIEW.value, "reviewer": task.reviewer}
 
@@ -1136,22 +2975,24 @@ async def complete_deliverable(deliverable_id: str, db: Session = Depends(get_db
     
     deliverable.completed = True
     deliverable.completed_at = datetime.utcnow()
-    db.commit()
     
-    await log_activity(db, "deliverable_complete", task_id=deliverable.task_id, 
-                       description=f"Deliverable completed: {deliverable.title}")
-    await manager.broadcast({"type": "deliverable_complete", "data": {"id": deliverable_id, "task_id": deliverable.task_id}})
+    log_activity(db, "deliverable_complete", task_id=deliverable.task_id, 
+                 description=f"Deliverable completed: {deliverable.title}")
+    queue_broadcast(db, {"type": "deliverable_complete", "data": {"id": deliverable_id, "task_id": deliverable.task_id}})
+    db.commit()
     
     return {"ok": True}
 
 # Chat endpoints
 @app.get("/api/chat")
-def get_chat_messages(limit: int = 50, db: Session = Depends(get_db)):
-    messages = db.query(ChatMessage).order_by(ChatMessage.created_at.desc()).limit(limit).all()
+def get_chat_messages(response: Response, limit: int = 50, before: Optional[str] = None, after: Optional[str] = None, db: Session = Depends(get_db)):
+    query = db.query(ChatMessage, Agent).outerjoin(Agent, ChatMessage.agent_id == Agent.id)
+    rows, next_cursor = keyset_page(query, ChatMessage.created_at, ChatMessage.id, limit, before, after)
+    set_next_cursor(response, next_cursor)
     result = []
-    for m in reversed(messages):
-        if m.agent:
-            agent_info = {"id": m.agent.id, "name": m.agent.name, "avatar": m.agent.avatar}
+    for m, agent in reversed(rows):
+        if agent:
+            agent_info = {"id": agent.id, "name": agent.name, "avatar": agent.avatar}
         else:
             # Handle user messages or missing agents
             agent_info = {"id": m.agent_id, "name": "User" if m.agent_id == "user" else m.agent_id, "avatar": "👤" if m.agent_id == "user" else "🤖"}
@@ -1171,8 +3012,7 @@ async def send_chat_message(message_data: ChatMessageCreate, db: Session = Depen
         content=message_data.content
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    db.flush()  # Assigns id and created_at
     
     agent = db.query(Agent).filter(Agent.id == message_data.agent_id).first()
     # Fallback agent info if not found in database
@@ -1185,7 +3025,7 @@ async def send_chat_message(message_data: ChatMessageCreate, db: Session = Depen
             "name": "User" if message_data.agent_id == "user" else message_data.agent_id,
             "avatar": "👤" if message_data.agent_id == "user" else "🤖"
         }
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "chat_message",
         "data": {
             "id": message.id,
@@ -1195,40 +3035,49 @@ async def send_chat_message(message_data: ChatMessageCreate, db: Session = Depen
             "created_at": message.created_at.isoformat()
         }
     })
+    db.commit()
     
     return {"id": message.id}
 
 
 # ============ OpenClaw Agent Chat ============
-import subprocess
-import re
-import requests
+# Agent chats run as asyncio subprocesses / async HTTP calls so a slow agent
+# never blocks the event loop. Each agent handles one chat at a time by default;
+# the global cap bounds how many CLI processes and remote calls run at once.
+AGENT_CHAT_TIMEOUT = int(os.getenv("AGENT_CHAT_TIMEOUT", "120"))  # Seconds
+AGENT_CHAT_MAX_CONCURRENT = int(os.getenv("AGENT_CHAT_MAX_CONCURRENT", "8"))
+AGENT_CHAT_PER_AGENT = int(os.getenv("AGENT_CHAT_PER_AGENT", "1"))
+# Streaming replies: buffered text is broadcast as a chat_message_delta at most this often (ms)
+CHAT_STREAM_FLUSH_MS = float(os.getenv("CHAT_STREAM_FLUSH_MS", "100"))
+
+agent_chat_global = asyncio.Semaphore(AGENT_CHAT_MAX_CONCURRENT)
+agent_chat_semaphores: dict = {}  # agent_id -> asyncio.Semaphore
+
+@asynccontextmanager
+async def agent_chat_slot(agent_id: str):
+    """Wait for a free chat slot for this agent, then for a global one."""
+    # Per-agent first, so chats queued behind a busy agent don't hold global slots
+    semaphore = agent_chat_semaphores.setdefault(agent_id, asyncio.Semaphore(AGENT_CHAT_PER_AGENT))
+    async with semaphore:
+        async with agent_chat_global:
+            yield
 
 class SendToAgentRequest(BaseModel):
     agent_id: str
     message: str
+    stream: bool = False  # Broadcast the reply as chat_message_delta frames while it is generated
 
 def get_agent_info(agent_id: str, db: Session) -> dict:
     """Get agent info from OpenClaw config or fallback."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-
     # First try OpenClaw config
-    if config_path.exists():
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-            agents_list = config.get("agents", {}).get("list", [])
-            for agent in agents_list:
-                if agent.get("id") == agent_id:
-                    identity = agent.get("identity", {})
-                    return {
-                        "id": agent_id,
-                        "name": identity.get("name") or agent.get("name") or agent_id,
-                        "avatar": identity.get("emoji") or "🤖"
-                    }
-        except:
-            pass
+    agent = openclaw_config.agent(agent_id)
+    if agent:
+        identity = agent.get("identity", {})
+        return {
+            "id": agent_id,
+            "name": identity.get("name") or agent.get("name") or agent_id,
+            "avatar": identity.get("emoji") or "🤖"
+        }
 
     # Fallback to database
     agent = db.query(Agent).filter(Agent.id == agent_id).first()
@@ -1240,37 +3089,546 @@ def get_agent_info(agent_id: str, db: Session) -> dict:
 
 def get_agent_remote_config(agent_id: str) -> Optional[dict]:
     """Check if an agent is configured as remote (running on moltworker)."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
+    agent = openclaw_config.agent(agent_id)
+    remote = agent.get("remote") if agent else None
+    if remote and remote.get("api_url"):
+        return remote
+    return None
 
-    if not config_path.exists():
-        return None
+def resolve_gateway_token(gateway_token: str) -> str:
+    """Expand a ${ENV_VAR} gateway token reference."""
+    if gateway_token.startswith("${") and gateway_token.endswith("}"):
+        return os.environ.get(gateway_token[2:-1], "")
+    return gateway_token
+
+# Remote gateways: one pooled keep-alive client per gateway base URL, shared by
+# chat, streaming and cron sync. The sync client serves the threadpool / background
+# push paths; the async client serves the event loop. httpx clients are thread-safe.
+GATEWAY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "10"))  # Per gateway
+GATEWAY_MAX_KEEPALIVE = int(os.getenv("GATEWAY_MAX_KEEPALIVE", "5"))  # Idle connections kept per gateway
+GATEWAY_KEEPALIVE_EXPIRY = float(os.getenv("GATEWAY_KEEPALIVE_EXPIRY", "60"))  # Seconds
+GATEWAY_CONNECT_TIMEOUT = float(os.getenv("GATEWAY_CONNECT_TIMEOUT", "10"))  # Seconds
+
+def gateway_timeout(total: float) -> httpx.Timeout:
+    """Per-request timeout that keeps the shared connect limit."""
+    return httpx.Timeout(total, connect=min(total, GATEWAY_CONNECT_TIMEOUT))
+
+class GatewayClientPool:
+    """Pooled HTTP clients per remote gateway, with per-host latency stats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sync_clients: dict = {}  # base_url -> httpx.Client
+        self.async_clients: dict = {}  # base_url -> httpx.AsyncClient
+        self.hosts: dict = {}  # base_url -> {"requests", "errors", "total_ms", "max_ms", "recent": deque}
+
+    @staticmethod
+    def _key(api_url: str) -> str:
+        return api_url.rstrip('/')
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=GATEWAY_MAX_CONNECTIONS,
+            max_keepalive_connections=GATEWAY_MAX_KEEPALIVE,
+            keepalive_expiry=GATEWAY_KEEPALIVE_EXPIRY,
+        )
+
+    def _host(self, key: str) -> dict:
+        return self.hosts.setdefault(key, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                           "recent": deque(maxlen=200)})
+
+    def _record(self, key: str, response: httpx.Response):
+        # Time to response headers; streamed bodies are excluded on purpose
+        started = response.request.extensions.get("gateway_started")
+        if started is None:
+            return
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self.lock:
+            host = self._host(key)
+            host["requests"] += 1
+            if response.status_code >= 500:
+                host["errors"] += 1
+            host["total_ms"] += elapsed_ms
+            host["max_ms"] = max(host["max_ms"], elapsed_ms)
+            host["recent"].append(elapsed_ms)
+
+    def record_error(self, api_url: str):
+        """Count a request that failed before any response (connect error, timeout)."""
+        with self.lock:
+            self._host(self._key(api_url))["errors"] += 1
+
+    def client(self, api_url: str) -> httpx.Client:
+        """Shared sync client for a gateway (cron sync / push threads)."""
+        key = self._key(api_url)
+        with self.lock:
+            client = self.sync_clients.get(key)
+            if client is None:
+                def on_request(request):
+                    request.extensions["gateway_started"] = time.monotonic()
+                def on_response(response):
+                    self._record(key, response)
+                client = httpx.Client(limits=self._limits(), timeout=gateway_timeout(30),
+                                      event_hooks={"request": [on_request], "response": [on_response]})
+                self.sync_clients[key] = client
+            return client
+
+    def async_client(self, api_url: str) -> httpx.AsyncClient:
+        """Shared async client for a gateway (agent chat)."""
+        key = self._key(api_url)
+        with self.lock:
+            client = self.async_clients.get(key)
+            if client is None:
+                async def on_request(request):
+                    request.extensions["gateway_started"] = time.monotonic()
+                async def on_response(response):
+                    self._record(key, response)
+                client = httpx.AsyncClient(limits=self._limits(), timeout=gateway_timeout(30),
+                                           event_hooks={"request": [on_request], "response": [on_response]})
+                self.async_clients[key] = client
+            return client
+
+    def start(self):
+        """Open clients for every remote gateway in openclaw.json up front."""
+        for remote in remote_gateway_configs():
+            self.client(remote["api_url"])
+            self.async_client(remote["api_url"])
+
+    async def close(self):
+        with self.lock:
+            sync_clients, self.sync_clients = list(self.sync_clients.values()), {}
+            async_clients, self.async_clients = list(self.async_clients.values()), {}
+        for client in sync_clients:
+            client.close()
+        for client in async_clients:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        with self.lock:
+            gateways = {}
+            for key in set(self.hosts) | set(self.sync_clients) | set(self.async_clients):
+                host = self._host(key)
+                recent = sorted(host["recent"])
+                gateways[key] = {
+                    "requests": host["requests"],
+                    "errors": host["errors"],
+                    "avg_ms": round(host["total_ms"] / host["requests"], 1) if host["requests"] else None,
+                    "p50_ms": round(recent[len(recent) // 2], 1) if recent else None,
+                    "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else None,
+                    "max_ms": round(host["max_ms"], 1),
+                    "pooled": key in self.sync_clients or key in self.async_clients,
+                }
+        return {
+            "limits": {"max_connections": GATEWAY_MAX_CONNECTIONS, "max_keepalive": GATEWAY_MAX_KEEPALIVE,
+                       "keepalive_expiry": GATEWAY_KEEPALIVE_EXPIRY, "connect_timeout": GATEWAY_CONNECT_TIMEOUT},
+            "gateways": gateways,
+        }
+
+gateway_clients = GatewayClientPool()
+
+def remote_gateway_configs() -> list:
+    """Remote blocks of all agents in openclaw.json that have an api_url."""
+    return [agent["remote"] for agent in openclaw_config.remote_agents()]
+
+@app.get("/api/gateways/stats")
+def get_gateway_stats():
+    """Pooled remote gateway clients and per-host request latency."""
+    return gateway_clients.stats()
+
+# ============ Remote Agent Health ============
+# A circuit breaker per remote agent: after REMOTE_BREAKER_THRESHOLD consecutive
+# failures (connect errors, timeouts, 5xx) it opens, and chat, notifications and cron
+# sync skip that agent at once instead of each waiting out its timeout. After
+# REMOTE_BREAKER_COOLDOWN seconds the breaker goes half-open and lets one real call
+# through as a trial: success closes it, failure reopens it for another cooldown.
+# A background probe also retries open agents every REMOTE_PROBE_INTERVAL seconds
+# and closes the breaker as soon as the gateway answers again.
+REMOTE_BREAKER_THRESHOLD = int(os.getenv("REMOTE_BREAKER_THRESHOLD", "3"))
+REMOTE_BREAKER_COOLDOWN = float(os.getenv("REMOTE_BREAKER_COOLDOWN", "30"))  # Seconds
+REMOTE_PROBE_INTERVAL = float(os.getenv("REMOTE_PROBE_INTERVAL", "15"))  # Seconds
+REMOTE_PROBE_TIMEOUT = float(os.getenv("REMOTE_PROBE_TIMEOUT", "5"))  # Seconds
+REMOTE_PROBE_PATH = os.getenv("REMOTE_PROBE_PATH", "/")  # Any non-5xx answer counts as healthy
+
+class RemoteAgentHealth:
+    """Health record and breaker state (closed / open / half_open) for one remote agent."""
+
+    def __init__(self, agent_id: str, api_url: str):
+        self.agent_id = agent_id
+        self.api_url = api_url
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0  # Calls failed fast while open
+        self.trials = 0    # Calls let through half-open
+        self.retry_at = 0.0  # Monotonic time the next trial call may go through
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.opened_at: Optional[datetime] = None
+        self.last_probe_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        iso = lambda dt: dt.isoformat() if dt else None
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "trials": self.trials,
+            "last_error": self.last_error,
+            "last_success_at": iso(self.last_success_at),
+            "last_failure_at": iso(self.last_failure_at),
+            "opened_at": iso(self.opened_at),
+            "last_probe_at": iso(self.last_probe_at),
+        }
+
+class RemoteHealthRegistry:
+    """Breakers for all remote agents, plus the probe loop that closes them.
+
+    Outcomes are recorded from the event loop (chat) and from threads (cron sync).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.agents: dict = {}  # agent_id -> RemoteAgentHealth
+        self.task: Optional[asyncio.Task] = None
+
+    def _entry(self, agent_id: str, api_url: str) -> RemoteAgentHealth:
+        entry = self.agents.get(agent_id)
+        if entry is None:
+            entry = self.agents[agent_id] = RemoteAgentHealth(agent_id, api_url)
+        entry.api_url = api_url
+        return entry
+
+    def allow(self, agent_id: str) -> bool:
+        """False while the agent's breaker is open (the call should fail fast).
+
+        Once the cooldown has passed one call is let through half-open; its outcome
+        closes or reopens the breaker. If it never reports back, another call gets
+        a turn after a further cooldown.
+        """
+        with self.lock:
+            entry = self.agents.get(agent_id)
+            if entry is None or entry.state == "closed":
+                return True
+            now = time.monotonic()
+            if now >= entry.retry_at:
+                entry.state = "half_open"
+                entry.retry_at = now + REMOTE_BREAKER_COOLDOWN
+                entry.trials += 1
+                return True
+            entry.rejected += 1
+            return False
+
+    def unavailable_message(self, agent_id: str) -> str:
+        entry = self.agents.get(agent_id)
+        last_error = entry.last_error if entry else None
+        return f"⚠️ Remote agent unavailable (circuit open after repeated failures: {last_error or 'unknown error'})"
+
+    def record_success(self, agent_id: Optional[str], api_url: str):
+        if not agent_id:
+            return
+        with self.lock:
+            entry = self._entry(agent_id, api_url)
+            entry.successes += 1
+            entry.consecutive_failures = 0
+            entry.last_success_at = datetime.utcnow()
+            if entry.state == "closed":
+                return
+            entry.state = "closed"
+            entry.opened_at = None
+        print(f"Circuit closed for remote agent {agent_id}: call succeeded")
+
+    def record_failure(self, agent_id: Optional[str], api_url: str, error: str):
+        if not agent_id:
+            return
+        with self.lock:
+            entry = self._entry(agent_id, api_url)
+            entry.failures += 1
+            entry.consecutive_failures += 1
+            entry.last_error = error
+            entry.last_failure_at = datetime.utcnow()
+            if entry.state == "half_open":
+                entry.state = "open"
+                entry.opened_at = entry.last_failure_at
+                entry.retry_at = time.monotonic() + REMOTE_BREAKER_COOLDOWN
+                print(f"Circuit reopened for remote agent {agent_id}: trial call failed: {error}")
+            elif entry.state == "closed" and entry.consecutive_failures >= REMOTE_BREAKER_THRESHOLD:
+                entry.state = "open"
+                entry.opened_at = entry.last_failure_at
+                entry.retry_at = time.monotonic() + REMOTE_BREAKER_COOLDOWN
+                print(f"Circuit opened for remote agent {agent_id} after {entry.consecutive_failures} failures: {error}")
+
+    def record_status(self, agent_id: Optional[str], api_url: str, status_code: int):
+        """Record an HTTP answer: 5xx means the gateway is unhealthy, anything else that it's up."""
+        if status_code >= 500:
+            self.record_failure(agent_id, api_url, f"HTTP {status_code}")
+        else:
+            self.record_success(agent_id, api_url)
+
+    def get(self, agent_id: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.agents.get(agent_id)
+            return entry.to_dict() if entry else None
+
+    def start(self):
+        self.task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(REMOTE_PROBE_INTERVAL)
+            try:
+                await self.probe_open()
+            except Exception as e:
+                print(f"Remote health probe error: {e}")
+
+    async def probe_open(self):
+        """Probe every agent whose breaker is open, concurrently."""
+        with self.lock:
+            entries = [entry for entry in self.agents.values() if entry.state == "open"]
+        await asyncio.gather(*(self._probe(entry) for entry in entries))
+
+    async def _probe(self, entry: RemoteAgentHealth):
+        url = f"{entry.api_url.rstrip('/')}{REMOTE_PROBE_PATH}"
+        try:
+            response = await gateway_clients.async_client(entry.api_url).get(url, timeout=gateway_timeout(REMOTE_PROBE_TIMEOUT))
+            error = f"HTTP {response.status_code}" if response.status_code >= 500 else None
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        with self.lock:
+            entry.last_probe_at = datetime.utcnow()
+            if error:
+                entry.last_error = error
+                return
+            entry.state = "closed"
+            entry.consecutive_failures = 0
+            entry.opened_at = None
+        print(f"Circuit closed for remote agent {entry.agent_id}: probe succeeded")
+
+remote_health = RemoteHealthRegistry()
+
+async def send_message_to_remote_agent(api_url: str, gateway_token: str, message: str, timeout: int = AGENT_CHAT_TIMEOUT,
+                                       agent_id: Optional[str] = None) -> str:
+    """Send a message to a remote agent via HTTP API.
+
+    With `agent_id`, the outcome feeds that agent's circuit breaker and the call
+    fails fast while the breaker is open.
+    """
+    try:
+        gateway_token = resolve_gateway_token(gateway_token)
+        if not gateway_token:
+            return "⚠️ Remote gateway token not configured"
+        if agent_id and not remote_health.allow(agent_id):
+            return remote_health.unavailable_message(agent_id)
+
+        # Call the remote chat API
+        url = f"{api_url.rstrip('/')}/api/chat/send"
+        headers = {
+            "Authorization": f"Bearer {gateway_token}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "message": message,
+            "timeout_ms": timeout * 1000
+        }
+
+        print(f"Sending message to remote agent at {url}")
+        client = gateway_clients.async_client(api_url)
+        response = await client.post(url, json=payload, headers=headers, timeout=gateway_timeout(timeout + 10))
+        remote_health.record_status(agent_id, api_url, response.status_code)
+
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("response", "(No response)")
+        elif response.status_code == 401:
+            return "⚠️ Unauthorized - check MOLTBOT_GATEWAY_TOKEN"
+        else:
+            error = response.json().get("error", response.text)
+            return f"⚠️ Remote error ({response.status_code}): {error}"
+
+    except httpx.TimeoutException:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, "timed out")
+        return f"⚠️ Remote agent timed out ({timeout}s limit)"
+    except httpx.ConnectError:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, "could not connect")
+        return "⚠️ Could not connect to remote agent"
+    except httpx.TransportError as e:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, f"{type(e).__name__}: {e}")
+        return f"⚠️ Remote error: {str(e)}"
+    except Exception as e:
+        return f"⚠️ Remote error: {str(e)}"
+
+def parse_openclaw_response(stdout: str) -> str:
+    """Extract the reply text from `openclaw agent --json` output."""
+    try:
+        response_data = json.loads(stdout)
+        # OpenClaw returns: { result: { payloads: [{ text: "..." }] } }
+        payloads = response_data.get("result", {}).get("payloads", [])
+        if payloads:
+            # Combine all text payloads
+            texts = [p.get("text", "") for p in payloads if p.get("text")]
+            agent_response = "\n".join(texts) if texts else "(No text in response)"
+        else:
+            # Fallback to other fields
+            agent_response = response_data.get("response", "") or response_data.get("content", "") or "(No response)"
+    except json.JSONDecodeError:
+        # If not JSON, use raw output
+        agent_response = stdout.strip()
+    return agent_response or "(No response from agent)"
+
+async def send_message_to_local_agent(agent_id: str, message: str, timeout: int = AGENT_CHAT_TIMEOUT) -> str:
+    """Send a message to a local agent via the openclaw CLI, without blocking the event loop."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "openclaw", "agent",
+            "--agent", agent_id,
+            "--message", message,
+            "--json",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(Path.home())
+        )
+    except FileNotFoundError:
+        return "⚠️ OpenClaw CLI not found. Configure the agent as 'remote' in openclaw.json to use HTTP API instead."
+    except Exception as e:
+        return f"⚠️ Error: {str(e)}"
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except BaseException as e:
+        # Timeout, or the request was cancelled: don't leave the CLI running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if isinstance(e, asyncio.TimeoutError):
+            return f"⚠️ Agent response timed out ({timeout}s limit)"
+        raise
+
+    if proc.returncode == 0:
+        return parse_openclaw_response(stdout.decode(errors="replace"))
+    error_msg = stderr.decode(errors="replace").strip() if stderr else ""
+    return f"⚠️ Agent error: {error_msg or 'Unknown error'}"
+
+class ChatDeltaStream:
+    """Broadcasts an agent reply as chat_message_delta frames while it is generated.
+
+    Every frame carries the id the final ChatMessage will be saved under, and the
+    character offset of its delta so clients can spot a gap and wait for the final message.
+    """
+
+    def __init__(self, message_id: str, agent_id: str, agent_info: dict):
+        self.message_id = message_id
+        self.agent_id = agent_id
+        self.agent_info = agent_info
+        self.buffer: list = []
+        self.chunks: list = []  # Everything received so far
+        self.received = 0  # Characters received
+        self.sent = 0  # Characters broadcast
+        self.last_flush = 0.0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    async def push(self, text: str):
+        if not text:
+            return
+        self.chunks.append(text)
+        self.received += len(text)
+        self.buffer.append(text)
+        if time.monotonic() - self.last_flush >= CHAT_STREAM_FLUSH_MS / 1000:
+            await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        delta = "".join(self.buffer)
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        await manager.broadcast({
+            "type": "chat_message_delta",
+            "data": {
+                "id": self.message_id,
+                "agent_id": self.agent_id,
+                "agent": self.agent_info,
+                "offset": self.sent,
+                "delta": delta,
+            }
+        }, ephemeral=True)
+        self.sent += len(delta)
+
+async def stream_local_agent(agent_id: str, message: str, on_chunk, timeout: int = AGENT_CHAT_TIMEOUT) -> str:
+    """Run the openclaw CLI in plain-text mode, passing stdout to `on_chunk` as it arrives."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "openclaw", "agent",
+            "--agent", agent_id,
+            "--message", message,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(Path.home())
+        )
+    except FileNotFoundError:
+        return "⚠️ OpenClaw CLI not found. Configure the agent as 'remote' in openclaw.json to use HTTP API instead."
+    except Exception as e:
+        return f"⚠️ Error: {str(e)}"
+
+    chunks = []
+
+    async def pump() -> bytes:
+        stderr_task = asyncio.create_task(proc.stderr.read())  # Drained alongside stdout so neither pipe fills up
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            data = await proc.stdout.read(4096)
+            text = decoder.decode(data, final=not data)
+            if text:
+                chunks.append(text)
+                await on_chunk(text)
+            if not data:
+                break
+        await proc.wait()
+        return await stderr_task
 
     try:
-        with open(config_path) as f:
-            config = json.load(f)
-        agents_list = config.get("agents", {}).get("list", [])
-        for agent in agents_list:
-            if agent.get("id") == agent_id:
-                remote = agent.get("remote")
-                if remote and remote.get("api_url"):
-                    return remote
-        return None
-    except:
-        return None
-
-def send_message_to_remote_agent(api_url: str, gateway_token: str, message: str, timeout: int = 120) -> str:
-    """Send a message to a remote agent via HTTP API."""
+        stderr = await asyncio.wait_for(pump(), timeout=timeout)
+    except BaseException as e:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if isinstance(e, asyncio.TimeoutError):
+            return "".join(chunks).strip() + f"\n\n⚠️ Agent response timed out ({timeout}s limit)"
+        raise
+
+    reply = "".join(chunks).strip()
+    if proc.returncode == 0:
+        return reply or "(No response from agent)"
+    error_msg = f"⚠️ Agent error: {stderr.decode(errors='replace').strip() or 'Unknown error'}"
+    return f"{reply}\n\n{error_msg}" if reply else error_msg
+
+async def stream_remote_agent(api_url: str, gateway_token: str, message: str, on_chunk, timeout: int = AGENT_CHAT_TIMEOUT,
+                              agent_id: Optional[str] = None) -> str:
+    """Send a message to a remote agent, passing the chunked reply to `on_chunk` as it arrives.
+
+    Gateways that answer with a single JSON body are handled too (one chunk).
+    `agent_id` ties the call to a circuit breaker, as in send_message_to_remote_agent.
+    """
     try:
-        # Expand environment variables in gateway token
-        if gateway_token.startswith("${") and gateway_token.endswith("}"):
-            env_var = gateway_token[2:-1]
-            gateway_token = os.environ.get(env_var, "")
-
+        gateway_token = resolve_gateway_token(gateway_token)
         if not gateway_token:
             return "⚠️ Remote gateway token not configured"
+        if agent_id and not remote_health.allow(agent_id):
+            return remote_health.unavailable_message(agent_id)
 
-        # Call the remote chat API
         url = f"{api_url.rstrip('/')}/api/chat/send"
         headers = {
             "Authorization": f"Bearer {gateway_token}",
@@ -1278,49 +3636,368 @@ def send_message_to_remote_agent(api_url: str, gateway_token: str, message: str,
         }
         payload = {
             "message": message,
-            "timeout_ms": timeout * 1000
+            "timeout_ms": timeout * 1000,
+            "stream": True
         }
 
-        print(f"Sending message to remote agent at {url}")
-        response = requests.post(url, json=payload, headers=headers, timeout=timeout + 10)
-
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("response", "(No response)")
-        elif response.status_code == 401:
-            return "⚠️ Unauthorized - check MOLTBOT_GATEWAY_TOKEN"
-        else:
-            error = response.json().get("error", response.text)
-            return f"⚠️ Remote error ({response.status_code}): {error}"
-
-    except requests.Timeout:
+        print(f"Streaming message to remote agent at {url}")
+        client = gateway_clients.async_client(api_url)
+        async with client.stream("POST", url, json=payload, headers=headers,
+                                 timeout=gateway_timeout(timeout + 10)) as response:
+            remote_health.record_status(agent_id, api_url, response.status_code)
+            if response.status_code == 401:
+                return "⚠️ Unauthorized - check MOLTBOT_GATEWAY_TOKEN"
+            if response.status_code != 200:
+                body = await response.aread()
+                try:
+                    error = json.loads(body).get("error", body.decode(errors="replace"))
+                except ValueError:
+                    error = body.decode(errors="replace")
+                return f"⚠️ Remote error ({response.status_code}): {error}"
+
+            if response.headers.get("content-type", "").startswith("application/json"):
+                reply = json.loads(await response.aread()).get("response", "(No response)")
+                await on_chunk(reply)
+                return reply
+
+            chunks = []
+            async for text in response.aiter_text():
+                chunks.append(text)
+                await on_chunk(text)
+            return "".join(chunks).strip() or "(No response)"
+
+    except httpx.TimeoutException:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, "timed out")
         return f"⚠️ Remote agent timed out ({timeout}s limit)"
-    except requests.ConnectionError:
+    except httpx.ConnectError:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, "could not connect")
         return "⚠️ Could not connect to remote agent"
+    except httpx.TransportError as e:
+        gateway_clients.record_error(api_url)
+        remote_health.record_failure(agent_id, api_url, f"{type(e).__name__}: {e}")
+        return f"⚠️ Remote error: {str(e)}"
     except Exception as e:
         return f"⚠️ Remote error: {str(e)}"
 
-@app.post("/api/chat/send-to-agent")
-async def send_to_agent(data: SendToAgentRequest, db: Session = Depends(get_db)):
-    """Send a message to an OpenClaw agent and get the response.
+# ============ Agent Transports ============
+# Every way of reaching an agent sits behind AgentTransport: chat replies (send /
+# stream) and fire-and-forget notifications (notify). Remote agents always use HTTP;
+# local agents use the CLI (one process per message) or, with AGENT_TRANSPORT=worker,
+# a pool of long-lived worker processes so start-up is paid once, not per message.
+AGENT_TRANSPORT = os.getenv("AGENT_TRANSPORT", "cli").lower()  # Local agents: "cli" or "worker"
+AGENT_WORKER_COMMAND = os.getenv("AGENT_WORKER_COMMAND", "")  # e.g. "python fake_agent_worker.py"
+AGENT_WORKER_POOL_SIZE = int(os.getenv("AGENT_WORKER_POOL_SIZE", "4"))
+AGENT_WORKER_MAX_REQUESTS = int(os.getenv("AGENT_WORKER_MAX_REQUESTS", "500"))  # Recycle a worker after this many messages (0 = never)
+AGENT_WORKER_LINE_LIMIT = 16 * 1024 * 1024  # Longest NDJSON line read from a worker
+
+class AgentTransport(ABC):
+    """Delivers messages to agents.
+
+    send/stream return the reply text, with failures as "⚠️ ..." text like the
+    chat UI expects. notify returns None on success or an error string, and
+    raises asyncio.TimeoutError when the agent takes longer than `timeout`.
+    """
+    name = "base"
 
-    Supports both local agents (via openclaw CLI) and remote agents (via HTTP API).
-    Remote agents are configured in openclaw.json with a 'remote' block containing
-    api_url and gateway_token.
+    @abstractmethod
+    async def send(self, agent_id: str, message: str, timeout: float) -> str:
+        ...
+
+    async def stream(self, agent_id: str, message: str, on_chunk, timeout: float) -> str:
+        reply = await self.send(agent_id, message, timeout)
+        await on_chunk(reply)
+        return reply
+
+    @abstractmethod
+    async def notify(self, agent_id: str, message: str, timeout: float) -> Optional[str]:
+        ...
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+class CliTransport(AgentTransport):
+    """One `openclaw agent` process per message."""
+    name = "cli"
+
+    def __init__(self):
+        self.exit_codes: dict = {}  # Notification runs by exit code
+
+    async def send(self, agent_id: str, message: str, timeout: float) -> str:
+        return await send_message_to_local_agent(agent_id, message, timeout)
+
+    async def stream(self, agent_id: str, message: str, on_chunk, timeout: float) -> str:
+        return await stream_local_agent(agent_id, message, on_chunk, timeout)
+
+    async def notify(self, agent_id: str, message: str, timeout: float) -> Optional[str]:
+        proc = await asyncio.create_subprocess_exec(
+            "openclaw", "agent", "--agent", agent_id, "--message", message,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=str(Path.home())
+        )
+        try:
+            exit_code = await asyncio.wait_for(proc.wait(), timeout=timeout)
+        except BaseException:
+            # Timeout or shutdown: never leave the child running or unreaped
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        self.exit_codes[exit_code] = self.exit_codes.get(exit_code, 0) + 1
+        return f"openclaw exited with {exit_code}" if exit_code != 0 else None
+
+    def stats(self) -> dict:
+        return {"exit_codes": {str(code): n for code, n in sorted(self.exit_codes.items())}}
+
+class RemoteHttpTransport(AgentTransport):
+    """Agents with a `remote` block in openclaw.json, over the pooled gateway clients."""
+    name = "remote"
+
+    def _remote(self, agent_id: str) -> dict:
+        return get_agent_remote_config(agent_id) or {}
+
+    async def send(self, agent_id: str, message: str, timeout: float) -> str:
+        remote = self._remote(agent_id)
+        return await send_message_to_remote_agent(remote.get("api_url", ""), remote.get("gateway_token", ""), message, timeout,
+                                                  agent_id=agent_id)
+
+    async def stream(self, agent_id: str, message: str, on_chunk, timeout: float) -> str:
+        remote = self._remote(agent_id)
+        return await stream_remote_agent(remote.get("api_url", ""), remote.get("gateway_token", ""), message, on_chunk, timeout,
+                                         agent_id=agent_id)
+
+    async def notify(self, agent_id: str, message: str, timeout: float) -> Optional[str]:
+        reply = await asyncio.wait_for(self.send(agent_id, message, timeout), timeout=timeout + 15)
+        if reply.startswith("⚠️ Remote agent timed out"):
+            raise asyncio.TimeoutError()
+        return reply if reply.startswith("⚠️") else None
+
+class AgentWorker:
+    """One long-lived worker process speaking newline-delimited JSON on stdin/stdout.
+
+    Request:  {"id": "...", "agent_id": "...", "message": "...", "stream": bool}
+    Replies:  {"id": "...", "delta": "..."} while streaming, then exactly one of
+              {"id": "...", "reply": "..."} or {"id": "...", "error": "..."}
+    A worker handles one request at a time.
     """
-    agent_id = data.agent_id
-    message = data.message
 
-    if not agent_id or not message:
-        raise HTTPException(status_code=400, detail="agent_id and message are required")
+    def __init__(self, proc):
+        self.proc = proc
+        self.requests = 0
+        self.broken = False  # Died, timed out or was cancelled mid-request; never reused
+
+    @classmethod
+    async def spawn(cls, command: list) -> "AgentWorker":
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=str(Path.home()),
+            limit=AGENT_WORKER_LINE_LIMIT
+        )
+        return cls(proc)
 
-    # First, save and broadcast the user's message
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self.proc.returncode is None
+
+    async def request(self, agent_id: str, message: str, on_chunk=None) -> dict:
+        """Send one message and wait for its final reply/error frame."""
+        request_id = generate_uuid()
+        self.requests += 1
+        try:
+            line = json.dumps({"id": request_id, "agent_id": agent_id, "message": message, "stream": on_chunk is not None})
+            self.proc.stdin.write(line.encode() + b"\n")
+            await self.proc.stdin.drain()
+            while True:
+                raw = await self.proc.stdout.readline()
+                if not raw:
+                    raise ConnectionError(f"worker exited with {await self.proc.wait()}")
+                try:
+                    frame = json.loads(raw)
+                except ValueError:
+                    continue  # Stray output from the worker; only JSON frames count
+                if frame.get("id") != request_id:
+                    continue
+                if "delta" in frame:
+                    if on_chunk and frame["delta"]:
+                        await on_chunk(frame["delta"])
+                    continue
+                return frame
+        except BaseException:
+            # The worker is mid-request in an unknown state: retire it
+            self.broken = True
+            raise
+
+    async def stop(self):
+        if self.proc.returncode is None and not self.broken:
+            try:
+                self.proc.stdin.close()  # EOF asks an idle worker to exit
+                await asyncio.wait_for(self.proc.wait(), timeout=2)
+            except (asyncio.TimeoutError, OSError):
+                pass
+        if self.proc.returncode is None:
+            self.proc.kill()
+            await self.proc.wait()
+
+class WorkerPoolTransport(AgentTransport):
+    """Local agents through a pool of persistent worker processes (see AgentWorker)."""
+    name = "worker"
+
+    def __init__(self, command: str, size: int, max_requests: int):
+        self.command = shlex.split(command)
+        self.size = size
+        self.max_requests = max_requests
+        self.idle: list = []
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.busy = 0
+        self.spawned = 0
+        self.retired = 0
+        self.requests = 0
+        self.failures = 0
+        self.run_seconds: deque = deque(maxlen=500)
+
+    async def start(self):
+        self.slots = asyncio.Semaphore(self.size)
+        for _ in range(self.size):
+            try:
+                self.idle.append(await self._spawn())
+            except Exception as e:
+                print(f"Failed to start agent worker {self.command}: {e}")
+                break
+
+    async def close(self):
+        idle, self.idle = self.idle, []
+        await asyncio.gather(*(worker.stop() for worker in idle), return_exceptions=True)
+        self.slots = None
+
+    async def _spawn(self) -> AgentWorker:
+        worker = await AgentWorker.spawn(self.command)
+        self.spawned += 1
+        return worker
+
+    async def _request(self, agent_id: str, message: str, timeout: float, on_chunk=None) -> dict:
+        if self.slots is None:
+            raise RuntimeError("worker pool not running")
+        async with self.slots:
+            worker = None
+            while self.idle and worker is None:
+                candidate = self.idle.pop()
+                if candidate.alive:
+                    worker = candidate
+                else:
+                    self.retired += 1
+                    await candidate.stop()
+            if worker is None:
+                worker = await self._spawn()
+            started = time.monotonic()
+            self.requests += 1
+            self.busy += 1
+            try:
+                frame = await asyncio.wait_for(worker.request(agent_id, message, on_chunk), timeout=timeout)
+            except BaseException:
+                self.failures += 1
+                raise
+            finally:
+                self.busy -= 1
+                if worker.alive and self.slots is not None and (not self.max_requests or worker.requests < self.max_requests):
+                    self.idle.append(worker)
+                else:
+                    self.retired += 1
+                    await worker.stop()
+            self.run_seconds.append(time.monotonic() - started)
+            return frame
+
+    async def send(self, agent_id: str, message: str, timeout: float) -> str:
+        try:
+            frame = await self._request(agent_id, message, timeout)
+        except asyncio.TimeoutError:
+            return f"⚠️ Agent response timed out ({timeout}s limit)"
+        except Exception as e:
+            return f"⚠️ Agent worker error: {e}"
+        if "error" in frame:
+            return f"⚠️ Agent error: {frame['error'] or 'Unknown error'}"
+        return frame.get("reply") or "(No response from agent)"
+
+    async def stream(self, agent_id: str, message: str, on_chunk, timeout: float) -> str:
+        chunks = []
+
+        async def collect(text: str):
+            chunks.append(text)
+            await on_chunk(text)
+
+        try:
+            frame = await self._request(agent_id, message, timeout, collect)
+        except asyncio.TimeoutError:
+            return "".join(chunks).strip() + f"\n\n⚠️ Agent response timed out ({timeout}s limit)"
+        except Exception as e:
+            frame = {"error": f"worker failed: {e}"}
+        reply = "".join(chunks).strip()
+        if "error" in frame:
+            error_msg = f"⚠️ Agent error: {frame['error'] or 'Unknown error'}"
+            return f"{reply}\n\n{error_msg}" if reply else error_msg
+        if not reply and frame.get("reply"):
+            # Worker answered in one piece
+            reply = frame["reply"]
+            await on_chunk(reply)
+        return reply or "(No response from agent)"
+
+    async def notify(self, agent_id: str, message: str, timeout: float) -> Optional[str]:
+        frame = await self._request(agent_id, message, timeout)
+        if "error" in frame:
+            return frame["error"] or "Unknown error"
+        return None
+
+    def stats(self) -> dict:
+        ordered = sorted(self.run_seconds)
+        return {
+            "command": self.command,
+            "pool_size": self.size,
+            "idle": len(self.idle),
+            "busy": self.busy,
+            "spawned": self.spawned,
+            "retired": self.retired,
+            "requests": self.requests,
+            "failures": self.failures,
+            "run_seconds_p50": round(ordered[len(ordered) // 2], 3) if ordered else None,
+        }
+
+cli_transport = CliTransport()
+remote_transport = RemoteHttpTransport()
+if AGENT_TRANSPORT == "worker" and AGENT_WORKER_COMMAND:
+    local_transport: AgentTransport = WorkerPoolTransport(AGENT_WORKER_COMMAND, AGENT_WORKER_POOL_SIZE, AGENT_WORKER_MAX_REQUESTS)
+else:
+    if AGENT_TRANSPORT == "worker":
+        print("AGENT_TRANSPORT=worker needs AGENT_WORKER_COMMAND; using the CLI transport")
+    local_transport = cli_transport
+
+def transport_for(agent_id: str) -> AgentTransport:
+    """Remote agents go over HTTP; local ones use the configured local transport."""
+    return remote_transport if get_agent_remote_config(agent_id) else local_transport
+
+@app.get("/api/transports/stats")
+def get_transport_stats():
+    """Which transport local agents use, and per-transport counters."""
+    return {
+        "local": local_transport.name,
+        "transports": {t.name: t.stats() for t in (cli_transport, remote_transport, local_transport)},
+    }
+
+async def save_user_chat_message(db: Session, message: str) -> ChatMessage:
+    """Save and broadcast the user's side of an agent chat."""
     user_message = ChatMessage(agent_id="user", content=message)
     db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    db.flush()  # Assigns id and created_at
 
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "chat_message",
         "data": {
             "id": user_message.id,
@@ -1330,104 +4007,254 @@ async def send_to_agent(data: SendToAgentRequest, db: Session = Depends(get_db))
             "created_at": user_message.created_at.isoformat()
         }
     })
+    # Committed on its own: the agent's reply can take minutes, and holding the
+    # write transaction open that long would block every other writer
+    db.commit()
+    return user_message
 
-    # Check if this is a remote agent
-    remote_config = get_agent_remote_config(agent_id)
+async def complete_agent_chat(agent_id: str, message: str, stream: bool, agent_message_id: str,
+                              job: Optional["ChatJob"] = None) -> str:
+    """Get the agent's reply, then save and broadcast it. Returns the reply text.
 
-    if remote_config:
-        # Send to remote agent via HTTP
-        api_url = remote_config.get("api_url", "")
-        gateway_token = remote_config.get("gateway_token", "")
-        agent_response = send_message_to_remote_agent(api_url, gateway_token, message)
-    else:
-        # Call local OpenClaw CLI
+    Uses its own session so it can outlive the request (chat jobs). If cancelled,
+    whatever was streamed so far is saved with a note before re-raising.
+    """
+    transport = transport_for(agent_id)
+
+    db = SessionLocal()
+    try:
+        # Get agent info for the response
+        agent_info = get_agent_info(agent_id, db)
+        delta_stream = ChatDeltaStream(agent_message_id, agent_id, agent_info) if stream else None
+        if job:
+            job.delta_stream = delta_stream
+
+        cancelled = False
         try:
-            result = subprocess.run(
-                [
-                    "openclaw", "agent",
-                    "--agent", agent_id,
-                    "--message", message,
-                    "--json"
-                ],
-                capture_output=True,
-                text=True,
-                timeout=120,  # 2 minute timeout for agent response
-                cwd=str(Path.home())
-            )
+            async with agent_chat_slot(agent_id):
+                if job:
+                    job.mark_running()
+                if delta_stream:
+                    agent_response = await transport.stream(agent_id, message, delta_stream.push, AGENT_CHAT_TIMEOUT)
+                    await delta_stream.flush()
+                else:
+                    agent_response = await transport.send(agent_id, message, AGENT_CHAT_TIMEOUT)
+        except asyncio.CancelledError:
+            # The CLI / worker has been killed (or the remote request aborted); close out the chat
+            cancelled = True
+            partial = delta_stream.text.strip() if delta_stream else ""
+            agent_response = f"{partial}\n\n⚠️ Cancelled" if partial else "⚠️ Cancelled"
+
+        # Log API usage for this interaction
+        est_tokens_in = len(message.split()) * 2  # rough estimate
+        est_tokens_out = len(agent_response.split()) * 2
+        est_cost = (est_tokens_in * 0.000003) + (est_tokens_out * 0.000015)  # approximate Claude pricing
+        usage_log = ApiUsageLog(
+            model="claude-3-5-haiku",
+            tokens_in=est_tokens_in,
+            tokens_out=est_tokens_out,
+            cost=f"{est_cost:.6f}",
+            agent_id=agent_id,
+        )
+        db.add(usage_log)
 
-            if result.returncode == 0:
-                # Parse JSON response from OpenClaw
-                try:
-                    response_data = json.loads(result.stdout)
-                    # OpenClaw returns: { result: { payloads: [{ text: "..." }] } }
-                    payloads = response_data.get("result", {}).get("payloads", [])
-                    if payloads:
-                        # Combine all text payloads
-                        texts = [p.get("text", "") for p in payloads if p.get("text")]
-                        agent_response = "\n".join(texts) if texts else "(No text in response)"
-                    else:
-                        # Fallback to other fields
-                        agent_response = response_data.get("response", "") or response_data.get("content", "") or "(No response)"
-                except json.JSONDecodeError:
-                    # If not JSON, use raw output
-                    agent_response = result.stdout.strip()
-
-                if not agent_response:
-                    agent_response = "(No response from agent)"
-            else:
-                # Handle error
-                error_msg = result.stderr.strip() if result.stderr else "Unknown error"
-                agent_response = f"⚠️ Agent error: {error_msg}"
-
-        except subprocess.TimeoutExpired:
-            agent_response = "⚠️ Agent response timed out (120s limit)"
-        except FileNotFoundError:
-            agent_response = "⚠️ OpenClaw CLI not found. Configure the agent as 'remote' in openclaw.json to use HTTP API instead."
-        except Exception as e:
-            agent_response = f"⚠️ Error: {str(e)}"
-
-    # Log API usage for this interaction
-    est_tokens_in = len(message.split()) * 2  # rough estimate
-    est_tokens_out = len(agent_response.split()) * 2
-    est_cost = (est_tokens_in * 0.000003) + (est_tokens_out * 0.000015)  # approximate Claude pricing
-    usage_log = ApiUsageLog(
-        model="claude-3-5-haiku",
-        tokens_in=est_tokens_in,
-        tokens_out=est_tokens_out,
-        cost=f"{est_cost:.6f}",
-        agent_id=agent_id,
-    )
-    db.add(usage_log)
-    db.commit()
+        # Save agent's response to chat (under the id the stream's deltas used)
+        agent_message = ChatMessage(id=agent_message_id, agent_id=agent_id, content=agent_response)
+        db.add(agent_message)
+        db.flush()  # Assigns created_at
+
+        # Broadcast agent's response
+        queue_broadcast(db, {
+            "type": "chat_message",
+            "data": {
+                "id": agent_message_id,
+                "content": agent_response,
+                "agent_id": agent_id,
+                "agent": agent_info,
+                "created_at": agent_message.created_at.isoformat()
+            }
+        })
+        db.commit()
+    finally:
+        db.close()
 
-    # Get agent info for the response
-    agent_info = get_agent_info(agent_id, db)
+    if cancelled:
+        raise asyncio.CancelledError()
+    return agent_response
 
-    # Save agent's response to chat
-    agent_message = ChatMessage(agent_id=agent_id, content=agent_response)
-    db.add(agent_message)
-    db.commit()
-    db.refresh(agent_message)
+@app.post("/api/chat/send-to-agent")
+async def send_to_agent(data: SendToAgentRequest, db: Session = Depends(get_db)):
+    """Send a message to an OpenClaw agent and get the response.
 
-    # Broadcast agent's response
-    await manager.broadcast({
-        "type": "chat_message",
-        "data": {
-            "id": agent_message.id,
-            "content": agent_message.content,
-            "agent_id": agent_id,
-            "agent": agent_info,
-            "created_at": agent_message.created_at.isoformat()
-        }
-    })
+    Supports both local agents (via openclaw CLI) and remote agents (via HTTP API).
+    Remote agents are configured in openclaw.json with a 'remote' block containing
+    api_url and gateway_token.
+
+    Holds the request open for the whole agent run; see /api/chat/jobs to avoid that.
+    """
+    agent_id = data.agent_id
+    message = data.message
+
+    if not agent_id or not message:
+        raise HTTPException(status_code=400, detail="agent_id and message are required")
+
+    # First, save and broadcast the user's message
+    user_message = await save_user_chat_message(db, message)
+
+    agent_message_id = generate_uuid()
+    agent_response = await complete_agent_chat(agent_id, message, data.stream, agent_message_id)
 
     return {
         "ok": True,
         "user_message_id": user_message.id,
-        "agent_message_id": agent_message.id,
+        "agent_message_id": agent_message_id,
         "response": agent_response
     }
 
+# ============ Chat Jobs ============
+# POST /api/chat/jobs returns at once; the agent run continues as a background
+# task that can be polled or cancelled. Jobs live in memory: finished jobs stay
+# pollable for CHAT_JOB_RETENTION seconds (at most CHAT_JOB_MAX_FINISHED of them).
+CHAT_JOB_MAX_ACTIVE = int(os.getenv("CHAT_JOB_MAX_ACTIVE", "32"))
+CHAT_JOB_RETENTION = float(os.getenv("CHAT_JOB_RETENTION", "600"))
+CHAT_JOB_MAX_FINISHED = int(os.getenv("CHAT_JOB_MAX_FINISHED", "200"))
+
+class ChatJob:
+    """One background agent chat. Status: queued → running → completed | failed | cancelled."""
+
+    def __init__(self, agent_id: str, user_message_id: str, stream: bool):
+        self.id = generate_uuid()
+        self.agent_id = agent_id
+        self.user_message_id = user_message_id
+        self.agent_message_id = generate_uuid()
+        self.stream = stream
+        self.status = "queued"  # Waiting for a chat slot for this agent
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+        self.response: Optional[str] = None
+        self.error: Optional[str] = None
+        self.delta_stream: Optional[ChatDeltaStream] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def mark_running(self):
+        self.status = "running"
+        self.started_at = datetime.utcnow()
+
+    def mark_finished(self, status: str):
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self.finished_monotonic = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "user_message_id": self.user_message_id,
+            "agent_message_id": self.agent_message_id,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "streamed_chars": self.delta_stream.received if self.delta_stream else None,
+            "response": self.response,
+            "error": self.error,
+        }
+
+class ChatJobRegistry:
+    """Bounded set of chat jobs; finished jobs are evicted by age and count.
+
+    Not thread-safe: only touch it from the event loop (async endpoints).
+    """
+
+    def __init__(self):
+        self.jobs: dict = {}  # job id -> ChatJob, in creation order
+
+    def active_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def start(self, job: ChatJob, message: str):
+        self.evict()
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, message))
+
+    async def _run(self, job: ChatJob, message: str):
+        try:
+            job.response = await complete_agent_chat(job.agent_id, message, job.stream, job.agent_message_id, job=job)
+            job.mark_finished("completed")
+        except asyncio.CancelledError:
+            job.mark_finished("cancelled")
+        except Exception as e:
+            job.error = str(e)
+            job.mark_finished("failed")
+            print(f"Chat job {job.id} for agent {job.agent_id} failed: {e}")
+
+    def get(self, job_id: str) -> Optional[ChatJob]:
+        self.evict()
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job: ChatJob):
+        """Cancel a job and wait until its process has been killed and reaped."""
+        job.task.cancel()
+        await asyncio.wait([job.task], timeout=10)
+
+    async def cancel_all(self):
+        for job in list(self.jobs.values()):
+            if not job.finished:
+                await self.cancel(job)
+
+    def evict(self):
+        now = time.monotonic()
+        finished = [job for job in self.jobs.values() if job.finished]
+        expired = {job.id for job in finished if now - job.finished_monotonic > CHAT_JOB_RETENTION}
+        overflow = len(finished) - len(expired) - CHAT_JOB_MAX_FINISHED
+        if overflow > 0:
+            expired.update(job.id for job in [j for j in finished if j.id not in expired][:overflow])
+        for job_id in expired:
+            del self.jobs[job_id]
+
+chat_jobs = ChatJobRegistry()
+
+@app.post("/api/chat/jobs", status_code=202)
+async def create_chat_job(data: SendToAgentRequest, db: Session = Depends(get_db)):
+    """Start an agent chat in the background and return its job id at once.
+
+    The reply is broadcast over the WebSocket as usual; poll GET /api/chat/jobs/{id} for status.
+    """
+    if not data.agent_id or not data.message:
+        raise HTTPException(status_code=400, detail="agent_id and message are required")
+    if chat_jobs.active_count() >= CHAT_JOB_MAX_ACTIVE:
+        raise HTTPException(status_code=429, detail="Too many agent chats in progress, try again shortly")
+
+    user_message = await save_user_chat_message(db, data.message)
+    job = ChatJob(data.agent_id, user_message.id, data.stream)
+    chat_jobs.start(job, data.message)
+    return job.to_dict()
+
+@app.get("/api/chat/jobs/{job_id}")
+async def get_chat_job(job_id: str):
+    """Job status; async so it runs on the loop alongside the jobs it reads."""
+    job = chat_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.delete("/api/chat/jobs/{job_id}")
+async def cancel_chat_job(job_id: str):
+    """Cancel a running job: kills the agent CLI or aborts the remote request."""
+    job = chat_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    await chat_jobs.cancel(job)
+    return job.to_dict()
+
 # Announcement endpoints
 @app.get("/api/announcements")
 def get_announcements(limit: int = 10, db: Session = Depends(get_db)):
@@ -1450,11 +4277,10 @@ async def create_announcement(announcement_data: AnnouncementCreate, db: Session
         priority=Priority(announcement_data.priority)
     )
     db.add(announcement)
-    db.commit()
-    db.refresh(announcement)
+    db.flush()  # Assigns announcement.id
     
-    await log_activity(db, "announcement", description=f"📢 {announcement_data.message[:100]}")
-    await manager.broadcast({
+    log_activity(db, "announcement", description=f"📢 {announcement_data.message[:100]}")
+    queue_broadcast(db, {
         "type": "announcement",
         "data": {
             "id": announcement.id,
@@ -1463,20 +4289,21 @@ async def create_announcement(announcement_data: AnnouncementCreate, db: Session
             "priority": announcement.priority.value
         }
     })
+    db.commit()
     
     return {"id": announcement.id}
 
 # Activity feed
 @app.get("/api/activity")
-def get_activity(limit: int = 50, db: Session = Depends(get_db)):
-    activities = db.query(ActivityLog).order_by(ActivityLog.created_at.desc()).limit(limit).all()
+def get_activity(response: Response, limit: int = 50, before: Optional[str] = None, after: Optional[str] = None, db: Session = Depends(get_db)):
+    query = db.query(ActivityLog, Agent).outerjoin(Agent, ActivityLog.agent_id == Agent.id)
+    rows, next_cursor = keyset_page(query, ActivityLog.created_at, ActivityLog.id, limit, before, after)
+    set_next_cursor(response, next_cursor)
     result = []
-    for a in activities:
+    for a, agent_obj in rows:
         agent = None
-        if a.agent_id:
-            agent_obj = db.query(Agent).filter(Agent.id == a.agent_id).first()
-            if agent_obj:
-                agent = {"id": agent_obj.id, "name": agent_obj.name, "avatar": agent_obj.avatar}
+        if agent_obj:
+            agent = {"id": agent_obj.id, "name": agent_obj.name, "avatar": agent_obj.avatar}
         
         result.append({
             "id": a.id,
@@ -1621,42 +4448,30 @@ def format_schedule_human(schedule_type: str, schedule_value: str, schedule_time
 @app.get("/api/openclaw/crons")
 def fetch_openclaw_crons():
     """Fetch cron jobs from all remote OpenClaw agents via the /api/chat/crons endpoint."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-
-    if not config_path.exists():
-        return []
-
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception:
-        return []
-
     results = []
-    agents_list = config.get("agents", {}).get("list", [])
-    for agent in agents_list:
-        remote = agent.get("remote")
-        if not remote or not remote.get("api_url"):
-            continue
-
-        agent_id = agent.get("id", "unknown")
+    for agent in openclaw_config.remote_agents():
+        remote = agent["remote"]
+        agent_id = agent["id"]
         agent_name = agent.get("identity", {}).get("name", agent_id)
         api_url = remote["api_url"]
         gateway_token = remote.get("gateway_token", "")
 
-        # Expand env var tokens
-        if gateway_token.startswith("${") and gateway_token.endswith("}"):
-            env_var = gateway_token[2:-1]
-            gateway_token = os.environ.get(env_var, "")
-
+        gateway_token = resolve_gateway_token(gateway_token)
         if not gateway_token:
             continue
+        if not remote_health.allow(agent_id):
+            print(f"Skipping crons from {agent_name}: circuit open")
+            continue
 
         try:
             url = f"{api_url.rstrip('/')}/api/chat/crons"
             headers = {"Authorization": f"Bearer {gateway_token}"}
-            resp = requests.get(url, headers=headers, timeout=90)
+            try:
+                resp = gateway_clients.client(api_url).get(url, headers=headers, timeout=gateway_timeout(90))
+            except httpx.TransportError as e:
+                remote_health.record_failure(agent_id, api_url, f"{type(e).__name__}: {e}")
+                raise
+            remote_health.record_status(agent_id, api_url, resp.status_code)
             if resp.status_code == 200:
                 data = resp.json()
                 jobs = data.get("jobs", [])
@@ -1757,7 +4572,7 @@ def sync_openclaw_crons(db: Session = Depends(get_db)):
             if openclaw_job_id and tag_id not in tags:
                 tags.append(tag_id)
                 existing.tags = json.dumps(tags)
-            db.commit()
+            db.flush()  # Later crons in this batch match against it
             synced.append({"id": existing.id, "title": title, "action": "updated"})
             continue
 
@@ -1784,12 +4599,12 @@ def sync_openclaw_crons(db: Session = Depends(get_db)):
             run_count=0
         )
         db.add(new_rt)
-        db.commit()
-        db.refresh(new_rt)
+        db.flush()
         synced.append({"id": new_rt.id, "title": title, "action": "created"})
 
+    db.commit()
+
     # Push back to openclaw in background thread so sync response returns quickly
-    import threading
     def _bg_push():
         try:
             bg_db = SessionLocal()
@@ -1812,10 +4627,20 @@ def _push_to_single_agent(api_url: str, gateway_token: str, agent_id: str, local
         deleted_ocids = set()
     base_url = api_url.rstrip('/')
     headers = {"Authorization": f"Bearer {gateway_token}"}
+    client = gateway_clients.client(api_url)
+
+    if not remote_health.allow(agent_id):
+        print(f"Push: skipping {api_url}, circuit open")
+        return
 
     # 1. Read current remote jobs
     try:
-        resp = requests.get(f"{base_url}/api/chat/crons", headers=headers, timeout=15)
+        try:
+            resp = client.get(f"{base_url}/api/chat/crons", headers=headers, timeout=gateway_timeout(15))
+        except httpx.TransportError as e:
+            remote_health.record_failure(agent_id, api_url, f"{type(e).__name__}: {e}")
+            raise
+        remote_health.record_status(agent_id, api_url, resp.status_code)
         if resp.status_code != 200:
             print(f"Push: failed to read remote crons from {api_url}: HTTP {resp.status_code}")
             return
@@ -1919,17 +4744,22 @@ def _push_to_single_agent(api_url: str, gateway_token: str, agent_id: str, local
         if not existing_ocid:
             tags.append(f"ocid:{job_id}")
             rt.tags = json.dumps(tags)
-            db.commit()
+    db.commit()  # New ocid tags, in one go
 
     # 4. Write back to remote
     put_body = {"version": version, "jobs": updated_jobs}
     try:
-        resp = requests.put(
-            f"{base_url}/api/chat/crons",
-            headers={**headers, "Content-Type": "application/json"},
-            json=put_body,
-            timeout=15,
-        )
+        try:
+            resp = client.put(
+                f"{base_url}/api/chat/crons",
+                headers={**headers, "Content-Type": "application/json"},
+                json=put_body,
+                timeout=gateway_timeout(15),
+            )
+        except httpx.TransportError as e:
+            remote_health.record_failure(agent_id, api_url, f"{type(e).__name__}: {e}")
+            raise
+        remote_health.record_status(agent_id, api_url, resp.status_code)
         if resp.status_code == 200:
             print(f"Push: wrote {len(updated_jobs)} jobs to {api_url}")
         else:
@@ -1947,16 +4777,8 @@ def push_cron_to_openclaw(db: Session, deleted_ocids: set = None):
     if deleted_ocids is None:
         deleted_ocids = set()
 
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-
-    if not config_path.exists():
-        return
-
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception:
+    remote_agents = openclaw_config.remote_agents()
+    if not remote_agents:
         return
 
     # Gather all local recurring tasks with openclaw tags
@@ -1966,13 +4788,10 @@ def push_cron_to_openclaw(db: Session, deleted_ocids: set = None):
     if not all_openclaw_tasks and not deleted_ocids:
         return
 
-    agents_list = config.get("agents", {}).get("list", [])
-    for agent in agents_list:
-        remote = agent.get("remote")
-        if not remote or not remote.get("api_url"):
-            continue
-
-        agent_id = agent.get("id", "unknown")
+    single_agent = len(openclaw_config.agents()) == 1
+    for agent in remote_agents:
+        remote = agent["remote"]
+        agent_id = agent["id"]
         api_url = remote["api_url"]
         gateway_token = remote.get("gateway_token", "")
 
@@ -1995,7 +4814,7 @@ def push_cron_to_openclaw(db: Session, deleted_ocids: set = None):
             agent_name = agent.get("identity", {}).get("name", agent_id)
             if rt.assignee_id == agent_id or agent_name in tags or agent_id in tags:
                 agent_tasks.append(rt)
-            elif not rt.assignee_id and len(agents_list) == 1:
+            elif not rt.assignee_id and single_agent:
                 # Single agent setup: push all openclaw tasks
                 agent_tasks.append(rt)
 
@@ -2050,14 +4869,14 @@ async def create_recurring_task(task_data: RecurringTaskCreate, db: Session = De
         next_run_at=next_run
     )
     db.add(recurring_task)
-    db.commit()
-    db.refresh(recurring_task)
+    db.flush()  # Assigns recurring_task.id
     
     # Note: Not logging to activity feed - recurring task management stays in its own panel
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "recurring_created",
         "data": {"id": recurring_task.id, "title": recurring_task.title}
     })
+    db.commit()
     
     # NOTE: This is where OpenClaw cron integration would hook in.
     # The cron job would check for recurring tasks with next_run_at <= now
@@ -2164,7 +4983,7 @@ async def update_recurring_task(recurring_id: str, task_data: RecurringTaskUpdat
             
             # Broadcast task deletions
             for task_id in deleted_task_ids:
-                await manager.broadcast({"type": "task_deleted", "data": {"id": task_id}})
+                queue_broadcast(db, {"type": "task_deleted", "data": {"id": task_id}})
     
     # Recalculate next run if schedule changed
     if any([task_data.schedule_type, task_data.schedule_value, task_data.schedule_time]):
@@ -2174,8 +4993,8 @@ async def update_recurring_task(recurring_id: str, task_data: RecurringTaskUpdat
             rt.schedule_time
         )
     
+    queue_broadcast(db, {"type": "recurring_updated", "data": {"id": recurring_id}})
     db.commit()
-    await manager.broadcast({"type": "recurring_updated", "data": {"id": recurring_id}})
 
     # Push to openclaw if this task has openclaw tags
     try:
@@ -2221,17 +5040,17 @@ async def delete_recurring_task(recurring_id: str, db: Session = Depends(get_db)
     ).delete()
 
     db.delete(rt)
+
+    # Broadcast deletions
+    for task_id in deleted_task_ids:
+        queue_broadcast(db, {"type": "task_deleted", "data": {"id": task_id}})
+    queue_broadcast(db, {"type": "recurring_deleted", "data": {"id": recurring_id}})
     db.commit()
 
     # Push to openclaw after delete — pass deleted ocids so remote jobs are removed
     if has_openclaw:
         push_cron_to_openclaw(db, deleted_ocids=deleted_ocids)
 
-    # Broadcast deletions
-    for task_id in deleted_task_ids:
-        await manager.broadcast({"type": "task_deleted", "data": {"id": task_id}})
-    await manager.broadcast({"type": "recurring_deleted", "data": {"id": recurring_id}})
-
     return {"ok": True}
 
 @app.get("/api/recurring/{recurring_id}/runs")
@@ -2298,11 +5117,10 @@ async def trigger_recurring_task(recurring_id: str, db: Session = Depends(get_db
     rt.run_count += 1
     rt.next_run_at = calculate_next_run(rt.schedule_type, rt.schedule_value, rt.schedule_time)
     
-    db.commit()
-    
     # Note: Only broadcasting, not logging to activity feed - the task creation itself is the activity
-    await manager.broadcast({"type": "task_created", "data": {"id": task.id, "title": task.title}})
-    await manager.broadcast({"type": "recurring_run", "data": {"id": recurring_id, "task_id": task.id}})
+    queue_task_event(db, "task_created", task.id, {"id": task.id, "title": task.title})
+    queue_broadcast(db, {"type": "recurring_run", "data": {"id": recurring_id, "task_id": task.id}})
+    db.commit()
     
     return {
         "ok": True,
@@ -2588,24 +5406,11 @@ class CreateAgentRequest(BaseModel):
 def create_agent(request: CreateAgentRequest):
     """Create a new agent - creates workspace and patches openclaw.json."""
     home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
     workspace_path = home / ".openclaw" / f"workspace-{request.id}"
     
-    # Read existing config
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read config: {str(e)}")
-    
     # Check if agent ID already exists
-    agents_config = config.get("agents", {"list": []})
-    agent_list = agents_config.get("list", [])
-    
-    if any(a.get("id") == request.id for a in agent_list):
+    openclaw_config.require()
+    if openclaw_config.agent(request.id):
         raise HTTPException(status_code=400, detail=f"Agent with id '{request.id}' already exists")
     
     # Create workspace directory
@@ -2633,17 +5438,15 @@ def create_agent(request: CreateAgentRequest):
     if request.discordChannelId:
         new_agent["discord"] = {"channelId": request.discordChannelId}
     
-    # Add to config
-    agent_list.append(new_agent)
-    agents_config["list"] = agent_list
-    config["agents"] = agents_config
+    # Add to config (re-checked under the write lock in case of a concurrent create)
+    def add_agent(config: dict):
+        agents_config = config.setdefault("agents", {"list": []})
+        agent_list = agents_config.setdefault("list", [])
+        if any(a.get("id") == request.id for a in agent_list):
+            raise HTTPException(status_code=400, detail=f"Agent with id '{request.id}' already exists")
+        agent_list.append(new_agent)
     
-    # Write updated config
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to write config: {str(e)}")
+    openclaw_writer.update(add_agent)
     
     return {
         "ok": True,
@@ -2661,21 +5464,10 @@ class AgentFilesResponse(BaseModel):
 def get_agent_files(agent_id: str):
     """Get agent workspace files (SOUL.md, AGENTS.md, TOOLS.md)."""
     home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
     
     # Read config to get workspace path
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read config: {str(e)}")
-    
-    # Find agent
-    agent_list = config.get("agents", {}).get("list", [])
-    agent = next((a for a in agent_list if a.get("id") == agent_id), None)
+    openclaw_config.require()
+    agent = openclaw_config.agent(agent_id)
     
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
@@ -2714,21 +5506,10 @@ class UpdateAgentFilesRequest(BaseModel):
 def update_agent_files(agent_id: str, request: UpdateAgentFilesRequest):
     """Update agent workspace files."""
     home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
     
     # Read config to get workspace path
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read config: {str(e)}")
-    
-    # Find agent
-    agent_list = config.get("agents", {}).get("list", [])
-    agent = next((a for a in agent_list if a.get("id") == agent_id), None)
+    openclaw_config.require()
+    agent = openclaw_config.agent(agent_id)
     
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
@@ -2759,52 +5540,33 @@ class UpdateAgentConfigRequest(BaseModel):
 @app.patch("/api/agents/{agent_id}")
 def update_agent_config(agent_id: str, request: UpdateAgentConfigRequest):
     """Update agent config (model, identity) in openclaw.json."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read config: {str(e)}")
-    
-    # Find and update agent
-    agent_list = config.get("agents", {}).get("list", [])
-    agent_index = next((i for i, a in enumerate(agent_list) if a.get("id") == agent_id), None)
-    
-    if agent_index is None:
-        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
-    
-    agent = agent_list[agent_index]
-    
-    if request.name is not None:
-        agent["name"] = request.name
-        if "identity" not in agent:
-            agent["identity"] = {}
-        agent["identity"]["name"] = request.name
-    
-    if request.emoji is not None:
-        if "identity" not in agent:
-            agent["identity"] = {}
-        agent["identity"]["emoji"] = request.emoji
-    
-    if request.model is not None:
-        if "model" not in agent:
-            agent["model"] = {}
-        agent["model"]["primary"] = request.model
-    
-    agent_list[agent_index] = agent
-    config["agents"]["list"] = agent_list
+    def patch_agent(config: dict) -> dict:
+        # Find and update agent
+        agent_list = config.get("agents", {}).get("list", [])
+        agent = next((a for a in agent_list if a.get("id") == agent_id), None)
+        
+        if agent is None:
+            raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+        
+        if request.name is not None:
+            agent["name"] = request.name
+            if "identity" not in agent:
+                agent["identity"] = {}
+            agent["identity"]["name"] = request.name
+        
+        if request.emoji is not None:
+            if "identity" not in agent:
+                agent["identity"] = {}
+            agent["identity"]["emoji"] = request.emoji
+        
+        if request.model is not None:
+            if "model" not in agent:
+                agent["model"] = {}
+            agent["model"]["primary"] = request.model
+        
+        return agent
     
-    # Write updated config
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to write config: {str(e)}")
+    agent = openclaw_writer.update(patch_agent)
     
     return {"ok": True, "agent": agent}
 
@@ -2812,34 +5574,18 @@ def update_agent_config(agent_id: str, request: UpdateAgentConfigRequest):
 @app.delete("/api/agents/{agent_id}")
 def delete_agent(agent_id: str):
     """Remove agent from config (keeps workspace as archive)."""
-    home = Path.home()
-    config_path = home / ".openclaw" / "openclaw.json"
-    
-    if not config_path.exists():
-        raise HTTPException(status_code=404, detail="OpenClaw config not found")
-    
-    try:
-        with open(config_path) as f:
-            config = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read config: {str(e)}")
-    
-    # Find and remove agent
-    agent_list = config.get("agents", {}).get("list", [])
-    original_len = len(agent_list)
-    agent_list = [a for a in agent_list if a.get("id") != agent_id]
-    
-    if len(agent_list) == original_len:
-        raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
-    
-    config["agents"]["list"] = agent_list
+    def remove_agent(config: dict):
+        # Find and remove agent
+        agent_list = config.get("agents", {}).get("list", [])
+        original_len = len(agent_list)
+        agent_list = [a for a in agent_list if a.get("id") != agent_id]
+        
+        if len(agent_list) == original_len:
+            raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
+        
+        config["agents"]["list"] = agent_list
     
-    # Write updated config
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to write config: {str(e)}")
+    openclaw_writer.update(remove_agent)
     
     return {"ok": True, "message": f"Agent '{agent_id}' removed (workspace preserved)"}
 
@@ -2923,15 +5669,15 @@ async def upload_document(
     except json.JSONDecodeError:
         parsed_tags = []
 
+    # Inserted once extraction is done, so the write transaction isn't held open while it runs
     doc = Document(
+        id=generate_uuid(),
         title=file.filename,
         tags=json.dumps(parsed_tags),
         file_size=len(content),
         status="processing",
     )
     db.add(doc)
-    db.commit()
-    db.refresh(doc)
 
     # Save file to disk
     file_dir = UPLOAD_DIR / doc.id
@@ -2940,27 +5686,33 @@ async def upload_document(
     file_path.write_bytes(content)
     doc.file_path = str(file_path)
 
-    # Extract text
+    committed = False
     try:
-        extracted_text = extract_text_from_file(file_path)
-        doc.content_text = extracted_text
-        doc.status = "ready"
-        doc.processed_at = datetime.utcnow()
-    except ValueError as e:
-        doc.status = "error"
-        doc.content_text = None
-        # Still save — user can see the error
-        db.commit()
-        raise HTTPException(status_code=422, detail=str(e))
-
-    db.commit()
-    db.refresh(doc)
+        # Extract text
+        try:
+            extracted_text = extract_text_from_file(file_path)
+            doc.content_text = extracted_text
+            doc.status = "ready"
+            doc.processed_at = datetime.utcnow()
+        except ValueError as e:
+            doc.status = "error"
+            doc.content_text = None
+            # Still save — user can see the error
+            db.commit()
+            committed = True
+            raise HTTPException(status_code=422, detail=str(e))
 
-    # Broadcast via WebSocket
-    await manager.broadcast({
-        "type": "document_uploaded",
-        "data": {"id": doc.id, "title": doc.title, "status": doc.status}
-    })
+        # Broadcast via WebSocket
+        queue_broadcast(db, {
+            "type": "document_uploaded",
+            "data": {"id": doc.id, "title": doc.title, "status": doc.status}
+        })
+        db.commit()
+        committed = True
+    finally:
+        if not committed:
+            # No row points at the file, so don't leave it behind
+            shutil.rmtree(file_dir, ignore_errors=True)
 
     return {
         "id": doc.id,
@@ -3069,12 +5821,11 @@ async def delete_document(doc_id: str, db: Session = Depends(get_db)):
             shutil.rmtree(str(file_dir), ignore_errors=True)
 
     db.delete(doc)
-    db.commit()
-
-    await manager.broadcast({
+    queue_broadcast(db, {
         "type": "document_deleted",
         "data": {"id": doc_id}
     })
+    db.commit()
 
     return {"ok": True}
 
@@ -0,0 +1,91 @@
+"""Versioned schema migrations.
+
+`Base.metadata.create_all` only creates missing tables, so existing databases
+never pick up new columns or indexes. Each migration below runs once, in order,
+inside its own transaction, and is recorded in the `schema_migrations` table.
+
+To add a migration, append a function to MIGRATIONS. Never edit or reorder a
+migration that has already shipped.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl: str):
+    """Add a column to an existing table (no-op if it's already there)."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index_if_missing(conn: Connection, name: str, table: str, columns: list[str]):
+    """Create an index by name (no-op if it already exists)."""
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+# ============ Migrations ============
+
+def m001_hot_path_indexes(conn: Connection):
+    """Composite indexes for the board, feed and run-history query shapes."""
+    create_index_if_missing(conn, "ix_tasks_status_created_at", "tasks", ["status", "created_at"])
+    create_index_if_missing(conn, "ix_tasks_assignee_id_status", "tasks", ["assignee_id", "status"])
+    create_index_if_missing(conn, "ix_comments_task_id", "comments", ["task_id"])
+    create_index_if_missing(conn, "ix_deliverables_task_id_completed", "deliverables", ["task_id", "completed"])
+    create_index_if_missing(conn, "ix_task_activity_task_id_timestamp", "task_activity", ["task_id", "timestamp"])
+    create_index_if_missing(conn, "ix_activity_log_created_at", "activity_log", ["created_at"])
+    create_index_if_missing(conn, "ix_chat_messages_created_at", "chat_messages", ["created_at"])
+    create_index_if_missing(conn, "ix_recurring_task_runs_recurring_task_id_run_at", "recurring_task_runs", ["recurring_task_id", "run_at"])
+
+
+def m002_keyset_feed_indexes(conn: Connection):
+    """Extend feed indexes with the id tiebreaker used by keyset cursors."""
+    conn.execute(text("DROP INDEX IF EXISTS ix_activity_log_created_at"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_chat_messages_created_at"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_task_activity_task_id_timestamp"))
+    create_index_if_missing(conn, "ix_activity_log_created_at_id", "activity_log", ["created_at", "id"])
+    create_index_if_missing(conn, "ix_chat_messages_created_at_id", "chat_messages", ["created_at", "id"])
+    create_index_if_missing(conn, "ix_task_activity_task_id_timestamp_id", "task_activity", ["task_id", "timestamp", "id"])
+
+
+def m003_task_change_version_index(conn: Connection):
+    """Per-task version lookups on the task change log."""
+    create_index_if_missing(conn, "ix_task_changes_task_id_seq", "task_changes", ["task_id", "seq"])
+
+
+MIGRATIONS = [
+    (1, m001_hot_path_indexes),
+    (2, m002_keyset_feed_indexes),
+    (3, m003_task_change_version_index),
+]
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply any pending migrations. Returns the versions that were applied."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    newly_applied = []
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": migration.__name__, "t": datetime.utcnow()}
+            )
+        print(f"Applied migration {version}: {migration.__doc__ or migration.__name__}")
+        newly_applied.append(version)
+    return newly_applied
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied migration version (0 if none)."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Integer
+from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Integer, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,6 +26,11 @@ class AgentRole(str, enum.Enum):
     INT = "INT"
     SPC = "SPC"
 
+class NotificationStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    DELIVERED = "DELIVERED"
+    DEAD = "DEAD"  # Gave up after too many failed attempts
+
 class AgentStatus(str, enum.Enum):
     WORKING = "WORKING"
     IDLE = "IDLE"
@@ -62,6 +67,11 @@ class Task(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     due_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_assignee_id_status", "assignee_id", "status"),
+    )
     
     assignee = relationship("Agent", back_populates="tasks")
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
@@ -75,6 +85,8 @@ class Comment(Base):
     agent_id = Column(String, ForeignKey("agents.id"), nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_comments_task_id", "task_id"),)
     
     task = relationship("Task", back_populates="comments")
     agent = relationship("Agent", back_populates="comments")
@@ -88,6 +100,8 @@ class Deliverable(Base):
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
     file_path = Column(String(500), nullable=True)
+
+    __table_args__ = (Index("ix_deliverables_task_id_completed", "task_id", "completed"),)
     
     task = relationship("Task", back_populates="deliverables")
 
@@ -98,6 +112,8 @@ class ChatMessage(Base):
     agent_id = Column(String, ForeignKey("agents.id"), nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_chat_messages_created_at_id", "created_at", "id"),)
     
     agent = relationship("Agent", back_populates="messages")
 
@@ -121,6 +137,8 @@ class ActivityLog(Base):
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_activity_log_created_at_id", "created_at", "id"),)
+
 # ============ Recurring Tasks ============
 class RecurringTask(Base):
     __tablename__ = "recurring_tasks"
@@ -150,6 +168,8 @@ class RecurringTaskRun(Base):
     task_id = Column(String, ForeignKey("tasks.id"), nullable=True)  # The spawned task
     run_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), default="success")  # success, failed
+
+    __table_args__ = (Index("ix_recurring_task_runs_recurring_task_id_run_at", "recurring_task_id", "run_at"),)
     
     recurring_task = relationship("RecurringTask", back_populates="runs")
 
@@ -164,9 +184,55 @@ class TaskActivity(Base):
     message = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_task_activity_task_id_timestamp_id", "task_id", "timestamp", "id"),)
+
     task = relationship("Task", backref="activity_entries")
 
 
+class TaskChange(Base):
+    """Append-only log of board changes, read by the delta-sync endpoint.
+
+    One row per changed task per commit; `deleted` rows are tombstones.
+    """
+    __tablename__ = "task_changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String, nullable=False)
+    deleted = Column(Boolean, default=False)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_task_changes_changed_at", "changed_at"),
+        Index("ix_task_changes_task_id_seq", "task_id", "seq"),
+        {"sqlite_autoincrement": True},  # Never reuse a seq, even after pruning
+    )
+
+
+class NotificationOutbox(Base):
+    """Agent notifications, written in the same transaction as the change behind them.
+
+    Drained by the outbox worker in main.py, so delivery survives a crash between
+    commit and send. Delivery is at-least-once.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    agent_id = Column(String, nullable=False)
+    label = Column(String(300))  # Short description for logs, e.g. "assignment of 'Fix login'"
+    message = Column(Text, nullable=False)
+    status = Column(SQLEnum(NotificationStatus), default=NotificationStatus.PENDING)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_notification_outbox_created_at_id", "created_at", "id"),
+    )
+
+
 # ============ V2 Models ============
 
 class Document(Base):
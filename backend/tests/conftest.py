@@ -0,0 +1,47 @@
+"""Shared fixtures. main.py reads HOME and DATABASE_URL at import time, so both point
+into a throwaway directory before it is imported."""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+HOME = Path(tempfile.mkdtemp(prefix="clawcontroller-tests-"))
+(HOME / ".openclaw").mkdir()
+os.environ.update(
+    HOME=str(HOME),
+    DATABASE_URL=f"sqlite:///{HOME / 'test.db'}",
+    AGENT_STATUS_TICK="0.2",
+    AGENT_STATUS_SCAN_INTERVAL="0.5",
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture
+def db(client):
+    session = main.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def openclaw_agents():
+    """Write openclaw.json with the given agent list and make the registry pick it up."""
+    def write(agents: list, **extra):
+        with open(HOME / ".openclaw" / "openclaw.json", "w") as f:
+            json.dump({"agents": {"list": agents}, **extra}, f)
+        main.openclaw_config._refresh(force=True)
+        main.mention_index.invalidate()
+    yield write
+    write([])
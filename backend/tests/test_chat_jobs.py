@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+
+
+class EchoTransport(main.AgentTransport):
+    """Replies at once, except to "slow", which waits until cancelled."""
+
+    async def send(self, agent_id, message, timeout):
+        if message == "slow":
+            await asyncio.sleep(60)
+        return f"{agent_id}: {message}"
+
+    async def notify(self, agent_id, message, timeout):
+        return None
+
+
+@pytest.fixture
+def echo_transport(monkeypatch):
+    monkeypatch.setattr(main, "transport_for", lambda agent_id: EchoTransport())
+
+
+def poll(client, job_id, done, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/chat/jobs/{job_id}").json()
+        if done(job):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} stuck at {job['status']}")
+
+
+def start_job(client, message):
+    response = client.post("/api/chat/jobs", json={"agent_id": "job-agent", "message": message, "stream": False})
+    assert response.status_code == 202
+    return response.json()
+
+
+def test_job_completes_and_reports_its_reply(client, echo_transport):
+    job = start_job(client, "hello")
+    assert job["status"] in ("queued", "running", "completed")
+    job = poll(client, job["id"], lambda j: j["status"] == "completed")
+    assert job["response"] == "job-agent: hello"
+    assert job["finished_at"] is not None
+
+
+def test_running_job_can_be_cancelled(client, echo_transport):
+    job = start_job(client, "slow")
+    poll(client, job["id"], lambda j: j["status"] == "running")
+
+    response = client.delete(f"/api/chat/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"/api/chat/jobs/{job['id']}").json()["status"] == "cancelled"
+    assert client.delete(f"/api/chat/jobs/{job['id']}").status_code == 409
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/chat/jobs/nope").status_code == 404
+    assert client.delete("/api/chat/jobs/nope").status_code == 404
+
+
+def test_evict_drops_expired_and_overflowing_jobs(monkeypatch):
+    monkeypatch.setattr(main, "CHAT_JOB_MAX_FINISHED", 1)
+    registry = main.ChatJobRegistry()
+    jobs = [main.ChatJob("dev", i, False) for i in range(3)]
+    for job in jobs:
+        registry.jobs[job.id] = job
+        job.mark_finished("completed")
+    registry.evict()
+    assert list(registry.jobs) == [jobs[2].id]
@@ -0,0 +1,38 @@
+import pytest
+
+import main
+from database import get_db
+
+
+def upload(client, name="notes.txt", body=b"hello"):
+    return client.post("/api/documents/upload", files={"file": (name, body, "text/plain")}, data={"tags": "[]"})
+
+
+def test_upload_keeps_file_for_committed_row(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "UPLOAD_DIR", tmp_path)
+    response = upload(client)
+    assert response.status_code == 200
+    assert (tmp_path / response.json()["id"] / "notes.txt").read_bytes() == b"hello"
+
+
+def test_failed_commit_removes_uploaded_file(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "UPLOAD_DIR", tmp_path)
+
+    def failing_db():
+        db = main.SessionLocal()
+
+        def commit():
+            raise RuntimeError("database is locked")
+        db.commit = commit
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = failing_db
+    try:
+        with pytest.raises(RuntimeError):
+            upload(client)
+    finally:
+        main.app.dependency_overrides.pop(get_db)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+import time
+from datetime import datetime, timedelta
+
+import main
+
+
+class RecordingTransport:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.sent = []
+
+    async def notify(self, agent_id, message, timeout):
+        self.sent.append((agent_id, message))
+        return self.errors.pop(0) if self.errors else None
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def outbox_rows(db, agent_id):
+    db.expire_all()
+    return db.query(main.NotificationOutbox).filter(main.NotificationOutbox.agent_id == agent_id).all()
+
+
+def test_burst_is_delivered_as_one_digest(client, db, monkeypatch):
+    transport = RecordingTransport([])
+    monkeypatch.setattr(main, "transport_for", lambda agent_id: transport)
+    monkeypatch.setattr(main, "NOTIFY_DIGEST_WINDOW", 0)
+    for i in range(3):
+        main.enqueue_notification(db, "digest-agent", f"update {i}", f"update {i}")
+    db.commit()
+
+    assert wait_for(lambda: all(r.status == main.NotificationStatus.DELIVERED for r in outbox_rows(db, "digest-agent")))
+    assert len(transport.sent) == 1
+    assert "3 ClawController updates" in transport.sent[0][1]
+
+
+def test_failed_delivery_is_retried_with_backoff(client, db, monkeypatch):
+    transport = RecordingTransport(["agent offline"])
+    monkeypatch.setattr(main, "transport_for", lambda agent_id: transport)
+    monkeypatch.setattr(main, "NOTIFY_DIGEST_WINDOW", 0)
+    monkeypatch.setattr(main, "NOTIFY_RETRY_BASE", 0.1)
+    monkeypatch.setattr(main, "NOTIFY_OUTBOX_POLL", 0.2)
+    main.enqueue_notification(db, "retry-agent", "hello", "greeting")
+    db.commit()
+
+    # The worker may be in a wait started before the poll interval was shortened
+    assert wait_for(lambda: outbox_rows(db, "retry-agent")[0].status == main.NotificationStatus.DELIVERED, timeout=8)
+    row = outbox_rows(db, "retry-agent")[0]
+    assert row.attempts == 2 and row.last_error is None
+    assert len(transport.sent) == 2
+
+
+def test_outbox_worker_prunes_old_finished_rows(client, db, monkeypatch):
+    monkeypatch.setattr(main, "NOTIFY_OUTBOX_PRUNE_INTERVAL", 0)
+    old = datetime.utcnow() - timedelta(days=main.NOTIFY_OUTBOX_RETENTION_DAYS + 1)
+    far = datetime.utcnow() + timedelta(days=1)
+    Status = main.NotificationStatus
+    db.add_all([
+        main.NotificationOutbox(agent_id="prune-agent", message="old delivered", status=Status.DELIVERED,
+                                created_at=old, delivered_at=old),
+        main.NotificationOutbox(agent_id="prune-agent", message="old dead", status=Status.DEAD, created_at=old),
+        main.NotificationOutbox(agent_id="prune-agent", message="recent", status=Status.DELIVERED,
+                                delivered_at=datetime.utcnow()),
+        main.NotificationOutbox(agent_id="prune-agent", message="old pending", created_at=old, next_attempt_at=far),
+    ])
+    db.commit()
+    main.outbox_worker.wake()
+    assert wait_for(lambda: len(outbox_rows(db, "prune-agent")) == 2)
+    assert sorted(r.message for r in outbox_rows(db, "prune-agent")) == ["old pending", "recent"]
+    db.query(main.NotificationOutbox).filter(main.NotificationOutbox.agent_id == "prune-agent").delete()
+    db.commit()
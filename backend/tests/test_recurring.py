@@ -0,0 +1,26 @@
+import json
+
+import main
+
+
+def test_push_single_remote_agent_gets_unassigned_tasks(db, openclaw_agents, monkeypatch):
+    openclaw_agents([{"id": "solo", "remote": {"api_url": "http://127.0.0.1:9", "gateway_token": "t"}}])
+    rt = main.RecurringTask(title="nightly", tags=json.dumps(["openclaw"]), schedule_type="daily")
+    db.add(rt)
+    db.commit()
+    pushed = []
+    monkeypatch.setattr(main, "_push_to_single_agent",
+                        lambda api_url, token, agent_id, tasks, db, deleted: pushed.append((agent_id, [t.id for t in tasks])))
+
+    main.push_cron_to_openclaw(db)
+
+    assert pushed == [("solo", [rt.id])]
+
+
+def test_update_and_delete_openclaw_recurring_task(client, openclaw_agents, monkeypatch):
+    openclaw_agents([{"id": "solo", "remote": {"api_url": "http://127.0.0.1:9", "gateway_token": "t"}}])
+    monkeypatch.setattr(main, "_push_to_single_agent", lambda *args: None)
+    rt_id = client.post("/api/recurring", json={"title": "sync me", "tags": ["openclaw"], "schedule_type": "daily"}).json()["id"]
+
+    assert client.patch(f"/api/recurring/{rt_id}", json={"title": "renamed"}).status_code == 200
+    assert client.delete(f"/api/recurring/{rt_id}").status_code == 200
@@ -0,0 +1,45 @@
+import time
+
+import main
+
+
+def open_breaker(registry, agent_id="remote"):
+    for _ in range(main.REMOTE_BREAKER_THRESHOLD):
+        registry.record_failure(agent_id, "http://remote", "could not connect")
+    assert registry.get(agent_id)["state"] == "open"
+
+
+def test_open_breaker_rejects_until_cooldown(monkeypatch):
+    monkeypatch.setattr(main, "REMOTE_BREAKER_COOLDOWN", 60)
+    registry = main.RemoteHealthRegistry()
+    open_breaker(registry)
+    assert not registry.allow("remote")
+    assert registry.get("remote")["rejected"] == 1
+
+
+def test_half_open_trial_success_closes(monkeypatch):
+    monkeypatch.setattr(main, "REMOTE_BREAKER_COOLDOWN", 0.05)
+    registry = main.RemoteHealthRegistry()
+    open_breaker(registry)
+    time.sleep(0.06)
+    assert registry.allow("remote")          # The trial call
+    assert registry.get("remote")["state"] == "half_open"
+    assert not registry.allow("remote")      # Everyone else waits on the trial
+    registry.record_status("remote", "http://remote", 200)
+    health = registry.get("remote")
+    assert health["state"] == "closed" and health["trials"] == 1
+    assert registry.allow("remote")
+
+
+def test_half_open_trial_failure_reopens(monkeypatch):
+    monkeypatch.setattr(main, "REMOTE_BREAKER_COOLDOWN", 0.05)
+    registry = main.RemoteHealthRegistry()
+    open_breaker(registry)
+    time.sleep(0.06)
+    assert registry.allow("remote")
+    registry.record_failure("remote", "http://remote", "timed out")
+    assert registry.get("remote")["state"] == "open"
+    assert not registry.allow("remote")      # A fresh cooldown before the next trial
+    time.sleep(0.06)
+    assert registry.allow("remote")
+    assert registry.get("remote")["trials"] == 2
@@ -0,0 +1,32 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import main
+from models import TaskChange
+
+
+def test_task_changes_are_pruned_while_running(db, monkeypatch):
+    monkeypatch.setattr(main, "TASK_CHANGE_PRUNE_INTERVAL", 0.05)
+    task_id = str(uuid.uuid4())
+    old = TaskChange(task_id=task_id, deleted=False, changed_at=datetime.utcnow() - timedelta(days=30))
+    db.add(old)
+    db.commit()
+    db.add(TaskChange(task_id=task_id, deleted=False))
+    db.commit()
+    old_seq = old.seq
+
+    async def run():
+        pruner = main.TaskChangePruner()
+        pruner.start()
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if pruner.runs:
+                break
+        await pruner.stop()
+        return pruner.runs
+
+    assert asyncio.run(run()) >= 1
+    db.expire_all()
+    assert db.query(TaskChange).filter(TaskChange.seq == old_seq).first() is None
+    assert db.query(TaskChange).filter(TaskChange.task_id == task_id).count() == 1
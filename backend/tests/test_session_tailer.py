@@ -0,0 +1,70 @@
+"""SessionLogTailer: chunked reads and per-file counters."""
+import json
+import threading
+
+import pytest
+
+import main
+
+
+class FakeEngine:
+    def __init__(self, sessions_dir):
+        self.lock = threading.Lock()
+        self.sessions = main.AgentSessions(sessions_dir)
+        self.agents = {"dev": self.sessions}
+
+    def _track(self, agent_id):
+        return self.sessions
+
+    def write(self, name, lines, mode="a"):
+        with open(self.sessions.dir / name, mode) as f:
+            for line in lines:
+                f.write(json.dumps(line) + "\n")
+        with self.lock:
+            self.sessions.names.add(name)
+            self.sessions.dirty.add(name)
+
+
+def turn(text, tokens=10):
+    return {"type": "message", "message": {"role": "user", "content": text, "usage": {"input": tokens}}}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return FakeEngine(tmp_path)
+
+
+def test_large_append_read_in_chunks(engine, monkeypatch):
+    monkeypatch.setattr(main, "SESSION_TAIL_CHUNK_BYTES", 64)
+    tailer = main.SessionLogTailer(engine)
+    engine.write("a.jsonl", [turn("x" * 50) for _ in range(20)])
+    metrics = tailer.live("dev")
+    assert metrics["turns"] == 20 and metrics["bad_lines"] == 0
+    assert tailer.chunk_reads > 20
+
+    engine.write("a.jsonl", [turn("more")])
+    assert tailer.live("dev")["turns"] == 21
+
+
+def test_truncated_file_drops_its_old_counts(engine):
+    tailer = main.SessionLogTailer(engine)
+    engine.write("a.jsonl", [turn("a"), turn("b"), turn("c")])
+    engine.write("b.jsonl", [turn("other", tokens=5)])
+    assert tailer.live("dev")["turns"] == 4
+
+    engine.write("a.jsonl", [turn("fresh")], mode="w")
+    metrics = tailer.live("dev")
+    assert metrics["turns"] == 2
+    assert metrics["tokens_in"] == 15
+    assert metrics["sessions"] == 2
+    assert tailer.resets == 1
+
+
+def test_background_pass_catches_up(engine):
+    tailer = main.SessionLogTailer(engine)
+    engine.write("a.jsonl", [turn("a")])
+    tailer.tick()
+    assert tailer.stats()["bytes_read"] > 0
+    with engine.lock:
+        assert engine.sessions.dirty == set()
+    assert tailer.live("dev")["turns"] == 1
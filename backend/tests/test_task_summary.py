@@ -0,0 +1,32 @@
+import uuid
+
+import main
+from models import Agent, Comment, Deliverable, Task
+
+
+def test_summary_for_one_task_only_aggregates_that_task(db):
+    agent = Agent(id=f"agent-{uuid.uuid4().hex[:8]}", name="Summary Agent")
+    target, other = Task(title="target"), Task(title="other")
+    db.add_all([agent, target, other])
+    db.flush()
+    db.add_all([
+        Comment(task_id=target.id, agent_id=agent.id, content="one"),
+        Comment(task_id=other.id, agent_id=agent.id, content="two"),
+        Comment(task_id=other.id, agent_id=agent.id, content="three"),
+        Deliverable(task_id=target.id, title="done", completed=True),
+        Deliverable(task_id=other.id, title="open"),
+    ])
+    db.commit()
+
+    query = main.task_summary_query(db, [target.id])
+    rows = query.all()
+    assert len(rows) == 1
+    summary = main.serialize_task_summary(*rows[0])
+    assert (summary["id"], summary["comments_count"], summary["deliverables_count"],
+            summary["deliverables_complete"]) == (target.id, 1, 1, 1)
+
+    # Each count subquery carries the task filter instead of grouping whole tables
+    sql = str(query.statement.compile())
+    assert sql.count("comments.task_id IN") == 1
+    assert sql.count("deliverables.task_id IN") == 1
+    assert sql.count("task_changes.task_id IN") == 1
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+
+
+class FakeClient:
+    """Stands in for ClientConnection: records frames, subscribes to everything."""
+
+    def __init__(self):
+        self.frames = []
+        self.topics = None
+
+    def wants(self, topics):
+        return True
+
+    def enqueue(self, frame):
+        self.frames.append(json.loads(frame))
+        return True
+
+
+def test_interleaved_burst_keeps_seq_order():
+    async def run():
+        manager = main.ConnectionManager()
+        client = FakeClient()
+        manager.connections[object()] = client
+        for event_type in ["task_updated", "activity", "task_updated", "task_updated"]:
+            manager.publish({"type": event_type, "data": {}})
+        manager._flush()
+        return manager, client.frames
+
+    manager, frames = asyncio.run(run())
+    assert [f["type"] for f in frames] == ["task_updated", "activity", "batch"]
+    seqs = [f["seq"] for f in frames]
+    assert seqs == sorted(seqs) and seqs[-1] == manager.seq
+    assert frames[0]["seq"] == manager.seq - 3
+
+
+def test_overflow_queues_resync_after_surviving_frames(monkeypatch):
+    monkeypatch.setattr(main, "WS_QUEUE_SIZE", 3)
+    monkeypatch.setattr(main, "WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+    client = main.ClientConnection(None, lambda: "RESYNC")
+    for i in range(4):  # The fourth pushes out frame 0
+        assert client.enqueue(f"f{i}")
+    assert client.dropped == 1 and client.gap
+    client.queue.get_nowait()
+    client.queue.get_nowait()  # Sender catches up, leaving room for the marker and a frame
+    client.enqueue("f4")
+    assert [client.queue.get_nowait() for _ in range(client.queue.qsize())] == ["f3", "RESYNC", "f4"]
+    assert not client.gap
+
+
+def test_sender_sends_resync_when_queue_drains(monkeypatch):
+    monkeypatch.setattr(main, "WS_QUEUE_SIZE", 1)
+    monkeypatch.setattr(main, "WS_SLOW_CONSUMER_POLICY", "drop_newest")
+
+    class Socket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_text(self, text):
+            self.sent.append(text)
+
+    async def run():
+        socket = Socket()
+        client = main.ClientConnection(socket, lambda: "RESYNC")
+        client.enqueue("kept")
+        client.enqueue("dropped")
+        sender = asyncio.create_task(client.run_sender())
+        await asyncio.sleep(0.05)
+        sender.cancel()
+        return socket.sent
+
+    assert asyncio.run(run()) == ["kept", "RESYNC"]
+
+
+def test_slow_client_close_task_is_held_until_done():
+    class SlowClient(FakeClient):
+        closing = False
+        sender = None
+        dropped = 0
+
+        def __init__(self):
+            super().__init__()
+            self.websocket = self
+            self.closed_with = None
+
+        def enqueue(self, frame):
+            return False
+
+        async def close(self, code):
+            self.closed_with = code
+
+    async def run():
+        manager = main.ConnectionManager()
+        client = SlowClient()
+        manager.connections[client] = client
+        manager.publish({"type": "activity", "data": {}})
+        manager._flush()
+        held = len(manager.closing)
+        await asyncio.gather(*manager.closing)
+        await asyncio.sleep(0)  # Let the done-callback run
+        return manager, client, held
+
+    manager, client, held = asyncio.run(run())
+    assert held == 1 and manager.closing == set()
+    assert client.closed_with == 1013 and manager.disconnected_slow == 1
+
+
+def receive_until(ws, frame_type):
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] == frame_type:
+            return frame
+
+
+def test_malformed_topics_are_rejected(client):
+    with client.websocket_connect("/ws") as ws:
+        for topics in [5, {"tasks": True}, ["tasks", 3]]:
+            ws.send_json({"action": "subscribe", "topics": topics})
+            assert receive_until(ws, "error")["data"]["detail"] == "topics must be a list of strings"
+        ws.send_json({"action": "subscribe", "topics": ["tasks"]})
+        assert receive_until(ws, "subscribed")["data"]["topics"] == ["tasks"]
+
+
+def test_unsubscribe_before_subscribe_keeps_other_topics(client):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"action": "unsubscribe", "topics": ["chat"]})
+        topics = receive_until(ws, "subscribed")["data"]["topics"]
+    assert set(topics) == main.WS_TOPICS - {"chat"}
+
+
+def test_connection_is_unregistered_when_the_receive_loop_fails(client, monkeypatch):
+    async def boom(websocket, raw):
+        raise ValueError("boom")
+
+    before = len(main.manager.connections)
+    monkeypatch.setattr(main.manager, "handle_client_message", boom)
+    with pytest.raises(ValueError):
+        with client.websocket_connect("/ws") as ws:
+            ws.send_text("{}")
+            ws.receive_json()
+            ws.receive_json()
+    assert len(main.manager.connections) == before
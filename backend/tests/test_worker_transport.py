@@ -0,0 +1,103 @@
+"""WorkerPoolTransport driven through fake_agent_worker.py."""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+
+FAKE_WORKER = Path(__file__).resolve().parent.parent / "fake_agent_worker.py"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("FAKE_WORKER_SLOW", "5")
+
+    def make(size=2, max_requests=0):
+        return main.WorkerPoolTransport(f"{sys.executable} {FAKE_WORKER}", size, max_requests)
+    return make
+
+
+def run_with(transport, scenario):
+    async def run():
+        await transport.start()
+        try:
+            return await scenario(transport)
+        finally:
+            await transport.close()
+    return asyncio.run(run())
+
+
+def test_transport_base_is_abstract():
+    with pytest.raises(TypeError):
+        main.AgentTransport()
+
+
+def test_send_reuses_pooled_workers(pool):
+    async def scenario(t):
+        return [await t.send(f"a{i}", f"m{i}", 10) for i in range(4)]
+
+    transport = pool()
+    assert run_with(transport, scenario) == [f"a{i} got: m{i}" for i in range(4)]
+    assert transport.spawned == 2 and transport.requests == 4
+
+
+def test_stream_forwards_deltas(pool):
+    chunks = []
+
+    async def on_chunk(text):
+        chunks.append(text)
+
+    async def scenario(t):
+        return await t.stream("dev", "hello there", on_chunk, 10)
+
+    assert run_with(pool(), scenario) == "dev got: hello there"
+    assert "".join(chunks).strip() == "dev got: hello there" and len(chunks) > 1
+
+
+def test_fail_is_reported_and_worker_kept(pool):
+    async def scenario(t):
+        return await t.send("fail", "x", 10), await t.notify("fail", "x", 10), await t.send("dev", "ok", 10)
+
+    transport = pool(size=1)
+    reply, error, after = run_with(transport, scenario)
+    assert reply == "⚠️ Agent error: agent fail refused"
+    assert error == "agent fail refused"
+    assert after == "dev got: ok"
+    assert transport.retired == 0
+
+
+def test_crash_retires_worker_and_respawns(pool):
+    async def scenario(t):
+        return await t.send("crash", "x", 10), await t.send("dev", "after", 10)
+
+    transport = pool(size=1)
+    crashed, after = run_with(transport, scenario)
+    assert crashed.startswith("⚠️ Agent worker error")
+    assert after == "dev got: after"
+    assert transport.retired == 1 and transport.spawned == 2
+
+
+def test_slow_agent_times_out(pool):
+    async def scenario(t):
+        reply = await t.send("slow", "x", 0.5)
+        with pytest.raises(asyncio.TimeoutError):
+            await t.notify("slow", "x", 0.5)
+        return reply, await t.send("dev", "still here", 10)
+
+    transport = pool(size=1)
+    reply, after = run_with(transport, scenario)
+    assert reply == "⚠️ Agent response timed out (0.5s limit)"
+    assert after == "dev got: still here"
+    assert transport.failures == 2
+
+
+def test_workers_recycled_after_max_requests(pool):
+    async def scenario(t):
+        for i in range(5):
+            await t.send("dev", str(i), 10)
+
+    transport = pool(size=1, max_requests=2)
+    run_with(transport, scenario)
+    assert transport.retired == 2 and transport.spawned == 3
@@ -28,6 +28,20 @@ async function fetchAPI(endpoint, options = {}) {
   }
 }
 
+// Cursor-paginated fetch: returns { items, nextCursor } from the X-Next-Cursor header
+async function fetchPage(endpoint, { limit = 50, before = null, after = null } = {}) {
+  const params = new URLSearchParams({ limit })
+  if (before) params.append('before', before)
+  if (after) params.append('after', after)
+  const separator = endpoint.includes('?') ? '&' : '?'
+  const response = await fetch(`${API_BASE}${endpoint}${separator}${params}`)
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Request failed' }))
+    throw new Error(error.detail || `HTTP ${response.status}`)
+  }
+  return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') }
+}
+
 // ============ Agents ============
 
 export async function updateAgentStatus(agentId, status) {
@@ -87,6 +101,12 @@ export async function fetchTasks(filters = {}) {
   return fetchAPI(`/api/tasks${query}`)
 }
 
+// Delta sync: tasks changed since `since`, tombstones for deleted ones, and a new token
+export async function fetchTaskChanges(since = null) {
+  const query = since ? `?since=${encodeURIComponent(since)}` : ''
+  return fetchAPI(`/api/tasks/changes${query}`)
+}
+
 export async function fetchTask(taskId) {
   return fetchAPI(`/api/tasks/${taskId}`)
 }
@@ -144,8 +164,9 @@ export async function completeDeliverable(deliverableId) {
 }
 
 // ============ Chat ============
-export async function fetchChatMessages(limit = 50) {
-  return fetchAPI(`/api/chat?limit=${limit}`)
+// Page back through chat history: pass the previous page's nextCursor as `before`
+export async function fetchChatPage(options = {}) {
+  return fetchPage('/api/chat', options)
 }
 
 export async function sendChatMessage(agentId, content) {
@@ -155,14 +176,32 @@ export async function sendChatMessage(agentId, content) {
   })
 }
 
-export async function sendChatMessageToAgent(agentId, message) {
+export async function sendChatMessageToAgent(agentId, message, stream = false) {
   // Send message to a specific OpenClaw agent and get response
+  // With stream, the reply also arrives as chat_message_delta frames while it is generated
   return fetchAPI('/api/chat/send-to-agent', {
     method: 'POST',
-    body: JSON.stringify({ agent_id: agentId, message }),
+    body: JSON.stringify({ agent_id: agentId, message, stream }),
+  })
+}
+
+// Start an agent chat in the background; returns the job (202) at once.
+// The reply arrives over the WebSocket like any other chat message.
+export async function createChatJob(agentId, message, stream = true) {
+  return fetchAPI('/api/chat/jobs', {
+    method: 'POST',
+    body: JSON.stringify({ agent_id: agentId, message, stream }),
   })
 }
 
+export async function fetchChatJob(jobId) {
+  return fetchAPI(`/api/chat/jobs/${jobId}`)
+}
+
+export async function cancelChatJob(jobId) {
+  return fetchAPI(`/api/chat/jobs/${jobId}`, { method: 'DELETE' })
+}
+
 // ============ Announcements ============
 export async function fetchAnnouncements(limit = 10) {
   return fetchAPI(`/api/announcements?limit=${limit}`)
@@ -176,13 +215,15 @@ export async function createAnnouncement(title, message, priority = 'NORMAL') {
 }
 
 // ============ Activity ============
-export async function fetchActivity(limit = 50) {
-  return fetchAPI(`/api/activity?limit=${limit}`)
+// Newest first; pass the previous page's nextCursor as `before` for older entries
+export async function fetchActivityPage(options = {}) {
+  return fetchPage('/api/activity', options)
 }
 
 // ============ Task Activity ============
-export async function fetchTaskActivity(taskId, limit = 50) {
-  return fetchAPI(`/api/tasks/${taskId}/activity?limit=${limit}`)
+// Oldest first within a page; pass nextCursor as `before` for the page before it
+export async function fetchTaskActivityPage(taskId, options = {}) {
+  return fetchPage(`/api/tasks/${taskId}/activity`, options)
 }
 
 export async function addTaskActivity(taskId, agentId, message) {
@@ -247,8 +288,9 @@ export async function fetchRecurringTaskRuns(recurringId, limit = 20) {
 }
 
 // ============ WebSocket ============
-export function createWebSocket(onMessage, onOpen, onClose, onError) {
-  const ws = new WebSocket(WS_URL)
+// Pass resumeFrom (the last seq seen) to have the server replay missed events
+export function createWebSocket(onMessage, onOpen, onClose, onError, resumeFrom = null) {
+  const ws = new WebSocket(resumeFrom != null ? `${WS_URL}?resume_from=${resumeFrom}` : WS_URL)
 
   ws.onopen = () => {
     console.log('WebSocket connected')
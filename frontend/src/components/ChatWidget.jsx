@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect, useMemo } from 'react'
-import { MessageCircle, Send, X } from 'lucide-react'
+import { MessageCircle, Send, Square, X } from 'lucide-react'
 import { useMissionStore } from '../store/useMissionStore'
 import MentionText from './MentionText'
 
@@ -12,6 +12,12 @@ export default function ChatWidget() {
   const loadingChat = useMissionStore((state) => state.loadingChat)
   const wsConnected = useMissionStore((state) => state.wsConnected)
   const unreadChatCount = useMissionStore((state) => state.unreadChatCount)
+  const hasOlderMessages = useMissionStore((state) => Boolean(state.squadMessagesCursor))
+  const loadingOlderChat = useMissionStore((state) => state.loadingOlderChat)
+  const loadOlderChat = useMissionStore((state) => state.loadOlderChat)
+  const pendingReplies = useMissionStore((state) => Object.keys(state.chatJobs).length)
+  const cancelChatJobs = useMissionStore((state) => state.cancelChatJobs)
+  const chatJobError = useMissionStore((state) => state.chatJobError)
   
   const [inputValue, setInputValue] = useState('')
   const [error, setError] = useState(null)
@@ -33,12 +39,13 @@ export default function ChatWidget() {
     )
   }, [agents, mentionFilter])
 
-  // Auto-scroll to bottom when messages change
+  // Auto-scroll to bottom when a message arrives (not when older history is prepended)
+  const lastMessage = messages[messages.length - 1]
   useEffect(() => {
     if (isChatOpen) {
       messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
     }
-  }, [messages, isChatOpen])
+  }, [lastMessage, isChatOpen])
 
   // Reset mention index when filtered list changes
   useEffect(() => {
@@ -175,6 +182,16 @@ export default function ChatWidget() {
         </div>
         
         <div className="chat-messages-container">
+          {hasOlderMessages && (
+            <button
+              type="button"
+              className="load-older-button"
+              onClick={loadOlderChat}
+              disabled={loadingOlderChat}
+            >
+              {loadingOlderChat ? 'Loading...' : 'Load earlier messages'}
+            </button>
+          )}
           {messages.length === 0 ? (
             <div className="chat-empty">
               <MessageCircle size={32} style={{ opacity: 0.3 }} />
@@ -213,14 +230,14 @@ export default function ChatWidget() {
           <div ref={messagesEndRef} />
         </div>
         
-        {error && (
+        {(error || chatJobError) && (
           <div className="chat-error" style={{ 
             padding: '8px 16px', 
             background: 'rgba(220, 38, 38, 0.1)', 
             color: '#dc2626',
             fontSize: 12 
           }}>
-            {error}
+            {error || chatJobError}
           </div>
         )}
         
@@ -262,6 +279,16 @@ export default function ChatWidget() {
               onKeyDown={handleKeyDown}
               disabled={loadingChat}
             />
+            {pendingReplies > 0 && (
+              <button
+                type="button"
+                className="chat-send-button chat-stop-button"
+                onClick={cancelChatJobs}
+                title={pendingReplies === 1 ? 'Stop the pending reply' : `Stop ${pendingReplies} pending replies`}
+              >
+                <Square size={16} />
+              </button>
+            )}
             <button 
               type="button" 
               className={`chat-send-button ${loadingChat ? 'button-loading' : ''}`}
@@ -20,7 +20,8 @@ export default function LiveFeed() {
   const selectTask = useMissionStore((state) => state.selectTask)
   const isLoading = useMissionStore((state) => state.isLoading)
 
-  const filteredFeed = feed.filter((item) => {
+  // The dashboard shows recent activity; older entries paged in from the Journal stay there
+  const filteredFeed = feed.slice(0, 50).filter((item) => {
     if (filter === 'All') return true
     if (filter === 'Tasks') return item.type === 'task'
     if (filter === 'Comments') return item.type === 'comment'
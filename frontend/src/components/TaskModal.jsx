@@ -4,7 +4,7 @@ import { useMissionStore, priorityColors, statusColors, statusOrder } from '../s
 import MentionText from './MentionText'
 import DatePicker from 'react-datepicker'
 import { format, isPast, isToday, formatDistanceToNow } from 'date-fns'
-import { fetchTaskActivity, addTaskActivity, sendChatMessageToAgent } from '../api'
+import { fetchTaskActivityPage, addTaskActivity, sendChatMessageToAgent } from '../api'
 import 'react-datepicker/dist/react-datepicker.css'
 
 const renderInline = (text) => {
@@ -123,6 +123,8 @@ export default function TaskModal() {
   const [uploadingForItem, setUploadingForItem] = useState(null)
   const [activityLog, setActivityLog] = useState([])
   const [activityLoading, setActivityLoading] = useState(false)
+  const [activityCursor, setActivityCursor] = useState(null) // Page before the oldest loaded entry
+  const [loadingOlderActivity, setLoadingOlderActivity] = useState(false)
   
   // Mention autocomplete state
   const [showMentions, setShowMentions] = useState(false)
@@ -145,16 +147,40 @@ export default function TaskModal() {
     setMentionIndex(0)
   }, [filteredAgents.length])
 
+  // Newest page of the activity log; older pages are loaded on demand
+  const loadActivity = (taskId) =>
+    fetchTaskActivityPage(taskId).then(({ items, nextCursor }) => {
+      setActivityLog(items)
+      setActivityCursor(nextCursor)
+    })
+
+  const loadOlderActivity = async () => {
+    if (!activityCursor || loadingOlderActivity) return
+    setLoadingOlderActivity(true)
+    try {
+      const { items, nextCursor } = await fetchTaskActivityPage(selectedTaskId, { before: activityCursor })
+      setActivityLog(prev => {
+        const loaded = new Set(prev.map(entry => entry.id))
+        return [...items.filter(entry => !loaded.has(entry.id)), ...prev]
+      })
+      setActivityCursor(nextCursor)
+    } catch (error) {
+      console.error('Failed to load older activity:', error)
+    } finally {
+      setLoadingOlderActivity(false)
+    }
+  }
+
   // Fetch activity log when task changes
   useEffect(() => {
     if (selectedTaskId) {
       setActivityLoading(true)
-      fetchTaskActivity(selectedTaskId)
-        .then(setActivityLog)
+      loadActivity(selectedTaskId)
         .catch(console.error)
         .finally(() => setActivityLoading(false))
     } else {
       setActivityLog([])
+      setActivityCursor(null)
     }
   }, [selectedTaskId])
 
@@ -302,8 +328,7 @@ curl -X POST http://localhost:8000/api/tasks/${task.id}/comments -H "Content-Typ
         await sendChatMessageToAgent(targetAgent.id, taskContext)
         
         // Refresh activity log to show updates
-        fetchTaskActivity(task.id)
-          .then(setActivityLog)
+        loadActivity(task.id)
           .catch(console.error)
       } catch (error) {
         console.error('Failed to post activity or route to agent:', error)
@@ -588,7 +613,18 @@ curl -X POST http://localhost:8000/api/tasks/${task.id}/comments -H "Content-Typ
               ) : activityLog.length === 0 ? (
                 <div className="activity-empty">No activity recorded yet</div>
               ) : (
-                activityLog.map((entry) => (
+                <>
+                {activityCursor && (
+                  <button
+                    type="button"
+                    className="load-older-button"
+                    onClick={loadOlderActivity}
+                    disabled={loadingOlderActivity}
+                  >
+                    {loadingOlderActivity ? 'Loading...' : 'Load older activity'}
+                  </button>
+                )}
+                {activityLog.map((entry) => (
                   <div key={entry.id} className="activity-entry">
                     <div className="activity-avatar">
                       {entry.agent?.avatar || '🤖'}
@@ -601,7 +637,8 @@ curl -X POST http://localhost:8000/api/tasks/${task.id}/comments -H "Content-Typ
                       {format(new Date(entry.timestamp), 'MMM d, h:mm a')}
                     </div>
                   </div>
-                ))
+                ))}
+                </>
               )}
             </div>
           </div>
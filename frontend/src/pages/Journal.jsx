@@ -12,6 +12,9 @@ const typeIcons = {
 
 export default function Journal() {
   const liveFeed = useMissionStore((s) => s.liveFeed)
+  const hasOlder = useMissionStore((s) => Boolean(s.liveFeedCursor))
+  const loadingOlder = useMissionStore((s) => s.loadingOlderActivity)
+  const loadOlderActivity = useMissionStore((s) => s.loadOlderActivity)
   const [filter, setFilter] = useState('all')
   const info = useInfoModal()
 
@@ -71,6 +74,16 @@ export default function Journal() {
             )
           })
         )}
+        {hasOlder && (
+          <button
+            type="button"
+            onClick={loadOlderActivity}
+            disabled={loadingOlder}
+            className="mt-2 self-center px-3 py-1.5 text-xs rounded-md font-medium text-[var(--text-secondary)] hover:text-white bg-[rgba(255,255,255,0.04)] disabled:opacity-50"
+          >
+            {loadingOlder ? 'Loading...' : 'Load older entries'}
+          </button>
+        )}
       </div>
 
       <InfoModal
@@ -30,6 +30,10 @@ const mentionsUser = (text) => {
          lowerText.includes('@owner')
 }
 
+// How often a pending chat job's status is checked (the reply itself comes over the WebSocket)
+const CHAT_JOB_POLL_MS = 2000
+const CHAT_JOB_FINISHED = ['completed', 'failed', 'cancelled']
+
 // Transform API agent to frontend format
 const transformAgent = (apiAgent) => ({
   id: apiAgent.id,
@@ -77,6 +81,8 @@ const transformTask = (apiTask) => ({
   deliverablesComplete: apiTask.deliverables_complete || 0,
   markdown: apiTask.description || '',
   completedAt: apiTask.status === 'DONE' ? apiTask.updated_at : null,
+  version: apiTask.version || 0,
+  _api: apiTask, // Raw API shape, so field-level patches from WebSocket events can be re-applied
 })
 
 // Transform API chat message to frontend format
@@ -177,7 +183,11 @@ export const useMissionStore = create((set, get) => ({
   tasks: [],
   recurringTasks: [],
   liveFeed: [],
+  liveFeedCursor: null, // Cursor for the page of activity before the oldest loaded entry
+  loadingOlderActivity: false,
   squadMessages: [],
+  squadMessagesCursor: null, // Cursor for the page of chat before the oldest loaded message
+  loadingOlderChat: false,
   unreadChatCount: 0, // Count of unread agent messages that mention user
   notifications: [],
   historicalStats: {},
@@ -199,6 +209,16 @@ export const useMissionStore = create((set, get) => ({
   // WebSocket
   wsConnected: false,
   ws: null,
+  wsLastSeq: null, // Highest event seq seen, sent as resume_from on reconnect
+  
+  // Agent chats still running in the background: job id -> agent id
+  chatJobs: {},
+  chatJobError: null, // Last chat job that failed without a reply
+  
+  // Delta sync for the task board
+  tasksSyncToken: null,
+  tasksSyncInFlight: false,
+  tasksSyncPending: false,
   
   // UI state
   selectedTaskId: null,
@@ -221,20 +241,23 @@ export const useMissionStore = create((set, get) => ({
       
       // Fetch all initial data in parallel
       // Try OpenClaw agents first for real-time status
-      const [agentsData, tasksData, chatData, activityData, recurringData] = await Promise.all([
+      const [agentsData, tasksSync, chatPage, activityPage, recurringData] = await Promise.all([
         api.fetchAgentsWithOpenClaw(),
-        api.fetchTasks(),
-        api.fetchChatMessages(),
-        api.fetchActivity(),
+        api.fetchTaskChanges(),
+        api.fetchChatPage(),
+        api.fetchActivityPage(),
         api.fetchRecurringTasks().catch(() => []), // Don't fail if recurring endpoint doesn't exist yet
       ])
       
       set({
         agents: agentsData.map(transformAgent),
-        tasks: tasksData.map(transformTask),
+        tasks: tasksSync.changed.map(transformTask),
+        tasksSyncToken: tasksSync.token,
         recurringTasks: recurringData,
-        squadMessages: chatData.map(transformChatMessage),
-        liveFeed: activityData.map(transformActivity),
+        squadMessages: chatPage.items.map(transformChatMessage),
+        squadMessagesCursor: chatPage.nextCursor,
+        liveFeed: activityPage.items.map(transformActivity),
+        liveFeedCursor: activityPage.nextCursor,
         isLoading: false,
         isInitialized: true,
         useOpenClaw: true,
@@ -262,98 +285,174 @@ export const useMissionStore = create((set, get) => ({
   
   // ============ WebSocket ============
   connectWebSocket: () => {
-    const ws = api.createWebSocket(
-      // onMessage
-      (data) => {
-        const state = get()
-        
-        switch (data.type) {
-          case 'task_created':
-            // Refetch tasks to get the new task with full data
-            state.refreshTasks()
-            state.addFeedItem({
-              type: 'task',
-              title: 'New task created',
-              detail: data.data.title,
-              taskId: data.data.id,
-            })
-            break
-            
-          case 'task_updated':
-          case 'task_reviewed':
-            state.refreshTasks()
-            break
+    const handleEvent = (data) => {
+      const state = get()
+      
+      switch (data.type) {
+        // Reconnected: events missed while the socket was down
+        case 'replay':
+          data.data.events.forEach(handleEvent)
+          break
+          
+        // Too much was missed to replay - refetch instead
+        case 'resync_required':
+          state.resync()
+          break
+          
+        // Burst of same-type events coalesced by the server into one frame
+        case 'batch':
+          {
+            const { type, items } = data.data
+            if (type === 'task_deleted') {
+              const deleted = new Set(items.map(item => item.id))
+              set(s => ({ tasks: s.tasks.filter(t => !deleted.has(t.id)) }))
+            } else if (type.startsWith('recurring_')) {
+              state.refreshRecurringTasks()
+            } else {
+              items.forEach(item => handleEvent({ type, data: item }))
+            }
+          }
+          break
+          
+        case 'task_created':
+          state.applyTaskEvent(data.data)
+          state.addFeedItem({
+            type: 'task',
+            title: 'New task created',
+            detail: data.data.title,
+            taskId: data.data.id,
+          })
+          break
+          
+        case 'task_updated':
+        case 'task_reviewed':
+          state.applyTaskEvent(data.data)
+          break
+          
+        case 'task_deleted':
+          set(s => ({
+            tasks: s.tasks.filter(t => t.id !== data.data.id)
+          }))
+          break
+          
+        case 'chat_message':
+          {
+            const msg = data.data
+            const isFromAgent = msg.agent_id && msg.agent_id !== 'user'
+            const msgMentionsUser = mentionsUser(msg.content)
+            const chatOpen = get().isChatOpen
             
-          case 'task_deleted':
-            set(s => ({
-              tasks: s.tasks.filter(t => t.id !== data.data.id)
-            }))
-            break
+            const transformed = transformChatMessage(msg)
             
-          case 'chat_message':
-            {
-              const msg = data.data
-              const isFromAgent = msg.agent_id && msg.agent_id !== 'user'
-              const msgMentionsUser = mentionsUser(msg.content)
-              const chatOpen = get().isChatOpen
+            set(s => {
+              // The agent's reply ends its typing indicator and its chat job
+              const messages = isFromAgent
+                ? s.squadMessages.filter(m => !(m.isTyping && m.agentId === msg.agent_id))
+                : s.squadMessages
+              const chatJobs = isFromAgent
+                ? Object.fromEntries(Object.entries(s.chatJobs).filter(([, agentId]) => agentId !== msg.agent_id))
+                : s.chatJobs
               
-              const transformed = transformChatMessage(msg)
+              // Check if message already exists (from optimistic update)
+              const existing = messages.find(m => m.id === transformed.id)
+              if (existing && !existing.isStreaming) {
+                return { squadMessages: messages, chatJobs } // Already added via optimistic update
+              }
               
-              set(s => {
-                // Check if message already exists (from optimistic update)
-                const exists = s.squadMessages.some(m => m.id === transformed.id)
-                if (exists) {
-                  return s // No change - already added via optimistic update
-                }
-                
-                return {
-                  squadMessages: [...s.squadMessages, transformed],
-                  // Only increment unread if: from agent, mentions user, and chat is closed
-                  unreadChatCount: (isFromAgent && msgMentionsUser && !chatOpen) 
-                    ? s.unreadChatCount + 1 
-                    : s.unreadChatCount
-                }
-              })
-            }
-            break
-            
-          case 'announcement':
-            state.addFeedItem({
-              type: 'announcement',
-              title: 'Announcement',
-              detail: data.data.message,
+              return {
+                chatJobs,
+                // A streamed draft is replaced by the final saved message
+                squadMessages: existing
+                  ? messages.map(m => (m.id === transformed.id ? transformed : m))
+                  : [...messages, transformed],
+                // Only increment unread if: from agent, mentions user, and chat is closed
+                unreadChatCount: (isFromAgent && msgMentionsUser && !chatOpen) 
+                  ? s.unreadChatCount + 1 
+                  : s.unreadChatCount
+              }
             })
-            // Could also show a toast notification here
-            break
-            
-          case 'comment_added':
-            state.refreshTasks()
-            break
-            
-          case 'activity':
-            state.addFeedItem({
-              type: mapActivityType(data.data.activity_type),
-              title: getActivityTitle(data.data.activity_type),
-              detail: data.data.description,
-              agentId: data.data.agent_id,
-              taskId: data.data.task_id,
+          }
+          break
+          
+        // Agent reply still being generated: grow a draft under its final message id
+        case 'chat_message_delta':
+          {
+            const delta = data.data
+            set(s => {
+              const draft = s.squadMessages.find(m => m.id === delta.id)
+              if (draft && !draft.isStreaming) return s // Final message already arrived
+              // Offsets count code points; on a gap, wait for the final message
+              if ((draft?.streamOffset || 0) !== delta.offset) return s
+              const updated = {
+                id: delta.id,
+                agentId: delta.agent_id,
+                text: (draft?.text || '') + delta.delta,
+                timestamp: draft?.timestamp || formatTime(new Date().toISOString()),
+                agent: delta.agent,
+                isStreaming: true,
+                streamOffset: delta.offset + Array.from(delta.delta).length,
+              }
+              if (draft) {
+                return { squadMessages: s.squadMessages.map(m => (m.id === delta.id ? updated : m)) }
+              }
+              // First delta replaces the agent's typing indicator
+              return {
+                squadMessages: [
+                  ...s.squadMessages.filter(m => !(m.isTyping && m.agentId === delta.agent_id)),
+                  updated,
+                ],
+              }
             })
-            break
-            
-          case 'agent_status':
-            set(s => ({
-              agents: s.agents.map(a => 
-                a.id === data.data.id ? { ...a, status: data.data.status } : a
-              )
-            }))
-            break
-            
-          case 'recurring_created':
-          case 'recurring_updated':
-          case 'recurring_deleted':
-          case 'recurring_run':
-            state.refreshRecurringTasks()
-            break
+          }
+          break
+          
+        case 'announcement':
+          state.addFeedItem({
+            type: 'announcement',
+            title: 'Announcement',
+            detail: data.data.message,
+          })
+          // Could also show a toast notification here
+          break
+          
+        case 'comment_added':
+          state.applyTaskEvent(data.data)
+          break
+          
+        case 'activity':
+          state.addFeedItem({
+            type: mapActivityType(data.data.activity_type),
+            title: getActivityTitle(data.data.activity_type),
+            detail: data.data.description,
+            agentId: data.data.agent_id,
+            taskId: data.data.task_id,
+          })
+          break
+          
+        case 'agent_status':
+          set(s => ({
+            agents: s.agents.map(a => 
+              a.id === data.data.id ? { ...a, status: data.data.status } : a
+            )
+          }))
+          break
+          
+        case 'recurring_created':
+        case 'recurring_updated':
+        case 'recurring_deleted':
+        case 'recurring_run':
+          state.refreshRecurringTasks()
+          break
+      }
+    }
+    
+    const ws = api.createWebSocket(
+      // onMessage
+      (data) => {
+        handleEvent(data)
+        if (data.seq != null) {
+          const reset = data.type === 'connected' || data.type === 'resync_required'
+          set(s => ({ wsLastSeq: reset || s.wsLastSeq == null ? data.seq : Math.max(s.wsLastSeq, data.seq) }))
         }
       },
       // onOpen
@@ -370,7 +469,8 @@ export const useMissionStore = create((set, get) => ({
         }, 3000)
       },
       // onError
-      (error) => console.error('WebSocket error:', error)
+      (error) => console.error('WebSocket error:', error),
+      get().wsLastSeq
     )
     
     set({ ws })
@@ -387,22 +487,149 @@ export const useMissionStore = create((set, get) => ({
   // ============ Refresh helpers ============
   refreshTasks: async () => {
     try {
-      const tasksData = await api.fetchTasks()
-      set({ tasks: tasksData.map(transformTask) })
+      const tasksSync = await api.fetchTaskChanges()
+      set({ tasks: tasksSync.changed.map(transformTask), tasksSyncToken: tasksSync.token })
     } catch (error) {
       console.error('Failed to refresh tasks:', error)
     }
   },
   
+  // Apply a task WebSocket event in place: full cards replace the local copy,
+  // patches apply only on top of the version they were built from.
+  // Anything else (legacy id-only events, version gaps) falls back to delta sync.
+  applyTaskEvent: (eventData) => {
+    const taskId = eventData.task?.id || eventData.id || eventData.task_id
+    const local = get().tasks.find(t => t.id === taskId)
+    
+    if (eventData.task) {
+      if (local && local.version > eventData.task.version) return
+      const updated = transformTask(eventData.task)
+      set(s => ({
+        tasks: local
+          ? s.tasks.map(t => (t.id === taskId ? updated : t))
+          : [updated, ...s.tasks],
+      }))
+      return
+    }
+    
+    if (eventData.patch && local && local.version === eventData.base_version) {
+      const updated = transformTask({ ...local._api, ...eventData.patch, version: eventData.version })
+      set(s => ({ tasks: s.tasks.map(t => (t.id === taskId ? updated : t)) }))
+      return
+    }
+    
+    get().syncTasks()
+  },
+  
+  // Apply only the tasks changed since our last token (falls back to a full load)
+  syncTasks: async () => {
+    const { tasksSyncToken, tasksSyncInFlight } = get()
+    if (!tasksSyncToken) return get().refreshTasks()
+    if (tasksSyncInFlight) {
+      set({ tasksSyncPending: true })
+      return
+    }
+    set({ tasksSyncInFlight: true, tasksSyncPending: false })
+    try {
+      const delta = await api.fetchTaskChanges(tasksSyncToken)
+      set(s => {
+        if (delta.reset) {
+          return { tasks: delta.changed.map(transformTask), tasksSyncToken: delta.token }
+        }
+        const changed = new Map(delta.changed.map(t => [t.id, transformTask(t)]))
+        const deleted = new Set(delta.deleted)
+        const tasks = s.tasks
+          .filter(t => !deleted.has(t.id))
+          .map(t => changed.get(t.id) || t)
+        const existingIds = new Set(tasks.map(t => t.id))
+        const added = [...changed.values()].filter(t => !existingIds.has(t.id))
+        return {
+          tasks: [...added, ...tasks].sort((a, b) => new Date(b.createdAt) - new Date(a.createdAt)),
+          tasksSyncToken: delta.token,
+        }
+      })
+    } catch (error) {
+      console.error('Failed to sync tasks:', error)
+    } finally {
+      set({ tasksSyncInFlight: false })
+      if (get().tasksSyncPending) get().syncTasks()
+    }
+  },
+  
+  // Catch up after a gap the server could not replay
+  resync: async () => {
+    try {
+      const [agentsData, chatPage, activityPage, recurringData] = await Promise.all([
+        api.fetchAgentsWithOpenClaw(),
+        api.fetchChatPage(),
+        api.fetchActivityPage(),
+        api.fetchRecurringTasks().catch(() => []),
+      ])
+      set({
+        agents: agentsData.map(transformAgent),
+        squadMessages: chatPage.items.map(transformChatMessage),
+        squadMessagesCursor: chatPage.nextCursor,
+        liveFeed: activityPage.items.map(transformActivity),
+        liveFeedCursor: activityPage.nextCursor,
+        recurringTasks: recurringData,
+      })
+    } catch (error) {
+      console.error('Failed to resync:', error)
+    }
+    get().syncTasks()
+  },
+  
   refreshActivity: async () => {
     try {
-      const activityData = await api.fetchActivity()
-      set({ liveFeed: activityData.map(transformActivity) })
+      const activityPage = await api.fetchActivityPage()
+      set({ liveFeed: activityPage.items.map(transformActivity), liveFeedCursor: activityPage.nextCursor })
     } catch (error) {
       console.error('Failed to refresh activity:', error)
     }
   },
   
+  // Page back through history: older activity goes after the loaded entries
+  loadOlderActivity: async () => {
+    const { liveFeedCursor, loadingOlderActivity } = get()
+    if (!liveFeedCursor || loadingOlderActivity) return
+    set({ loadingOlderActivity: true })
+    try {
+      const page = await api.fetchActivityPage({ before: liveFeedCursor })
+      set(s => {
+        const loaded = new Set(s.liveFeed.map(item => item.id))
+        return {
+          liveFeed: [...s.liveFeed, ...page.items.map(transformActivity).filter(item => !loaded.has(item.id))],
+          liveFeedCursor: page.nextCursor,
+        }
+      })
+    } catch (error) {
+      console.error('Failed to load older activity:', error)
+    } finally {
+      set({ loadingOlderActivity: false })
+    }
+  },
+  
+  // Older chat messages go before the loaded ones
+  loadOlderChat: async () => {
+    const { squadMessagesCursor, loadingOlderChat } = get()
+    if (!squadMessagesCursor || loadingOlderChat) return
+    set({ loadingOlderChat: true })
+    try {
+      const page = await api.fetchChatPage({ before: squadMessagesCursor })
+      set(s => {
+        const loaded = new Set(s.squadMessages.map(m => m.id))
+        return {
+          squadMessages: [...page.items.map(transformChatMessage).filter(m => !loaded.has(m.id)), ...s.squadMessages],
+          squadMessagesCursor: page.nextCursor,
+        }
+      })
+    } catch (error) {
+      console.error('Failed to load older chat messages:', error)
+    } finally {
+      set({ loadingOlderChat: false })
+    }
+  },
+  
   refreshRecurringTasks: async () => {
     try {
       const recurringData = await api.fetchRecurringTasks()
@@ -415,10 +642,10 @@ export const useMissionStore = create((set, get) => ({
   addFeedItem: (item) => {
     set(s => ({
       liveFeed: [{
-        id: `feed-${Date.now()}`,
+        id: `feed-${Date.now()}-${Math.random().toString(36).slice(2, 7)}`, // Unique within a batched frame
         timestamp: 'Just now',
         ...item,
-      }, ...s.liveFeed].slice(0, 50)
+      }, ...s.liveFeed] // Not trimmed: paged-in history must stay contiguous with liveFeedCursor
     }))
   },
   
@@ -703,29 +930,15 @@ export const useMissionStore = create((set, get) => ({
     
     try {
       console.log(`Routing message to agent: ${targetAgentId}`)
-      const response = await api.sendChatMessageToAgent(targetAgentId, text)
-      
-      // 3. Remove typing indicator - the agent response will come via WebSocket
-      // or we add it from the response if available
+      // 3. Runs as a background job - the typing indicator stays until the
+      // reply (or its first streamed delta) arrives via WebSocket
+      const job = await api.createChatJob(targetAgentId, text)
       set(s => ({
-        squadMessages: s.squadMessages.filter(m => m.id !== typingIndicatorId),
+        chatJobs: { ...s.chatJobs, [job.id]: targetAgentId },
+        chatJobError: null,
         loadingChat: false
       }))
-      
-      // If response includes the agent's reply directly, add it
-      if (response.reply) {
-        const replyTimestamp = new Date()
-        const replyMessage = {
-          id: response.replyId || `reply-${Date.now()}`,
-          agentId: targetAgentId,
-          text: response.reply,
-          timestamp: replyTimestamp.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', hour12: false }),
-          agent: targetAgent
-        }
-        set(s => ({
-          squadMessages: [...s.squadMessages, replyMessage]
-        }))
-      }
+      get().watchChatJob(job.id)
     } catch (error) {
       console.error('Failed to send chat message:', error)
       // Remove typing indicator on error
@@ -737,6 +950,50 @@ export const useMissionStore = create((set, get) => ({
     }
   },
   
+  // Poll a job until it finishes, for jobs that end without a reply message
+  // (failed, or evicted while the socket was down). Stops once the reply clears it.
+  watchChatJob: async (jobId) => {
+    while (get().chatJobs[jobId]) {
+      await new Promise(resolve => setTimeout(resolve, CHAT_JOB_POLL_MS))
+      if (!get().chatJobs[jobId]) return
+      let job = null
+      try {
+        job = await api.fetchChatJob(jobId)
+      } catch {
+        // 404: the job was evicted, so it finished long ago
+      }
+      if (job && !CHAT_JOB_FINISHED.includes(job.status)) continue
+      get().finishChatJob(jobId, job)
+    }
+  },
+  
+  // Forget a finished job and the typing indicator it was keeping up
+  finishChatJob: (jobId, job) => {
+    set(s => {
+      const agentId = s.chatJobs[jobId]
+      if (!agentId) return s
+      const { [jobId]: _finished, ...chatJobs } = s.chatJobs
+      const agentStillBusy = Object.values(chatJobs).includes(agentId)
+      return {
+        chatJobs,
+        squadMessages: agentStillBusy
+          ? s.squadMessages
+          : s.squadMessages.filter(m => !(m.isTyping && m.agentId === agentId)),
+        chatJobError: job?.status === 'failed' ? `${agentId} could not reply: ${job.error}` : s.chatJobError,
+      }
+    })
+  },
+  
+  // Stop the agent runs behind any pending chat replies
+  cancelChatJobs: async () => {
+    const jobIds = Object.keys(get().chatJobs)
+    await Promise.all(jobIds.map(id =>
+      api.cancelChatJob(id)
+        .then(job => get().finishChatJob(id, job))
+        .catch(() => {}) // 409 if it just finished; the poll picks that up
+    ))
+  },
+  
   // ============ Announcements (API-backed) ============
   broadcastAnnouncement: async (title, message, priority) => {
     try {